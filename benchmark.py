@@ -0,0 +1,309 @@
+"""
+Benchmark of the full round trip of a synthetic CCLocalLevels save: load -> edit -> save.
+Every stage is timed separately, so regressions are visible:
+
+    python benchmark.py
+    python benchmark.py --levels 4 --objects 50000 --mix block=50,move=20,spawn=20,item_edit=10 --repeat 5
+    python benchmark.py --micro xor --micro refs
+
+Timings are the best of `--repeat` runs. Peak memory of every stage is measured by tracemalloc
+in a separate run, because tracing slows everything down.
+"""
+import argparse
+import os
+import random
+import time
+import timeit
+import tracemalloc
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+
+from attrs import define, field
+
+import classes
+import tools.decompressing
+import tools.plist
+from classes import gd_object as gd
+from classes.enums import Easing, ItemOperator
+from classes.gd_id import Group, Item
+from classes.gd_module import GdModule
+from classes.save import LevelInfo, Save
+from serializing import SerializingFamily
+from tools.funcs import pairs_to_dict, dict_to_pairs
+
+S = SerializingFamily.get('save')
+gd_object_szr = SerializingFamily.get('gd_object')['GdObject']
+gd_object_compact_szr = SerializingFamily.get('gd_object')['GdObject', 'compact']
+
+LEVEL_SETTINGS = 'kA13,0,kA15,0,kA16,0,kA14,,kA6,0,kA7,0,kA17,0,kA18,0,kS39,0,kA2,0,kA3,0,kA8,0,kA4,0,kA9,0,kA10,0'
+
+
+def _block(rnd: random.Random, x: float, y: float) -> gd.GdObjectBase:
+    obj = gd.GdObjectAnyId(rnd.choice((1, 1, 1, 2, 8, 211, 1764)), x=x, y=y)
+    if rnd.random() < 0.3:
+        obj.unused = {'groups': [Group(rnd.randint(1, 999)) for _ in range(rnd.randint(1, 3))]}
+    return obj
+
+
+GENERATORS: dict[str, Callable[[random.Random, float, float], gd.GdObjectBase]] = {
+    'block': _block,
+    'move': lambda rnd, x, y: gd.MoveBy(
+        x=x, y=y, target=Group(rnd.randint(1, 999)), move_x=rnd.randint(-10, 10) * 30, move_y=rnd.randint(-10, 10) * 30,
+        duration=rnd.choice((0., 0.5, 1.)), easing=rnd.choice(list(Easing)),
+    ),
+    'move_to': lambda rnd, x, y: gd.MoveTo(
+        x=x, y=y, target=Group(rnd.randint(1, 999)), target_pos=Group(rnd.randint(1, 999)), duration=1.,
+    ),
+    'rotate': lambda rnd, x, y: gd.RotateBy(
+        x=x, y=y, target=Group(rnd.randint(1, 999)), center=Group(rnd.randint(1, 999)), degrees=rnd.choice((90., 180., 720.)),
+    ),
+    'spawn': lambda rnd, x, y: gd.Spawn(x=x, y=y, target=Group(rnd.randint(1, 999)), delay=rnd.choice((0., 0.1, 1.))),
+    'toggle': lambda rnd, x, y: gd.Toggle(x=x, y=y, target=Group(rnd.randint(1, 999)), activate=rnd.random() < 0.5),
+    'pickup': lambda rnd, x, y: gd.Pickup(x=x, y=y, item=Item(rnd.randint(1, 99)), count=rnd.randint(-5, 5)),
+    'count': lambda rnd, x, y: gd.Count(
+        x=x, y=y, target=Group(rnd.randint(1, 999)), item=Item(rnd.randint(1, 99)), count=rnd.randint(1, 10),
+    ),
+    'item_edit': lambda rnd, x, y: gd.ItemEdit(
+        x=x, y=y, a=Item(rnd.randint(1, 99)), b=Item(rnd.randint(1, 99)), result=Item(rnd.randint(1, 99)),
+        operator_a_b=rnd.choice((ItemOperator.Add, ItemOperator.Sub)),
+    ),
+    'text': lambda rnd, x, y: gd.Text(x=x, y=y, text=rnd.choice(('hello', 'GdPy', 'benchmark'))),
+}
+
+DEFAULT_MIX = {
+    'block': 70,
+    'move': 8,
+    'move_to': 2,
+    'rotate': 3,
+    'spawn': 6,
+    'toggle': 4,
+    'pickup': 2,
+    'count': 2,
+    'item_edit': 2,
+    'text': 1,
+}
+
+
+def make_objects(count: int, mix: dict[str, float], seed: int = 0) -> list[str]:
+    """ compiled objects of the level, kinds are chosen by weights of the mix """
+    rnd = random.Random(seed)
+    kinds = rnd.choices(list(mix), weights=list(mix.values()), k=count)
+    with GdModule():
+        return [
+            gd_object_szr.compile(GENERATORS[kind](rnd, float(i % 1000 * 30), float(i // 1000 * 30)))
+            for i, kind in enumerate(kinds)
+        ]
+
+
+def make_save(levels: int, objects: int, mix: dict[str, float], seed: int = 0) -> bytes:
+    """ CCLocalLevels.dat with `levels` levels of `objects` objects each """
+    infos = []
+    for i in range(levels):
+        data = ';'.join([LEVEL_SETTINGS, *make_objects(objects, mix, seed + i), ''])
+        data = tools.decompressing.compress(data.encode('utf-8')).decode('utf-8')
+        infos.append(LevelInfo(f'benchmark {i}', data))
+    return Save(infos).SaveToDAT()
+
+
+@define
+class Stage:
+    name: str
+    seconds: float
+    objects: int = 0
+    nbytes: int = 0
+    peak_memory: int | None = None
+
+    @property
+    def objects_per_second(self) -> float | None:
+        return self.objects / self.seconds if self.objects and self.seconds else None
+
+    @property
+    def megabytes_per_second(self) -> float | None:
+        return self.nbytes / 2 ** 20 / self.seconds if self.nbytes and self.seconds else None
+
+
+@define
+class Benchmark:
+    """ Collects stages of one run. With trace_memory=True tracemalloc must be running. """
+    trace_memory: bool = False
+    stages: dict[str, Stage] = field(factory=dict)
+
+    @contextmanager
+    def stage(self, name: str, objects: int = 0, nbytes: int = 0) -> Iterator[None]:
+        """ stages with the same name are summed """
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            start_memory = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        yield
+        seconds = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] - start_memory if self.trace_memory else None
+        if name not in self.stages:
+            self.stages[name] = Stage(name, seconds, objects, nbytes, peak)
+            return
+        stage = self.stages[name]
+        stage.seconds += seconds
+        stage.objects += objects
+        stage.nbytes += nbytes
+        if peak is not None:
+            stage.peak_memory = max(stage.peak_memory, peak)
+
+
+def round_trip(dat: bytes,
+               bench: Benchmark,
+               edit: Callable[[gd.GdObjectBase], None] | None = None,
+               compact: bool = False
+               ) -> bytes:
+    """ Same as Save.LoadFromDAT -> LevelInfo.decompress('rw', compact=compact) of every level -> Save.SaveToDAT """
+    analyzer = gd_object_compact_szr if compact else gd_object_szr
+    with bench.stage('decrypt_save_xml', nbytes=len(dat)):
+        xml_data = tools.decompressing.decrypt_save_xml(dat)
+    with bench.stage('plist_to_json', nbytes=len(xml_data)):
+        json_data = tools.plist.plist_to_json(xml_data)
+    with bench.stage('Save.analyze'):
+        save: Save = S[Save].analyze(json_data)
+
+    for info in save.levels:
+        compressed = info.data.encode('utf-8')
+        with bench.stage('decompress', nbytes=len(compressed)):
+            data = tools.decompressing.decompress(compressed).decode('utf-8')
+        settings, *objects, _ = data.split(';')
+        settings = pairs_to_dict(settings.split(','))
+        module = GdModule()
+        with module:
+            with bench.stage('object analyze', objects=len(objects)):
+                module.objects = [analyzer.analyze(obj) for obj in objects]
+            if edit is not None:
+                with bench.stage('edit', objects=len(objects)):
+                    for obj in module.objects:
+                        edit(obj)
+            with bench.stage('object compile', objects=len(objects)):
+                objects = [gd_object_szr.compile(obj) for obj in module.objects]
+        data = ';'.join([','.join(dict_to_pairs(settings)), *objects, '']).encode('utf-8')
+        with bench.stage('compress', nbytes=len(data)):
+            info.data = tools.decompressing.compress(data).decode('utf-8')
+
+    with bench.stage('Save.compile'):
+        json_data = S[Save].compile(save)
+    with bench.stage('json_to_plist'):
+        xml_data = tools.plist.json_to_plist(json_data)
+    with bench.stage('encrypt_save_xml', nbytes=len(xml_data)):
+        return tools.decompressing.encrypt_save_xml(xml_data)
+
+
+def translate(obj: gd.GdObjectBase):
+    obj.x += 30.
+
+
+def run(dat: bytes, repeat: int = 3, memory: bool = True, compact: bool = False) -> list[Stage]:
+    """ best time of `repeat` runs for every stage, peak memory from an additional traced run """
+    best: dict[str, Stage] = {}
+    for _ in range(repeat):
+        bench = Benchmark()
+        round_trip(dat, bench, translate, compact)
+        for name, stage in bench.stages.items():
+            if name not in best or stage.seconds < best[name].seconds:
+                best[name] = stage
+    if memory:
+        tracemalloc.start()
+        try:
+            bench = Benchmark(trace_memory=True)
+            round_trip(dat, bench, translate, compact)
+        finally:
+            tracemalloc.stop()
+        for name, stage in bench.stages.items():
+            best[name].peak_memory = stage.peak_memory
+    return list(best.values())
+
+
+def format_report(stages: list[Stage]) -> str:
+    def fmt(value: float | None, spec: str) -> str:
+        return '' if value is None else format(value, spec)
+
+    lines = [f'{"stage":<18}{"time, ms":>12}{"objects/s":>14}{"MB/s":>10}{"peak, MB":>12}']
+    for stage in stages:
+        lines.append(
+            f'{stage.name:<18}{stage.seconds * 1000:>12.1f}'
+            f'{fmt(stage.objects_per_second, ",.0f"):>14}'
+            f'{fmt(stage.megabytes_per_second, ".1f"):>10}'
+            f'{fmt(None if stage.peak_memory is None else stage.peak_memory / 2 ** 20, ".1f"):>12}'
+        )
+    lines.append(f'{"total":<18}{sum(stage.seconds for stage in stages) * 1000:>12.1f}')
+    return '\n'.join(lines)
+
+
+def parse_mix(text: str) -> dict[str, float]:
+    """ 'block=70,move=10' -> {'block': 70.0, 'move': 10.0} """
+    mix = {}
+    for item in text.split(','):
+        kind, _, weight = item.partition('=')
+        if kind not in GENERATORS:
+            raise argparse.ArgumentTypeError(f'unknown object kind {kind!r}, expected one of {", ".join(GENERATORS)}')
+        mix[kind] = float(weight or 1)
+    return mix
+
+
+def micro_xor(megabytes: int = 50) -> str:
+    """ xor stage of the save: bytes.translate table against a byte by byte map """
+    data = os.urandom(megabytes * 2 ** 20)
+
+    def xor_map(data: bytes, value: int) -> bytes:
+        return bytes(map(lambda x: x ^ value, data))
+
+    assert tools.decompressing._xor_bytes(data, 11) == xor_map(data, 11)
+    fast = min(timeit.repeat(lambda: tools.decompressing._xor_bytes(data, 11), number=1, repeat=3))
+    slow = timeit.timeit(lambda: xor_map(data, 11), number=1)
+    return f'xor {megabytes} MB: translate {fast:.3f}s, map {slow:.3f}s, speedup {slow / fast:.0f}x'
+
+
+def micro_refs(references: int = 1_000_000) -> str:
+    """ group references of GdId: analyzing objects that refer to 1000 groups, absorbing used and unused refs """
+    objects = [f'1,1,2,0,3,0,57,{".".join(str((i * 4 + j) % 1000 + 1) for j in range(4))}' for i in range(references // 4)]
+    with GdModule() as module:
+        start = time.perf_counter()
+        analyzed = list(map(gd_object_szr.analyze, objects))
+        analyze = time.perf_counter() - start
+
+        kept = Group(5000)
+        start = time.perf_counter()
+        for value in range(1, 1001):
+            kept.absorb(Group(value))
+        module.remap_groups({5000: 6000})
+        absorb = time.perf_counter() - start
+        assert all(group.ref is kept.ref for group in analyzed[0].unused['groups'])
+        tracked = len(kept.ref.absorbed)
+    return (f'refs {references:,}: analyze {analyze:.3f}s, absorb 1000 used groups {absorb * 1000:.1f}ms, '
+            f'{tracked} refs tracked')
+
+
+MICRO: dict[str, Callable[[], str]] = {
+    'xor': micro_xor,
+    'refs': micro_refs,
+}
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description='Benchmark of the save load -> edit -> save round trip')
+    parser.add_argument('--levels', type=int, default=2)
+    parser.add_argument('--objects', type=int, default=20000, help='objects per level')
+    parser.add_argument('--mix', type=parse_mix, default=DEFAULT_MIX,
+                        help=f'weights of object kinds: {",".join(f"{k}={v}" for k, v in DEFAULT_MIX.items())}')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-memory', action='store_true', help="don't measure peak memory")
+    parser.add_argument('--compact', action='store_true', help='analyze objects to compact (slotted) classes')
+    parser.add_argument('--micro', choices=MICRO, action='append',
+                        help='run the micro-benchmark instead of the round trip, can be repeated')
+    args = parser.parse_args(argv)
+
+    if args.micro:
+        for name in args.micro:
+            print(MICRO[name]())
+        return
+    dat = make_save(args.levels, args.objects, args.mix, args.seed)
+    print(f'save: {args.levels} levels x {args.objects} objects, {len(dat) / 2 ** 20:.1f} MB')
+    print(format_report(run(dat, args.repeat, not args.no_memory, args.compact)))
+
+
+if __name__ == '__main__':
+    main()
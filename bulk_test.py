@@ -0,0 +1,94 @@
+"""
+Bulk transforms of GdModule give the same objects for lists and ColumnarObjects and set attributes
+only where their values change.
+"""
+import classes
+from classes import gd_object as gd
+from classes import observe
+from classes.gd_id import Group
+from classes.gd_module import GdModule
+from classes.save_szr import gd_object_szr
+
+
+def _module() -> GdModule:
+    module = GdModule()
+    with module:
+        module.objects = [gd.GdObjectAnyId(1, x=float(i * 30), y=float(i * 15)) for i in range(6)]
+        module.objects[1].rotation = 45.
+        module.objects.append(gd.Spawn(x=15., y=30., target=Group(1)))
+        module.objects.append(gd.Toggle(x=45., y=60., target=Group(2)))
+    return module
+
+
+def _compiled(module: GdModule) -> list[str]:
+    with module:
+        objects = module.objects
+        return [gd_object_szr.compile(obj) for obj in getattr(objects, 'iter_raw', objects.__iter__)()]
+
+
+def _pairs(module: GdModule) -> list[dict[str, str]]:
+    """ keys of attributes set after creation are compiled in order of setting on objects, but not on columns """
+    return [dict(zip(data.split(',')[::2], data.split(',')[1::2])) for data in _compiled(module)]
+
+
+def _transform(module: GdModule):
+    with module:
+        module.translate(10., -5.)
+        module.rotate_around((30., 30.), 90, where=(gd.GdObjectAnyId, gd.Spawn))
+        module.scale(2., (15., 15.), where=gd.Spawn)
+        module.translate(3., 0., where=lambda obj: obj.x > 60.)
+        module.remap_groups({1: 2, 2: 1})
+
+
+def test_same_for_columnar():
+    lists, columnar = _module(), _module()
+    columnar.to_columnar()
+    _transform(lists)
+    _transform(columnar)
+    assert _pairs(lists) == _pairs(columnar)
+    with lists:
+        assert [obj.target for obj in lists.filter_by_class(gd.Trigger)] == [Group(2), Group(1)]
+
+
+class _Changes(observe.ObjectsObserver):
+    def __init__(self):
+        self.names = []
+
+    def changed(self, obj, name: str):
+        self.names.append(name)
+
+
+def test_set_where_changed():
+    module = _module()
+    changes = module.observe('changes', _Changes())
+    with module:
+        compiled = _compiled(module)
+        module.rotate_around((0., 0.), 0)
+        module.translate(0., 0.)
+        module.scale(1.)
+        assert changes.names == [] and _compiled(module) == compiled
+
+        module.rotate_around((0., 0.), 360, where=[0, 1])
+        assert changes.names == ['rotation', 'rotation']
+        assert module.objects[0].rotation == 360. and module.objects[1].rotation == 405.
+        changes.names.clear()
+        module.translate(0., 5., where=[0])
+        assert changes.names == ['y']
+    module.unobserve('changes')
+
+
+def test_columnar_rotation_where_changed():
+    module = _module()
+    objects = module.to_columnar()
+    with module:
+        module.rotate_around((0., 0.), 0)
+        assert objects.present('rotation').tolist() == [False, True, False, False, False, False, False, False]
+        module.rotate_around((0., 0.), 90, where=[0, 1])
+        assert objects.values('rotation')[:2].tolist() == [90., 135.]
+        assert objects.present('rotation').sum() == 2
+
+
+if __name__ == '__main__':
+    for test in (test_same_for_columnar, test_set_where_changed, test_columnar_rotation_where_changed):
+        test()
+        print(test.__name__, 'ok')
@@ -0,0 +1,254 @@
+"""
+Bulk transforms of module objects, used by GdModule.translate, rotate_around, scale, remap_groups and filter_by_class.
+Only ColumnarObjects (see GdModule.to_columnar) are vectorised: their columns are transformed in place.
+Lists of objects are not, values are read and written back object by object (by object.__setattr__,
+observers of classes.observe are notified afterwards), which takes about as long as a plain loop.
+Attributes are written only where their values change.
+Requires numpy.
+"""
+import itertools
+import math
+from collections.abc import Callable, Mapping, Sequence
+from typing import Any, TypeAlias
+
+import numpy as np
+from ignore_default import original_class
+
+from python.named_const import Missed
+from tools.vector2 import Vector2
+from . import observe
+from .columnar import ColumnarObjects
+from .gd_id import Group
+from .gd_module import GdModule, LazyObjects
+
+__all__ = ('Where', 'select', 'translate', 'rotate_around', 'scale', 'remap_groups', 'filter_by_class')
+
+Where: TypeAlias = 'None | type | tuple[type, ...] | np.ndarray | Sequence[bool] | Sequence[int] | Callable[[Any], bool]'
+
+
+def _objects(module: GdModule):
+    objects = module.objects
+    if isinstance(objects, LazyObjects):
+        objects.analyze_all()
+    return objects
+
+
+def _class_matches(klass: type, klasses: tuple[type, ...], subclasses: bool) -> bool:
+    return issubclass(klass, klasses) if subclasses else original_class(klass) in klasses
+
+
+def _class_indices(objects, klasses: tuple[type, ...], subclasses: bool = True) -> np.ndarray:
+    if isinstance(objects, ColumnarObjects):
+        codes = [code for code, klass in enumerate(objects.classes) if _class_matches(klass, klasses, subclasses)]
+        return np.flatnonzero(np.isin(objects.class_codes(), codes))
+    return np.array(
+        [i for i, obj in enumerate(objects) if _class_matches(type(obj), klasses, subclasses)], np.intp
+    )
+
+
+def select(module: GdModule, where: Where = None) -> np.ndarray:
+    """
+    Indexes of module.objects selected by `where`:
+    None - all objects, class or tuple of classes - their instances, callable - objects it returns True for,
+    bool mask of len(objects) or indexes.
+    """
+    objects = _objects(module)
+    if where is None:
+        return np.arange(len(objects))
+    if isinstance(where, type):
+        where = (where,)
+    if isinstance(where, tuple) and all(isinstance(klass, type) for klass in where):
+        return _class_indices(objects, where)
+    if callable(where):
+        return np.array([i for i, obj in enumerate(objects) if where(obj)], np.intp)
+    where = np.asarray(where)
+    if where.dtype == np.bool_:
+        if len(where) != len(objects):
+            raise ValueError(f'mask of {len(where)} items for {len(objects)} objects')
+        return np.flatnonzero(where)
+    return where.astype(np.intp)
+
+
+class _Selected:
+    """ objects selected by `where`, their attributes are got and set as arrays """
+
+    def __init__(self, module: GdModule, where: Where):
+        self.objects = _objects(module)
+        self.indices = select(module, where)
+        self.columnar = isinstance(self.objects, ColumnarObjects)
+        if not self.columnar:
+            self.items = list(self.objects) if where is None else [self.objects[i] for i in self.indices.tolist()]
+
+    def _side_table(self, name: str) -> np.ndarray:
+        """ mask of selected ColumnarObjects which have the attribute in the side table """
+        mask = np.zeros(len(self.objects), np.bool_)
+        mask[self.objects.side_table_indices(name)] = True
+        return mask[self.indices]
+
+    def get(self, name: str) -> tuple[np.ndarray, np.ndarray]:
+        """ float values and mask of objects that have the attribute """
+        if self.columnar:
+            values = self.objects.values(name)[self.indices].astype(np.float64)
+            present = self.objects.present(name)[self.indices]
+            for i in np.flatnonzero(self._side_table(name)).tolist():
+                values[i] = self.objects.get_attr(int(self.indices[i]), name)
+                present[i] = True
+            return values, present
+        raw = [getattr(obj, name, Missed) for obj in self.items]
+        if Missed not in raw:
+            return np.array(raw, np.float64), np.ones(len(raw), np.bool_)
+        present = np.array([value is not Missed for value in raw], np.bool_)
+        values = np.array([0. if value is Missed else value for value in raw], np.float64)
+        return values, present
+
+    def set(self, name: str, mask: np.ndarray, values: np.ndarray):
+        """ sets values of selected objects where mask is True, `values` are for those objects only """
+        if self.columnar:
+            indices = self.indices[mask]
+            side = self._side_table(name)[mask]
+            self.objects.values(name)[indices[~side]] = values[~side]
+            self.objects.present(name)[indices[~side]] = True
+            for index, value in zip(indices[side].tolist(), values[side].tolist()):
+                self.objects.set_attr(index, name, value)  # moves the value from the side table to the column
+            return
+        set_value = object.__setattr__
+        items = self.items if mask.all() else list(itertools.compress(self.items, mask.tolist()))
+        for obj, value in zip(items, values.tolist()):
+            set_value(obj, name, value)
+        if observe.observed:
+            for obj in items:
+                observe.notify_changed(obj, name)
+
+    def update(self, name: str, mask: np.ndarray, old: np.ndarray, new: np.ndarray):
+        """ like set, but only where the value changes, `old` and `new` are for objects where mask is True """
+        changed = new != old
+        if changed.any():
+            mask = mask.copy()
+            mask[mask] = changed
+            self.set(name, mask, new[changed])
+
+    def positions(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """ mask of objects with both coordinates and their x, y """
+        x, x_present = self.get('x')
+        y, y_present = self.get('y')
+        present = x_present & y_present
+        return present, x[present], y[present]
+
+
+def translate(module: GdModule, offset: Vector2 | tuple[float, float], where: Where = None):
+    dx, dy = offset
+    selected = _Selected(module, where)
+    for name, delta in (('x', dx), ('y', dy)):
+        if delta:
+            values, present = selected.get(name)
+            selected.update(name, present, values[present], values[present] + delta)
+
+
+def _cos_sin(degrees: float) -> tuple[float, float]:
+    """ exact for multiples of 90 degrees """
+    quarters, rest = divmod(degrees, 90)
+    if rest == 0:
+        return ((1., 0.), (0., 1.), (-1., 0.), (0., -1.))[int(quarters) % 4]
+    radians = math.radians(degrees)
+    return math.cos(radians), math.sin(radians)
+
+
+def rotate_around(module: GdModule, center: Vector2 | tuple[float, float], degrees: float, where: Where = None):
+    """ clockwise as in the editor: positions are rotated around the center and `rotation` of objects changes """
+    cx, cy = center
+    cos, sin = _cos_sin(degrees)
+    selected = _Selected(module, where)
+    positioned, x, y = selected.positions()
+    dx, dy = x - cx, y - cy
+    selected.update('x', positioned, x, cx + dx * cos + dy * sin)
+    selected.update('y', positioned, y, cy - dx * sin + dy * cos)
+
+    rotation, _ = selected.get('rotation')  # 0 where the object has the default
+    everything = np.ones(len(rotation), np.bool_)
+    selected.update('rotation', everything, rotation, rotation + degrees)
+
+
+def scale(module: GdModule,
+          factor: float | Vector2 | tuple[float, float],
+          center: Vector2 | tuple[float, float] = (0., 0.),
+          where: Where = None):
+    """ scales positions relative to the center, sizes of objects don't change """
+    fx, fy = (factor, factor) if isinstance(factor, (int, float)) else factor
+    cx, cy = center
+    selected = _Selected(module, where)
+    positioned, x, y = selected.positions()
+    selected.update('x', positioned, x, cx + (x - cx) * fx)
+    selected.update('y', positioned, y, cy + (y - cy) * fy)
+
+
+def _group_value(group: int | Group) -> int:
+    value = group.get_value() if isinstance(group, Group) else int(group)
+    if value in Group.type.constants:
+        raise ValueError(f'constant {Group(value)!r} can\'t be remapped')
+    return value
+
+
+def remap_groups(module: GdModule, mapping: Mapping[int | Group, int | Group]):
+    """
+    Changes values of groups in the module: every Group reference follows its GdId, so all objects are remapped
+    at once. A group remapped to a used value is merged with it. Swaps like {1: 2, 2: 1} are supported.
+    """
+    with module:
+        objects = _objects(module)  # raw objects must have their GdIds before values change
+        mapping = {_group_value(old): _group_value(new) for old, new in mapping.items()}
+        mapping = {old: new for old, new in mapping.items() if old != new}
+        if not mapping:
+            return
+        container = module.ids[Group]
+        gids = {old: container.values.inverse.get(old, None) for old in mapping}
+        for gid in gids.values():
+            if gid is not None:
+                del container.values[gid]
+                gid.containers.discard(container)
+        for old, new in mapping.items():
+            gid = gids[old]
+            if gid is None:
+                continue
+            existing = container.values.inverse.get(new, None)
+            if existing is None:
+                container.values[gid] = new
+                gid.containers.add(container)
+            else:
+                existing.absorb(gid)
+        for old in mapping:
+            container.release(old)
+
+        if isinstance(objects, ColumnarObjects):
+            _, values = objects.groups_csr()
+            old_values = np.array(sorted(mapping), np.int64)
+            new_values = np.array([mapping[old] for old in old_values.tolist()], np.int64)
+            positions = np.minimum(np.searchsorted(old_values, values), len(old_values) - 1)
+            hit = old_values[positions] == values
+            values[hit] = new_values[positions[hit]]
+
+
+def filter_by_class(module: GdModule, *klasses: type, subclasses: bool = True) -> list:
+    """ objects of the classes, ObjectView for ColumnarObjects """
+    objects = _objects(module)
+    return [objects[i] for i in _class_indices(objects, klasses, subclasses).tolist()]
+
+
+if __name__ == '__main__':
+    def _main():
+        import classes
+        from classes import gd_object as gd
+
+        module = GdModule()
+        with module:
+            module.objects = [gd.GdObjectAnyId(1, x=30., y=0.), gd.Spawn(x=0., y=30., target=Group(1))]
+            module.rotate_around(Vector2(0., 0.), 90)
+            print([(obj.x, obj.y) for obj in module.objects])  # >>> [(0.0, -30.0), (30.0, 0.0)]
+            print(module.objects[0].rotation)  # >>> 90.0
+
+            module.translate(10., 5., where=gd.Spawn)
+            print(module.objects[1].x, module.objects[1].y)  # >>> 40.0 5.0
+
+            module.remap_groups({1: 7})
+            print(module.filter_by_class(gd.Trigger)[0].target)  # >>> Group(7)
+
+    _main()
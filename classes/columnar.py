@@ -0,0 +1,527 @@
+"""
+Struct-of-arrays storage of level objects, an alternative to the list in GdModule.objects:
+
+    with level:
+        objects = level.module.to_columnar()
+        objects.values('x')[:] += 30.  # shifts every object without touching python objects
+
+Requires numpy.
+"""
+from collections.abc import Iterable, Iterator, MutableMapping, MutableSequence
+from contextlib import contextmanager
+from functools import cache
+from typing import Any
+
+import numpy as np
+from attrs import define, field
+
+from python.named_const import Missed
+from serializing import ToClass
+from .gd_id import Group
+from .gd_module import GdModule
+
+__all__ = ('Column', 'COLUMNS', 'ColumnarObjects', 'ObjectView', 'UnusedView')
+
+
+@define(frozen=True)
+class Column:
+    name: str
+    type: type  # float, int or bool
+    in_unused: bool = False  # a key without a field, stored in obj.unused[name]
+
+    @property
+    def dtype(self) -> np.dtype:
+        return np.dtype({float: np.float64, int: np.int64, bool: np.bool_}[self.type])
+
+    def fits(self, value) -> bool:
+        if self.type is float:
+            return type(value) is float or type(value) is int
+        return type(value) is self.type
+
+
+COLUMNS = (  # in the order of keys, materialized objects compile to the same string
+    Column('id', int),
+    Column('x', float),
+    Column('y', float),
+    Column('rotation', float),
+    Column('z_order', int, in_unused=True),
+    Column('editor_layer_1', int, in_unused=True),
+    Column('editor_layer_2', int, in_unused=True),
+)
+
+
+@cache
+def _to_class(klass: type) -> ToClass:
+    return ToClass(klass)
+
+
+@define
+class _Rows:
+    """ columns of several rows, rows are moved between ColumnarObjects by these batches """
+    codes: np.ndarray
+    values: dict[str, np.ndarray]
+    present: dict[str, np.ndarray]
+    group_lengths: np.ndarray  # -1 is no groups
+    group_values: np.ndarray
+    rest: list[dict | None]
+
+    def __len__(self):
+        return len(self.codes)
+
+
+class ObjectView:
+    """
+    Object of ColumnarObjects by its index, has the same attributes as the object.
+    Indexes aren't tracked: after inserting or deleting objects before it, the view points to another object.
+    `unused` is UnusedView, its items are written to the store.
+    """
+    __slots__ = ('_objects', '_index')
+
+    def __init__(self, objects: 'ColumnarObjects', index: int):
+        object.__setattr__(self, '_objects', objects)
+        object.__setattr__(self, '_index', index)
+
+    @property
+    def klass(self) -> type:
+        return self._objects.get_class(self._index)
+
+    def materialize(self):
+        return self._objects.materialize(self._index)
+
+    def __getattr__(self, name):
+        value = self._objects.get_attr(self._index, name)
+        if name == 'unused':
+            return UnusedView(self._objects, self._index)
+        return value
+
+    def __setattr__(self, name, value):
+        if isinstance(value, UnusedView):
+            value = dict(value)
+        self._objects.set_attr(self._index, name, value)
+
+    def __delattr__(self, name):
+        self._objects.set_attr(self._index, name, Missed)
+
+    def __eq__(self, other):
+        if isinstance(other, ObjectView):
+            if other._objects is self._objects and other._index == self._index:
+                return True
+            other = other.materialize()
+        return self.materialize() == other
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.materialize()!r})'
+
+
+class UnusedView(MutableMapping):
+    """
+    `unused` of ObjectView: items are read from the store and set or deleted in it.
+    Values are built on every access, assign a changed value back: view.unused['groups'] = [*groups, Group(5)]
+    """
+    __slots__ = ('_objects', '_index')
+
+    def __init__(self, objects: 'ColumnarObjects', index: int):
+        self._objects = objects
+        self._index = index
+
+    def _get(self) -> dict:
+        try:
+            return self._objects.get_attr(self._index, 'unused')
+        except AttributeError:  # all items were deleted
+            return {}
+
+    def _set(self, unused: dict):
+        self._objects.set_attr(self._index, 'unused', unused)
+
+    def __getitem__(self, key):
+        return self._get()[key]
+
+    def __setitem__(self, key, value):
+        unused = dict(self._get())
+        unused[key] = value
+        self._set(unused)
+
+    def __delitem__(self, key):
+        unused = dict(self._get())
+        del unused[key]
+        self._set(unused)
+
+    def __iter__(self):
+        return iter(self._get())
+
+    def __len__(self):
+        return len(self._get())
+
+    def __repr__(self):
+        return repr(self._get())
+
+
+class ColumnarObjects(MutableSequence[ObjectView]):
+    """
+    Objects of the module as columns: hot numeric attributes (COLUMNS) are numpy arrays with a mask of present
+    values, groups are CSR arrays of their values (offsets and values), other attributes of every object are in
+    a sparse side table. Items are ObjectView, objects are created on demand by `materialize`.
+    Bulk changes work on `values`, `present` and `groups_csr` arrays in place.
+    Appending is amortized O(1), inserting and deleting in the middle or changing the number of groups is O(n).
+    """
+    COLUMNS: tuple[Column, ...] = COLUMNS
+
+    def __init__(self, module: GdModule, objects: Iterable[Any] = ()):
+        self.module = module
+        self._columns = {column.name: column for column in self.COLUMNS}
+        self._unused_columns = tuple(column for column in self.COLUMNS if column.in_unused)
+        self._classes: list[type] = []
+        self._class_codes: dict[type, int] = {}
+        self._size = 0
+        self._capacity = 0
+        self._codes = np.zeros(0, np.int32)
+        self._values = {column.name: np.zeros(0, column.dtype) for column in self.COLUMNS}
+        self._present = {column.name: np.zeros(0, np.bool_) for column in self.COLUMNS}
+        self._has_groups = np.zeros(0, np.bool_)
+        self._group_offsets = np.zeros(1, np.int64)
+        self._group_values = np.zeros(0, np.int64)
+        self._rest: list[dict | None] = []
+        self._side_columns: set[str] = set()  # names of columns that were ever in the side table
+        self.extend(objects)
+
+    @contextmanager
+    def _in_module(self):
+        if GdModule.C(None) is self.module:
+            yield
+            return
+        with self.module:
+            yield
+
+    # columns
+
+    def values(self, name: str) -> np.ndarray:
+        """ writable values of the column, where the value isn't present it's 0 """
+        return self._values[name][:self._size]
+
+    def present(self, name: str) -> np.ndarray:
+        """ writable mask of objects which have the attribute, others have the default """
+        return self._present[name][:self._size]
+
+    def groups_csr(self) -> tuple[np.ndarray, np.ndarray]:
+        """ groups of object i are values[offsets[i]:offsets[i + 1]], values are writable """
+        offsets = self._group_offsets[:self._size + 1]
+        return offsets, self._group_values[:offsets[-1]]
+
+    def side_table_indices(self, name: str) -> np.ndarray:
+        """ indexes of objects which have the attribute in the side table, e.g. a value of a column of another type """
+        if name in self._columns and name not in self._side_columns:
+            return np.zeros(0, np.intp)
+        return np.array([i for i, rest in enumerate(self._rest) if rest is not None and name in rest], np.intp)
+
+    def class_codes(self) -> np.ndarray:
+        """ code of the class of every object, see `classes` """
+        return self._codes[:self._size]
+
+    @property
+    def classes(self) -> list[type]:
+        return self._classes
+
+    def class_mask(self, *klasses: type, subclasses: bool = True) -> np.ndarray:
+        codes = [
+            code for code, klass in enumerate(self._classes)
+            if (issubclass(klass, klasses) if subclasses else klass in klasses)
+        ]
+        return np.isin(self.class_codes(), codes)
+
+    # rows
+
+    def _class_code(self, klass: type) -> int:
+        code = self._class_codes.get(klass, None)
+        if code is None:
+            code = self._class_codes[klass] = len(self._classes)
+            self._classes.append(klass)
+        return code
+
+    def _extract(self, obj, rows: dict[str, list]):
+        """ appends columns of the object to lists of `_rows_from` """
+        klass = type(obj)
+        state = dict(_to_class(klass).compile(obj))
+        rows['codes'].append(self._class_code(klass))
+        for column in self.COLUMNS:
+            value = Missed
+            if not column.in_unused and column.name in state and column.fits(state[column.name]):
+                value = state.pop(column.name)
+            rows[column.name].append(value)
+
+        unused = state.get('unused', None)
+        if isinstance(unused, dict):  # observe.AttributeDict too
+            unused = dict(unused)
+            for column in self._unused_columns:
+                if column.name in unused and column.fits(unused[column.name]):
+                    rows[column.name][-1] = unused.pop(column.name)
+            groups = unused.get('groups', None)
+            if isinstance(groups, list) and all(isinstance(group, Group) for group in groups):
+                del unused['groups']
+                rows['group_lengths'].append(len(groups))
+                rows['group_values'].extend(group.get_value() for group in groups)
+            else:
+                rows['group_lengths'].append(-1)
+            if unused:
+                state['unused'] = unused
+            else:
+                del state['unused']
+        else:
+            rows['group_lengths'].append(-1)
+        if not self._side_columns.issuperset(state.keys() & self._columns.keys()):
+            self._side_columns.update(state.keys() & self._columns.keys())
+        rows['rest'].append(state or None)
+
+    def _rows_from(self, objects: Iterable[Any]) -> _Rows:
+        rows = {name: [] for name in ('codes', 'group_lengths', 'group_values', 'rest', *self._columns)}
+        with self._in_module():
+            for obj in objects:
+                if isinstance(obj, ObjectView):
+                    obj = obj.materialize()
+                self._extract(obj, rows)
+        values, present = {}, {}
+        for column in self.COLUMNS:
+            column_values = rows[column.name]
+            present[column.name] = np.array([value is not Missed for value in column_values], np.bool_)
+            values[column.name] = np.array([0 if value is Missed else value for value in column_values], column.dtype)
+        return _Rows(
+            np.array(rows['codes'], np.int32), values, present,
+            np.array(rows['group_lengths'], np.int64), np.array(rows['group_values'], np.int64), rows['rest'],
+        )
+
+    def _slice_rows(self, start: int, stop: int) -> _Rows:
+        offsets = self._group_offsets
+        lengths = np.diff(offsets[start:stop + 1])
+        lengths[~self._has_groups[start:stop]] = -1
+        return _Rows(
+            self._codes[start:stop].copy(),
+            {name: values[start:stop].copy() for name, values in self._values.items()},
+            {name: present[start:stop].copy() for name, present in self._present.items()},
+            lengths,
+            self._group_values[offsets[start]:offsets[stop]].copy(),
+            self._rest[start:stop],
+        )
+
+    def _take_rows(self, indices: np.ndarray) -> _Rows:
+        """ rows of the indices in their order """
+        offsets = self._group_offsets[:self._size + 1]
+        lengths = np.diff(offsets)[indices]
+        group_starts = np.repeat(offsets[:-1][indices] - (np.cumsum(lengths) - lengths), lengths)
+        group_lengths = lengths.copy()
+        group_lengths[~self._has_groups[indices]] = -1
+        return _Rows(
+            self._codes[indices],
+            {name: values[indices] for name, values in self._values.items()},
+            {name: present[indices] for name, present in self._present.items()},
+            group_lengths,
+            self._group_values[group_starts + np.arange(len(group_starts))],
+            [self._rest[i] for i in indices.tolist()],
+        )
+
+    def _set_rows(self, rows: _Rows):
+        self._truncate(0)
+        self._append_rows(rows)
+
+    def _reserve(self, size: int, groups_size: int):
+        if size > self._capacity:
+            capacity = max(size, self._capacity * 2, 16)
+
+            def grow(array: np.ndarray, length: int) -> np.ndarray:
+                new = np.zeros(length, array.dtype)
+                new[:len(array)] = array
+                return new
+
+            self._codes = grow(self._codes, capacity)
+            self._values = {name: grow(values, capacity) for name, values in self._values.items()}
+            self._present = {name: grow(present, capacity) for name, present in self._present.items()}
+            self._has_groups = grow(self._has_groups, capacity)
+            self._group_offsets = grow(self._group_offsets, capacity + 1)
+            self._capacity = capacity
+        if groups_size > len(self._group_values):
+            new = np.zeros(max(groups_size, len(self._group_values) * 2, 16), np.int64)
+            new[:len(self._group_values)] = self._group_values
+            self._group_values = new
+
+    def _append_rows(self, rows: _Rows):
+        start, stop = self._size, self._size + len(rows)
+        group_start = self._group_offsets[start]
+        group_stop = group_start + len(rows.group_values)
+        self._reserve(stop, group_stop)
+        self._codes[start:stop] = rows.codes
+        for name, values in rows.values.items():
+            self._values[name][start:stop] = values
+            self._present[name][start:stop] = rows.present[name]
+        self._has_groups[start:stop] = rows.group_lengths >= 0
+        self._group_offsets[start + 1:stop + 1] = group_start + np.cumsum(np.maximum(rows.group_lengths, 0))
+        self._group_values[group_start:group_stop] = rows.group_values
+        self._rest.extend(rows.rest)
+        self._size = stop
+
+    def _truncate(self, size: int):
+        self._size = size
+        del self._rest[size:]
+
+    def _replace_tail(self, start: int, stop: int, rows: _Rows):
+        """ replaces objects [start:stop] with the rows """
+        tail = self._slice_rows(stop, self._size)
+        self._truncate(start)
+        self._append_rows(rows)
+        self._append_rows(tail)
+
+    # objects
+
+    def get_class(self, index: int) -> type:
+        return self._classes[self._codes[self._check_index(index)]]
+
+    def materialize(self, index: int):
+        """ new object of the index, mutable values except `unused` are shared with the store """
+        index = self._check_index(index)
+        klass = self._classes[self._codes[index]]
+        state = {}
+        for column in self.COLUMNS:
+            if not column.in_unused and self._present[column.name][index]:
+                state[column.name] = self._values[column.name][index].item()
+        rest = self._rest[index]
+        if rest is not None:
+            state.update(rest)
+        unused = {}
+        for column in self._unused_columns:
+            if self._present[column.name][index]:
+                unused[column.name] = self._values[column.name][index].item()
+        if self._has_groups[index]:
+            start, stop = self._group_offsets[index:index + 2]
+            with self._in_module():
+                unused['groups'] = [Group(value) for value in self._group_values[start:stop].tolist()]
+        if unused:
+            state['unused'] = unused | state.get('unused', {})
+        return _to_class(klass).analyze(state)
+
+    def iter_objects(self) -> Iterator[Any]:
+        with self._in_module():
+            for index in range(self._size):
+                yield self.materialize(index)
+
+    def iter_raw(self) -> Iterator[Any]:
+        """ objects to compile, same as for LazyObjects """
+        return self.iter_objects()
+
+    def get_attr(self, index: int, name: str):
+        column = self._columns.get(name, None)
+        if column is not None and not column.in_unused and self._present[name][index]:
+            return self._values[name][index].item()
+        rest = self._rest[index]
+        if rest is not None and name in rest and name != 'unused':
+            return rest[name]
+        obj = self.materialize(index)
+        value = getattr(obj, name)
+        if name != 'unused' and name in _to_class(type(obj)).compile(obj):
+            self[index] = obj  # a mutable default is stored on get
+        return value
+
+    def set_attr(self, index: int, name: str, value):
+        column = self._columns.get(name, None)
+        if column is not None and not column.in_unused and column.fits(value) and self._present[name][index]:
+            self._values[name][index] = value
+            return
+        obj = self.materialize(index)
+        setattr(obj, name, value)
+        self[index] = obj
+
+    # MutableSequence
+
+    def _check_index(self, index: int) -> int:
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError('object index out of range')
+        return index
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [ObjectView(self, i) for i in range(*index.indices(self._size))]
+        return ObjectView(self, self._check_index(index))
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._size)
+            if step != 1:
+                raise ValueError('extended slices are not supported')
+            self._replace_tail(start, max(start, stop), self._rows_from(value))
+            return
+        index = self._check_index(index)
+        rows = self._rows_from((value,))
+        if max(rows.group_lengths[0], 0) != self._group_offsets[index + 1] - self._group_offsets[index]:
+            self._replace_tail(index, index + 1, rows)
+            return
+        self._codes[index] = rows.codes[0]
+        for name, values in rows.values.items():
+            self._values[name][index] = values[0]
+            self._present[name][index] = rows.present[name][0]
+        self._has_groups[index] = rows.group_lengths[0] >= 0
+        self._group_values[self._group_offsets[index]:self._group_offsets[index + 1]] = rows.group_values
+        self._rest[index] = rows.rest[0]
+
+    def __delitem__(self, index):
+        keep = np.ones(self._size, np.bool_)
+        if isinstance(index, slice):
+            keep[index] = False
+        else:
+            keep[self._check_index(index)] = False
+        self._set_rows(self._take_rows(np.flatnonzero(keep)))
+
+    def insert(self, index, value):
+        index = min(max(index + self._size if index < 0 else index, 0), self._size)
+        self._replace_tail(index, index, self._rows_from((value,)))
+
+    def append(self, value):
+        self._append_rows(self._rows_from((value,)))
+
+    def extend(self, values):
+        self._append_rows(self._rows_from(values))
+
+    def pop(self, index=-1):
+        """ returns the materialized object, a view would point to the next one """
+        obj = self.materialize(index)
+        del self[index]
+        return obj
+
+    def reverse(self):
+        self._set_rows(self._take_rows(np.arange(self._size)[::-1]))
+
+    def clear(self):
+        self._truncate(0)
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self._size} objects)'
+
+    def __prepr__(self, sets):
+        return self.__repr__()
+
+
+if __name__ == '__main__':
+    def _main():
+        import classes
+        from classes import gd_object as gd
+
+        module = GdModule()
+        with module:
+            module.objects = [gd.GdObjectAnyId(1, x=float(i * 30), y=0.) for i in range(5)]
+            module.objects.append(gd.MoveBy(x=0., y=30., target=Group(3), move_x=60))
+            module.objects[0].unused = {'groups': [Group(1), Group(2)], 'z_order': 3}
+            objects = module.to_columnar()
+
+            objects.values('x')[:] += 15.
+            print(objects.values('x'))  # >>> [ 15.  45.  75. 105. 135.  15.]
+            print(objects[0].unused)  # >>> {'z_order': 3, 'groups': [Group(1), Group(2)]}
+            print(objects[5].target, objects[5].move_x)  # >>> Group(3) 60
+
+            offsets, groups = objects.groups_csr()
+            groups[:] += 10
+            print(objects[0].unused['groups'])  # >>> [Group(11), Group(12)]
+
+            objects[0].unused['z_order'] = 2
+            print(objects[0].unused['z_order'], objects.values('z_order')[0])  # >>> 2 2
+
+    _main()
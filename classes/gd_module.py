@@ -1,3 +1,4 @@
+from collections.abc import Callable, Hashable, Iterable, Iterator, MutableSequence
 from attrs import define, field
 from typing import TypeVar, Generic, Self, TYPE_CHECKING, Type, ClassVar
 from bidict import bidict
@@ -5,9 +6,19 @@ from context import Contextable
 import weakref
 
 from python.named_const import Default
+from classes import observe
+from classes.observe import ObjectsObserver, ObservedList
 
 if TYPE_CHECKING:
     from classes.gd_object import GdObjectAnyId
+    from classes.columnar import ColumnarObjects
+    from classes.bulk import Where
+    from classes.gd_id import Group
+    from classes.spatial import SpatialIndex, Filter
+    from classes.trigger_graph import TriggerGraph
+    from classes.merge import IdPolicy
+    from serializing import Base
+    from tools.vector2 import Vector2
 
 @define(eq=False, init=False, slots=True, repr=False)
 class GdIdRef:
@@ -30,7 +41,6 @@ class GdIdRef:
     def __safe_init__(self, ref: "GdId[Self]"):
         """ I can't use __init__ because it's called after __new__ every time """
         self.ref = ref
-        self.ref.wrefs.add(GdIdWeakRef(self))
 
     def get_value(self, default=Default):
         if self.is_constant():
@@ -45,9 +55,6 @@ class GdIdRef:
     def __eq__(self, other):
         return isinstance(other, self.__class__) and other.ref is self.ref
 
-    def __del__(self):
-        self.ref.wrefs.remove(GdIdWeakRef(self))
-
     def __init_subclass__(cls, constants: dict[int, str | None] = None, **kwargs):
         super().__init_subclass__(**kwargs)
         assert isinstance(constants, dict)
@@ -95,21 +102,14 @@ class GdIdType(Generic[TR]):
     def ids_factory(cls):
         return {tp: GdIdContainer(gid_tp) for tp, gid_tp in GdIdType.all.items()}
 
-class GdIdWeakRef(weakref.ref[TR]):
-    if TYPE_CHECKING:
-        def __call__(self) -> TR:
-            ...
-
-    def __eq__(self, other):
-        return isinstance(other, GdIdWeakRef) and self() is other()
-
-    def __hash__(self):
-        return id(self())
-
 @define(eq=False, slots=True)
 class GdId(Generic[TR]):
     type: GdIdType[TR] = field()
-    wrefs: set[GdIdWeakRef[TR]] = field(init=False, factory=set, repr=False)  # assert cls.wrefs[i]().ref is cls
+    # the ref returned by get_ref, it's kept alive with the gd_id, so creating and dropping refs costs nothing
+    canonical: TR | None = field(init=False, default=None, repr=False)
+    # refs of absorbed gd_ids which are still used, only they have to be rebound by the next absorb
+    # assert cls.absorbed[i].ref is cls
+    absorbed: 'weakref.WeakValueDictionary[int, TR] | None' = field(init=False, default=None, repr=False)
     containers: set['GdIdContainer[TR]'] = field(init=False, factory=set)  # assert cls in cls.containers[i].values and cls.type == cls.containers[i].type
 
     def __eq__(self, other):
@@ -119,9 +119,9 @@ class GdId(Generic[TR]):
         return id(self)  # be careful when absorbing! - that's why I added containers set
 
     def get_ref(self):
-        for wref in self.wrefs:
-            return wref()
-        return self.type.get_ref(self)
+        if self.canonical is None:
+            self.canonical = self.type.get_ref(self)
+        return self.canonical
 
     def absorb(self, other: Self):
         """
@@ -133,30 +133,95 @@ class GdId(Generic[TR]):
             raise TypeError(f"Can't absorb different type: {self.type!r} != {other.type!r}")
         if other in self.type.constants.inv:
             raise TypeError(f"Can't absorb constant gdid")
+        if other is self:
+            return
 
-        for wref in list(other.wrefs):  # copying wrefs to prevent deleting while iterating
-            ref = wref()
-            if ref is not None:
+        for container in self.containers | other.containers:  # raw objects must get the values before they change
+            container._analyze_raw()
+
+        moved = [] if other.absorbed is None else list(other.absorbed.values())
+        if other.canonical is not None:
+            if self.canonical is None:
+                self.canonical = other.canonical
+            else:
+                moved.append(other.canonical)  # dropped as soon as nothing uses it
+            other.canonical.ref = self
+        if moved:
+            if self.absorbed is None:
+                self.absorbed = weakref.WeakValueDictionary()
+            for ref in moved:
                 ref.ref = self
-                self.wrefs.add(wref)
-        other.wrefs.clear()
+                self.absorbed[id(ref)] = ref
+        other.canonical = other.absorbed = None
 
         for container in other.containers:
             value = container.values.pop(other)
             if self not in container.values:
                 self.containers.add(container)
                 container.values[self] = value
+            else:
+                container.release(value)
+        observe.notify_absorbed(self, other)  # indexes by gd_id, see classes.observe
         del other
 
+BITMAP_LIMIT = 1 << 20  # greater values aren't marked in GdIdContainer._used
+
+
 @define(slots=True)
 class GdIdContainer(Generic[TR]):
+    """
+    Values of gd_ids in a module. Free values are allocated from a bitmap of used values (`_used`, one byte
+    per value), released values are reused. The bitmap may mark values that aren't used anymore,
+    found values are checked against `values`, so the bitmap doesn't have to see direct changes of `values`.
+    """
     type: GdIdType[TR] = field()
     values: bidict[GdId[TR], int] = field(init=False, factory=bidict)
-    _next_free: int = field(init=False, default=1)
+    _next_free: int = field(init=False, default=1)  # values below are used, except released ones
+    _used: bytearray = field(init=False, factory=lambda: bytearray(b'\x01'), repr=False, eq=False)  # 0 isn't allocated
+    on_allocate: "weakref.WeakMethod[Callable[[], None]] | None" = field(init=False, default=None, repr=False)  # called before searching a free value or changing values
 
     def __hash__(self):
         return id(self)
 
+    def _use(self, value: int):
+        if not 0 < value < BITMAP_LIMIT:
+            return
+        if value >= len(self._used):
+            self._used.extend(bytes(value + 1 - len(self._used)))
+        self._used[value] = 1
+
+    def release(self, value: int):
+        """ the value can be allocated again, call it after removing a value from `values` directly """
+        if 0 < value < len(self._used) and value not in self.values.inverse:
+            self._used[value] = 0
+            self._next_free = min(self._next_free, value)
+
+    def _analyze_raw(self):
+        """ analyzes raw objects of LazyObjects, they refer to values directly """
+        if self.on_allocate is not None and (on_allocate := self.on_allocate()) is not None:
+            on_allocate()
+
+    def _allocate(self, count: int = 1) -> int:
+        """ the first of `count` consecutive free values, they are marked as used """
+        self._analyze_raw()
+        used, inverse, run = self._used, self.values.inverse, bytes(count)
+        start = self._next_free
+        while True:
+            start = used.find(run, start)
+            if start == -1:
+                start = len(used)
+                used.extend(bytes(max(count, len(used))))
+                continue
+            taken = next((value for value in range(start, start + count) if value in inverse), None)
+            if taken is None:
+                break
+            used[taken] = 1  # set directly in `values`
+            start = taken + 1
+        used[start:start + count] = b'\x01' * count
+        if count == 1 or start == self._next_free:
+            self._next_free = start + count
+        return start
+
     def get(self, value: int | None = None) -> TR:
         if value is None:
             return GdId(self.type).get_ref()
@@ -170,20 +235,43 @@ class GdIdContainer(Generic[TR]):
         gid = GdId(self.type)
         gid.containers.add(self)
         self.values[gid] = value
+        self._use(value)
         return gid.get_ref()
 
+    def get_block(self, count: int) -> list[TR]:
+        """ `count` new gd_ids with consecutive free values, e.g. for copies of a prefab """
+        start = self._allocate(count)
+        refs = []
+        for value in range(start, start + count):
+            gid = GdId(self.type)
+            gid.containers.add(self)
+            self.values[gid] = value
+            refs.append(gid.get_ref())
+        return refs
+
     def set_value(self, gid: TR, value: int | None = None):
         if gid.is_constant():
             raise TypeError("Constant gdid can't change value")
         gid_ = gid.ref
+        self._analyze_raw()
         old_value = self.values.pop(gid_, None)
         if value is not None:
             if old_value is None:
                 gid_.containers.add(self)
             self.values[gid_] = value
-            return
-        if old_value is not None:
+            self._use(value)
+        elif old_value is not None:
             gid_.containers.remove(self)
+        if old_value is not None and old_value != value:
+            self.release(old_value)
+
+    def clear(self):
+        """ removes all values, gd_ids keep their values in other containers """
+        for gid in self.values:
+            gid.containers.discard(self)
+        self.values.clear()
+        self._used = bytearray(b'\x01')
+        self._next_free = 1
 
     def get_value(self, gid: TR, default: int = Default) -> int:
         if gid.is_constant():
@@ -193,17 +281,227 @@ class GdIdContainer(Generic[TR]):
             return value
         if default is not Default:
             return default
-        while self._next_free in self.values.inverse:
-            self._next_free += 1
-        value = self._next_free
-        self.set_value(gid, value)
-        self._next_free += 1
+        value = self._allocate()
+        gid.ref.containers.add(self)
+        self.values[gid.ref] = value
         return value
 
+class LazyObjects(MutableSequence["GdObjectAnyId"]):
+    """
+    List of objects that keeps raw object strings and analyzes an object only when it is accessed.
+    Not analyzed objects are compiled back verbatim, see `iter_raw`.
+    Before any new gd_id value is allocated in the module, all objects are analyzed to not reuse their ids.
+    """
+
+    def __init__(self, module: "GdModule", serializer: "Base", raw_objects: Iterable[str] = ()):
+        self._module = weakref.ref(module)  # no reference cycle with the module
+        self.serializer = serializer
+        self._items: list["GdObjectAnyId | str"] = list(raw_objects)
+        self.version = 0  # incremented when items change, analyzing doesn't change it
+        self.analyzed = 0  # number of analyzed raw objects, they may be changed in place
+        for container in module.ids.values():
+            container.on_allocate = weakref.WeakMethod(self.analyze_all)
+
+    @property
+    def module(self) -> "GdModule":
+        return self._module()
+
+    def _analyze(self, index: int) -> "GdObjectAnyId":
+        item = self._items[index]
+        if isinstance(item, str):
+            if GdModule.C(None) is self.module:
+                item = self.serializer.analyze(item)
+            else:
+                with self.module:
+                    item = self.serializer.analyze(item)
+            self._items[index] = item
+            self.analyzed += 1
+        return item
+
+    def analyze_all(self):
+        for container in self.module.ids.values():
+            if container.on_allocate is not None and container.on_allocate() == self.analyze_all:
+                container.on_allocate = None
+        for i in range(len(self._items)):
+            self._analyze(i)
+
+    def is_analyzed(self, index: int) -> bool:
+        return not isinstance(self._items[index], str)
+
+    def iter_raw(self) -> Iterator["GdObjectAnyId | str"]:
+        """ raw strings of not analyzed objects and analyzed objects """
+        return iter(self._items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._analyze(i) for i in range(*index.indices(len(self._items)))]
+        return self._analyze(index)
+
+    def __setitem__(self, index, value):
+        self._items[index] = value
+        self.version += 1
+
+    def __delitem__(self, index):
+        del self._items[index]
+        self.version += 1
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        for i in range(len(self._items)):
+            yield self._analyze(i)
+
+    def insert(self, index, value):
+        self._items.insert(index, value)
+        self.version += 1
+
+    def append(self, value):
+        self._items.append(value)
+        self.version += 1
+
+    def clear(self):
+        self._items.clear()
+        self.version += 1
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({len(self._items)} objects)'
+
+    def __prepr__(self, sets):
+        return self.__repr__()
+
+
+def _observe_objects(module: "GdModule", _, objects):
+    """ new objects of an observed module are observed too, replaced ObservedList stops notifying """
+    if isinstance(objects, ObservedList) and objects.observers is module.observers:
+        return objects
+    old = module.objects
+    if isinstance(old, ObservedList) and old.observers is module.observers:
+        old.detach()
+    if not module.observers:
+        return objects
+    if isinstance(objects, LazyObjects):
+        objects.analyze_all()
+    elif not isinstance(objects, (list, tuple)):
+        raise TypeError(f"{type(objects).__name__} can't be observed, unobserve {', '.join(map(repr, module.observers))}")
+    objects = ObservedList(objects, module.observers)
+    for observer in module.observers.values():
+        observer.reset(objects)
+    return objects
+
+
 @define(slots=True)
 class GdModule(Contextable):
-    objects: list["GdObjectAnyId"] = field(init=False, factory=list)
+    objects: "list[GdObjectAnyId] | LazyObjects | ColumnarObjects" = field(
+        init=False, factory=list, on_setattr=_observe_objects
+    )
     ids: dict[Type[TR], GdIdContainer[TR]] = field(init=False, factory=GdIdType.ids_factory)
+    observers: dict[Hashable, ObjectsObserver] = field(init=False, factory=dict, repr=False, eq=False)
+
+    def observe[O: ObjectsObserver](self, key: Hashable, observer: O) -> O:
+        """
+        Registers the observer of objects changes under the key, see classes.observe.
+        objects become ObservedList, LazyObjects are analyzed, ColumnarObjects can't be observed.
+        """
+        self.unobserve(key)
+        self.observers[key] = observer
+        if isinstance(self.objects, ObservedList) and self.objects.observers is self.observers:
+            observer.reset(self.objects)
+        else:
+            try:
+                self.objects = self.objects  # becomes ObservedList, observers are reset
+            except TypeError:
+                del self.observers[key]
+                raise
+        return observer
+
+    def unobserve(self, key: Hashable) -> ObjectsObserver | None:
+        observer = self.observers.pop(key, None)
+        if not self.observers and isinstance(self.objects, ObservedList) and self.objects.observers is self.observers:
+            self.objects.detach()  # attribute sets of the objects aren't looked up anymore
+        return observer
+
+    def to_columnar(self) -> "ColumnarObjects":
+        """ replaces objects with ColumnarObjects (requires numpy), observers are dropped """
+        from classes.columnar import ColumnarObjects
+        if not isinstance(self.objects, ColumnarObjects):
+            for key in list(self.observers):
+                self.unobserve(key)
+            self.objects = ColumnarObjects(self, self.objects)
+        return self.objects
+
+    def merge(self, other: "GdModule", id_policy: "IdPolicy" = 'renumber') -> dict[type, dict[int, int]]:
+        """
+        Moves objects of `other` to the end of objects, colliding gd_id values are renumbered, kept or unified,
+        see classes.merge. Returns changed values {Group: {old: new}}
+        """
+        from classes import merge
+        return merge.merge(self, other, id_policy)
+
+    # bulk transforms, see classes.bulk (requires numpy), `where` selects objects, see classes.bulk.select
+
+    def translate(self, dx: "float | Vector2", dy: float = 0., where: "Where" = None):
+        """ translate(dx, dy) or translate(Vector2(dx, dy)) """
+        from classes import bulk
+        bulk.translate(self, (dx, dy) if isinstance(dx, (int, float)) else dx, where)
+
+    def rotate_around(self, center: "Vector2 | tuple[float, float]", degrees: float, where: "Where" = None):
+        """ clockwise as in the editor, `rotation` of objects changes too """
+        from classes import bulk
+        bulk.rotate_around(self, center, degrees, where)
+
+    def scale(self,
+              factor: "float | Vector2",
+              center: "Vector2 | tuple[float, float]" = (0., 0.),
+              where: "Where" = None):
+        """ scales positions relative to the center """
+        from classes import bulk
+        bulk.scale(self, factor, center, where)
+
+    def remap_groups(self, mapping: "dict[int | Group, int | Group]"):
+        """ changes group values in all objects at once, {old: new} """
+        from classes import bulk
+        bulk.remap_groups(self, mapping)
+
+    def filter_by_class(self, *klasses: type, subclasses: bool = True) -> list:
+        from classes import bulk
+        return bulk.filter_by_class(self, *klasses, subclasses=subclasses)
+
+    # spatial queries, see classes.spatial, `where` is a class, tuple of classes or predicate
+
+    def spatial_index(self, cell_size: float | None = None) -> "SpatialIndex":
+        """ the grid index used by queries, kept up to date while the module is observed """
+        from classes import spatial
+        return spatial.spatial_index(self, cell_size)
+
+    def objects_in_rect(self, x0: float, y0: float, x1: float, y1: float, where: "Filter" = None) -> list:
+        """ objects with x0 <= x <= x1 and y0 <= y <= y1 """
+        from classes import spatial
+        return spatial.objects_in_rect(self, x0, y0, x1, y1, where)
+
+    def objects_near(self,
+                     center: "Vector2 | tuple[float, float]",
+                     radius: float = float('inf'),
+                     where: "Filter" = None,
+                     limit: int | None = None) -> list:
+        """ objects within the radius sorted by distance, objects_near(center, where=Trigger, limit=1) - the nearest trigger """
+        from classes import spatial
+        return spatial.objects_near(self, center, radius, where, limit)
+
+    def objects_in_column(self, x: float, where: "Filter" = None) -> list:
+        """ objects in the 30 units wide column containing x, sorted by y """
+        from classes import spatial
+        return spatial.objects_in_column(self, x, where)
+
+    def objects_in_group(self, group: "Group | int") -> list:
+        """ objects with the group in `groups` or `parent_groups`, see classes.group_index """
+        from classes import group_index
+        return group_index.objects_in_group(self, group)
+
+    def trigger_graph(self) -> "TriggerGraph":
+        """ dependency graph of triggers, see classes.trigger_graph """
+        from classes import trigger_graph
+        return trigger_graph.trigger_graph(self)
 
     # if TYPE_CHECKING:
     #     @property  # pycharm is pretty stupid at typing
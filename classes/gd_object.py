@@ -6,8 +6,10 @@ from ignore_default import IgnoreDefault
 from data.special_ids import special_ids
 from .enums import *
 from .gd_id import Group, Item, Block, Timer
+from . import observe
 
 
+@observe.observable  # attribute sets are sent to observers of modules, see classes.observe
 @define_gd
 class GdObjectBase(IgnoreDefault):
     x: float
@@ -8,6 +8,7 @@ import recognizing as R
 from maker import Maker
 from serializing import SplitDict, MultiKey
 from tools.funcs import pairs_to_dict, dict_to_pairs
+from ignore_default import compact_class
 from . import gd_object as gd
 from .enums import *
 from .gd_id import *
@@ -30,10 +31,14 @@ class InheritableInfo:
 class InheritableFields:
     infos: dict[type[object], InheritableInfo]
     S: dict[type[object], Base]
+    compact_classes: dict[type[object], type[object]]
 
-    def __init__(self, serializers: dict[type[object], Base] | None = None):
+    def __init__(self,
+                 serializers: dict[type[object], Base] | None = None,
+                 compact_classes: dict[type[object], type[object]] | None = None):
         self.infos = {}
         self.serializers = {} if serializers is None else serializers
+        self.compact_classes = {} if compact_classes is None else compact_classes
 
     def make(self,
              klass: type[object],
@@ -41,8 +46,10 @@ class InheritableFields:
              fields: MultiField = None,
              *,
              to_klass: bool = True,
+             specialized: bool = True,
              bases: tuple[type[object] | EllipsisType, ...] | None = None
              ) -> Base:
+        """ specialized: generate analyze/compile code for the class instead of the interpreted chain """
         if bases is None:
             bases = klass.__mro__[:0:-1]
         elif Ellipsis in bases:
@@ -60,9 +67,12 @@ class InheritableFields:
         if fields is not None:
             new_fields = new_fields.combine(fields)
 
-        serializer = new_keys >> new_fields
-        if to_klass:
-            serializer = serializer >> ToClass(klass)
+        if to_klass and specialized:
+            serializer = specialize(new_keys, new_fields, klass)
+        elif to_klass:
+            serializer = new_keys >> new_fields >> ToClass(klass)
+        else:
+            serializer = new_keys >> new_fields
 
         if klass in self.infos:
             raise KeyError(f'Overriding {klass}')
@@ -70,14 +80,37 @@ class InheritableFields:
         self.serializers[klass] = serializer
         return serializer
 
+    def make_compact(self, klass: type[object], *, specialized: bool = True) -> Base:
+        """ serializer of compact_class(klass) with the fields of made klass, it's in serializers and compact_classes """
+        info = self.infos[klass]
+        compact_klass = compact_class(klass, (name for name in info.fields.from_name if isinstance(name, str)))
+        if specialized:
+            serializer = specialize(info.keys, info.fields, compact_klass)
+        else:
+            serializer = info.keys >> info.fields >> ToClass(compact_klass)
+        self.serializers[compact_klass] = serializer
+        self.compact_classes[klass] = compact_klass
+        return serializer
+
 
 class GdObjectSerialzier(Base):
+    """
+    With compact=True objects are analyzed to compact classes (ignore_default.compact_class) if the class has one,
+    they keep attributes in __slots__ instead of __dict__. Both are compiled.
+    """
     recognizer: R.Base
     S: dict[type | EllipsisType, Base]
+    compact_classes: dict[type, type]
 
-    def __init__(self, recognizer: R.Base):
+    def __init__(self,
+                 recognizer: R.Base,
+                 serializers: dict[type | EllipsisType, Base] | None = None,
+                 compact_classes: dict[type, type] | None = None,
+                 compact: bool = False):
         self.recognizer = recognizer
-        self.serializers = {}
+        self.serializers = {} if serializers is None else serializers
+        self.compact_classes = {} if compact_classes is None else compact_classes
+        self.compact = compact
 
     def analyze(self, data: str):
         data = pairs_to_dict(data.split(','))
@@ -85,6 +118,8 @@ class GdObjectSerialzier(Base):
         if klass not in self.serializers:
             print(f'WARN: recognized class withous serializer: {klass}')
             klass = gd.GdObjectAnyId
+        if self.compact:
+            klass = self.compact_classes.get(klass, klass)
         return self.serializers[klass].analyze(data)
 
     def compile(self, value, data=None):
@@ -200,7 +235,14 @@ S['GdObject'] = gd_object_serializer = GdObjectSerialzier(R.Map(
 
 key = Maker(WrapKeyInfo)
 field = Maker(FieldInfo)
-inherit = InheritableFields(gd_object_serializer.serializers)
+inherit = InheritableFields(gd_object_serializer.serializers, gd_object_serializer.compact_classes)
+
+S['GdObject', 'compact'] = GdObjectSerialzier(
+    gd_object_serializer.recognizer,
+    gd_object_serializer.serializers,
+    gd_object_serializer.compact_classes,
+    compact=True,
+)
 
 szrs = {}
 szrs[...] = DoNothing()
@@ -264,8 +306,8 @@ inherit.make(
         # edit group
         ('20', 'editor_layer_1', int),
         ('61', 'editor_layer_2', int),
-        ('25', 'z_order', bool),
-        ('24', 'z_layer', bool),
+        ('25', 'z_order', int),
+        ('24', 'z_layer', int),
         # extra
         ('64', 'dont_fade', bool),
         ('67', 'dont_enter', bool),
@@ -702,7 +744,7 @@ class RotateDegreesSerializer(Base):
         return degrees + 360 * times_360
 
     def compile(self, value, data=None):
-        return value % 360, value // 360
+        return value % 360, int(value // 360)  # times_360 is an int key, float degrees give float quotient
 
 
 inherit.make(
@@ -906,3 +948,7 @@ inherit.make(
         'reset',
     )
 )
+
+for _klass in list(inherit.infos):
+    if _klass is gd.GdObjectAnyId or getattr(_klass, '__id__', None) is not None:  # can be recognized
+        inherit.make_compact(_klass)
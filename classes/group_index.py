@@ -0,0 +1,193 @@
+"""
+Inverted index of groups: GdId of a group -> objects that have the group in `groups` or `parent_groups`,
+used by GdModule.objects_in_group. The index is created on the first query and updated by change
+notifications (see classes.observe): added and removed objects, a new `unused` of an object and GdId.absorb.
+Groups are kept in obj.unused, indexed objects get it as AttributeDict with AttributeList groups, so changes
+in place like `obj.unused['groups'].append(group)` are seen too.
+ColumnarObjects aren't indexed, their groups arrays are scanned (requires numpy).
+"""
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+from .gd_id import Group
+from .gd_module import GdModule, GdId
+from .observe import ObjectsObserver, AttributeDict, AttributeList
+
+__all__ = ('GROUP_KEYS', 'GroupIndex', 'group_index', 'objects_in_group')
+
+GROUP_KEYS = ('groups', 'parent_groups')
+
+
+def _gd_ids(obj) -> tuple[GdId, ...]:
+    """ GdIds of groups of the object without repeats """
+    unused = getattr(obj, 'unused', None)
+    if not isinstance(unused, Mapping):  # columnar.UnusedView of ObjectView
+        return ()
+    gids = {}
+    for key in GROUP_KEYS:
+        for group in unused.get(key, None) or ():
+            if isinstance(group, Group):
+                gids[group.ref] = None
+    return tuple(gids)
+
+
+def _observe_groups(obj):
+    """ changes of obj.unused and its groups in place are sent as sets of `unused` """
+    unused = getattr(obj, 'unused', None)
+    if not isinstance(unused, dict):
+        return
+    if type(unused) is not AttributeDict or unused.owner() is not obj:
+        unused = AttributeDict(unused, obj, 'unused')
+        object.__setattr__(obj, 'unused', unused)  # the same value, it isn't a change
+    for key in GROUP_KEYS:
+        groups = dict.get(unused, key, None)
+        if isinstance(groups, list) and (type(groups) is not AttributeList or groups.owner() is not obj):
+            dict.__setitem__(unused, key, AttributeList(groups, obj, 'unused'))
+
+
+class GroupIndex(ObjectsObserver):
+    """ Objects by GdIds of their groups, objects of a group are in no particular order """
+
+    def __init__(self, objects: Iterable[Any] = ()):
+        self.members: dict[GdId, dict[int, Any]] = {}  # gid -> {id(obj): obj}
+        self._gids_of: dict[int, tuple[GdId, ...]] = {}
+        self._count: dict[int, int] = {}  # the same object can be in module.objects several times
+        self.added(objects)
+
+    def __len__(self):
+        return len(self._count)
+
+    def __contains__(self, obj):
+        return id(obj) in self._count
+
+    def objects_in_group(self, group: Group) -> list:
+        return list(self.members.get(group.ref, {}).values())
+
+    def groups(self) -> list[Group]:
+        """ groups that have objects """
+        return [gid.get_ref() for gid in self.members]
+
+    def _place(self, obj):
+        key = id(obj)
+        _observe_groups(obj)
+        gids = self._gids_of[key] = _gd_ids(obj)
+        for gid in gids:
+            members = self.members.get(gid)
+            if members is None:
+                members = self.members[gid] = {}
+            members[key] = obj
+
+    def _unplace(self, key: int):
+        for gid in self._gids_of.pop(key):
+            members = self.members[gid]
+            del members[key]
+            if not members:
+                del self.members[gid]
+
+    # ObjectsObserver
+
+    def added(self, objects: Iterable[Any]):
+        for obj in objects:
+            key = id(obj)
+            count = self._count.get(key, 0)
+            self._count[key] = count + 1
+            if not count:
+                self._place(obj)
+
+    def removed(self, objects: Iterable[Any]):
+        for obj in objects:
+            key = id(obj)
+            count = self._count.get(key)
+            if count is None:
+                continue
+            if count > 1:
+                self._count[key] = count - 1
+                continue
+            del self._count[key]
+            self._unplace(key)
+
+    def changed(self, obj, name: str):
+        if name != 'unused' or id(obj) not in self._gids_of:
+            return
+        self._unplace(id(obj))
+        self._place(obj)
+
+    def reset(self, objects: Iterable[Any]):
+        self.members.clear()
+        self._gids_of.clear()
+        self._count.clear()
+        self.added(objects)
+
+    def absorbed(self, gid: GdId, other: GdId):
+        members = self.members.pop(other, None)
+        if members is None:
+            return
+        self.members.setdefault(gid, {}).update(members)
+        for key in members:
+            self._gids_of[key] = tuple(dict.fromkeys(gid if g is other else g for g in self._gids_of[key]))
+
+
+def _is_columnar(module: GdModule) -> bool:
+    return hasattr(module.objects, 'groups_csr')
+
+
+def group_index(module: GdModule) -> GroupIndex:
+    """ index of the module, created on first use and kept up to date afterwards """
+    if _is_columnar(module):
+        raise TypeError("ColumnarObjects aren't indexed, query them by the module")
+    index = module.observers.get(GroupIndex)
+    if index is None:
+        index = module.observe(GroupIndex, GroupIndex())
+    return index
+
+
+def _columnar_objects_in_group(module: GdModule, gid: GdId) -> list:
+    import numpy as np
+    objects = module.objects
+    value = module.ids[Group].values.get(gid, Group.type.constants.inv.get(gid, None))
+    if value is None:  # stored groups have values
+        return []
+    offsets, values = objects.groups_csr()
+    rows = np.searchsorted(offsets, np.flatnonzero(values == value), side='right') - 1
+    rows = set(rows.tolist())
+    for index in objects.side_table_indices('unused').tolist():  # parent_groups
+        if index not in rows and gid in _gd_ids(objects[index]):
+            rows.add(index)
+    return [objects[index] for index in sorted(rows)]
+
+
+def objects_in_group(module: GdModule, group: Group | int) -> list:
+    """ objects in no particular order, ObjectView in module order for ColumnarObjects """
+    if isinstance(group, Group):
+        gid = group.ref
+    else:
+        gid = Group.type.constants.get(group, None) or module.ids[Group].values.inverse.get(group, None)
+        if gid is None:
+            return []
+    if _is_columnar(module):
+        return _columnar_objects_in_group(module, gid)
+    return list(group_index(module).members.get(gid, {}).values())
+
+
+if __name__ == '__main__':
+    def _main():
+        import classes
+        from classes import gd_object as gd
+
+        module = GdModule()
+        with module:
+            module.objects = [gd.GdObjectAnyId(1, x=0., y=0.), gd.GdObjectAnyId(1, x=30., y=0.)]
+            module.objects[0].unused = {'groups': [Group(1), Group(2)]}
+            module.objects[1].unused = {'groups': [Group(2)]}
+            print(len(module.objects_in_group(2)))  # >>> 2
+
+            module.objects[1].unused = {'groups': [Group(3)]}
+            print(len(module.objects_in_group(Group(2))), len(module.objects_in_group(3)))  # >>> 1 1
+
+            Group(1).absorb(Group(3))
+            print(len(module.objects_in_group(1)), module.objects_in_group(3))  # >>> 2 []
+
+            module.objects[1].unused['groups'].append(Group(4))
+            print(len(module.objects_in_group(4)))  # >>> 1
+
+    _main()
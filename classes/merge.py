@@ -0,0 +1,125 @@
+"""
+Merging of modules, used by GdModule.merge: objects of another module are moved to the end of module.objects
+as they are, gd_ids of the other module get values in the module at once for every gd_id type.
+id_policy decides what happens with values of the other module:
+    'renumber' - all of them are moved to a block of free values, their order is kept
+    'keep' - values are kept, colliding ones are moved to free values
+    'unify' - values are kept, a colliding gd_id is absorbed by the gd_id with the same value (GdId.absorb),
+              e.g. both levels use the same group 1
+Gd_ids that already have values in the module (shared by both modules) keep them.
+The other module is consumed: it's left without objects and its gd_id containers are cleared.
+"""
+from typing import Literal, TypeAlias
+
+from .gd_module import GdModule, GdIdContainer, LazyObjects
+
+__all__ = ('IdPolicy', 'ID_POLICIES', 'merge')
+
+IdPolicy: TypeAlias = Literal['renumber', 'keep', 'unify']
+
+ID_POLICIES = ('renumber', 'keep', 'unify')
+
+
+def _take_objects(module: GdModule) -> list:
+    """ objects of the module, they are bound to their gd_ids """
+    objects = module.objects
+    if isinstance(objects, LazyObjects):
+        objects.analyze_all()
+        return list(objects.iter_raw())
+    if hasattr(objects, 'iter_objects'):  # ColumnarObjects
+        return list(objects.iter_objects())
+    return list(objects)
+
+
+def _merge_ids(container: GdIdContainer, other: GdIdContainer, id_policy: IdPolicy) -> dict[int, int]:
+    """ gives gd_ids of `other` values in `container`, returns changed values {old: new} """
+    moved = sorted(
+        ((value, gid) for gid, value in other.values.items() if container not in gid.containers),
+        key=lambda item: item[0]
+    )
+    if not moved:
+        return {}
+    values, inverse = container.values, container.values.inverse
+
+    if id_policy == 'renumber':
+        start = container._allocate(len(moved))
+        for new, (_, gid) in enumerate(moved, start):
+            gid.containers.add(container)
+            values[gid] = new
+        return {old: new for new, (old, _) in enumerate(moved, start) if old != new}
+
+    colliding = []
+    for value, gid in moved:
+        existing = inverse.get(value, None)
+        if existing is None:
+            gid.containers.add(container)
+            values[gid] = value
+            container._use(value)
+        elif id_policy == 'unify':
+            existing.absorb(gid)
+        else:
+            colliding.append((value, gid))
+    changed = {}
+    for value, gid in colliding:  # after kept values are used, so they aren't allocated
+        gid.containers.add(container)
+        values[gid] = changed[value] = container._allocate()
+    return changed
+
+
+def merge(module: GdModule, other: GdModule, id_policy: IdPolicy = 'renumber') -> dict[type, dict[int, int]]:
+    """
+    Moves objects of `other` to `module`, `other` is left without objects and gd_id values.
+    Returns changed values of gd_ids by their types: {Group: {old: new}}.
+    """
+    if id_policy not in ID_POLICIES:
+        raise ValueError(f'id_policy must be one of {ID_POLICIES}, not {id_policy!r}')
+    if other is module:
+        raise ValueError("Can't merge the module with itself")
+    with module:
+        if isinstance(module.objects, LazyObjects):
+            module.objects.analyze_all()  # values of raw objects must be in containers to find collisions
+        objects = _take_objects(other)
+
+        changed = {}
+        for ref_type, container in module.ids.items():
+            values = _merge_ids(container, other.ids[ref_type], id_policy)
+            if values:
+                changed[ref_type] = values
+
+        module.objects.extend(objects)
+    other.objects = []
+    for container in other.ids.values():  # moved gd_ids (and gd_ids that absorbed them) are registered there
+        container.clear()
+    return changed
+
+
+if __name__ == '__main__':
+    def _main():
+        import classes
+        from classes import gd_object as gd
+        from classes.gd_id import Group
+
+        def level(*groups: int) -> GdModule:
+            module = GdModule()
+            with module:
+                module.objects = [gd.Spawn(x=30. * i, y=0., target=Group(value)) for i, value in enumerate(groups)]
+            return module
+
+        module = level(1, 2)
+        print(module.merge(level(2, 3), 'renumber'))  # >>> {<class 'classes.gd_id.Group'>: {2: 3, 3: 4}}
+        with module:
+            print([obj.target for obj in module.objects])  # >>> [Group(1), Group(2), Group(3), Group(4)]
+
+        other = level(2, 3)
+        module = level(1, 2)
+        module.merge(other, 'renumber')
+        print(len(other.objects), len(other.ids[Group].values))  # >>> 0 0
+
+        module = level(1, 2)
+        print(module.merge(level(2, 3), 'keep'))  # >>> {<class 'classes.gd_id.Group'>: {2: 4}}
+        module = level(1, 2)
+        print(module.merge(level(2, 3), 'unify'))  # >>> {}
+        with module:
+            print(module.objects[1].target == module.objects[2].target)  # >>> True
+
+    _main()
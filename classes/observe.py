@@ -0,0 +1,346 @@
+"""
+Change notifications of module objects, indexes over GdModule.objects are kept up to date by them:
+
+    module.observe('my_index', observer)  # module.objects becomes ObservedList
+
+Observers get objects added to and removed from module.objects, attribute sets of GdObjectBase objects
+and GdId.absorb.
+In-place changes of mutable values (lists, dicts) aren't seen, set the attribute again to notify,
+unless the value is AttributeList or AttributeDict (e.g. obj.unused and its groups, see classes.group_index).
+Attribute sets are sent to observers of the modules holding the object: ObservedList registers its objects
+in `observed`, so objects of not observed modules cost one lookup. While no object is registered,
+`observable` classes have no notifying __setattr__ at all, e.g. attrs __init__ of analyzed objects costs
+nothing extra. Absorbs are sent to observers of all
+observed modules, an observer ignores gd_ids it doesn't know.
+Notifications may come from any thread, the registry is changed under a lock and observers are copied
+before they are notified.
+"""
+import functools
+import threading
+import weakref
+from collections.abc import Iterable
+from typing import Any
+
+from python.pprint import prepr_funcs
+
+__all__ = (
+    'ObjectsObserver', 'ObservedList', 'AttributeList', 'AttributeDict',
+    'observable', 'observed', 'notify_changed', 'notify_absorbed'
+)
+
+
+class ObjectsObserver:
+    """ Base of observers, all notifications are ignored """
+
+    def added(self, objects: Iterable[Any]):
+        pass
+
+    def removed(self, objects: Iterable[Any]):
+        pass
+
+    def changed(self, obj, name: str):
+        pass
+
+    def reset(self, objects: Iterable[Any]):
+        """ module.objects were replaced """
+        pass
+
+    def absorbed(self, gid, other):
+        """ references of GdId `other` now refer to `gid` """
+        pass
+
+
+observed: 'dict[int, dict[int, weakref.ref[ObservedList]]]' = {}  # id(obj) -> {id(list): list} of lists holding it
+_lists: 'dict[int, weakref.ref[ObservedList]]' = {}  # lists that register their objects
+_lock = threading.Lock()
+_observable: list[type] = []  # classes with the notifying __setattr__ while `observed` isn't empty
+
+
+def observable[T: type](cls: T) -> T:
+    """ class decorator: attribute sets of instances are sent to observers of modules holding them """
+    with _lock:
+        _observable.append(cls)
+        if observed:
+            _set_hook(cls, True)
+    return cls
+
+
+def _notifying(setattr_):
+    def __setattr__(self, name, value):
+        setattr_(self, name, value)
+        if id(self) in observed:
+            notify_changed(self, name)
+
+    __setattr__.__wrapped__ = setattr_
+    return __setattr__
+
+
+def _set_hook(cls: type, on: bool):
+    if on:
+        cls.__setattr__ = _notifying(super(cls, cls).__setattr__)
+    else:
+        del cls.__setattr__
+
+
+def _register(key: int, objects: 'ObservedList'):
+    with _lock:
+        lists = observed.get(key, None)
+        if lists is None:
+            if not observed:
+                for cls in _observable:
+                    _set_hook(cls, True)
+            lists = observed[key] = {}
+        lists[id(objects)] = objects._ref
+
+
+def _unregister(key: int, list_key: int):
+    with _lock:
+        lists = observed.get(key, None)
+        if lists is not None:
+            lists.pop(list_key, None)
+            if not lists:
+                del observed[key]
+                if not observed:
+                    for cls in _observable:
+                        _set_hook(cls, False)
+
+
+def _forget(counts: dict[int, int], list_key: int, _=None):
+    """ unregisters objects of a detached or collected list """
+    with _lock:
+        _lists.pop(list_key, None)
+    for key in list(counts):
+        _unregister(key, list_key)
+    counts.clear()
+
+
+def notify_changed(obj, name: str):
+    lists = observed.get(id(obj), None)
+    if lists is None:
+        return
+    with _lock:
+        refs = list(lists.values())
+    for ref in refs:
+        objects = ref()
+        if objects is not None:
+            for observer in tuple(objects.observers.values()):
+                observer.changed(obj, name)
+
+
+def notify_absorbed(gid, other):
+    with _lock:
+        refs = list(_lists.values())
+    for ref in refs:
+        objects = ref()
+        if objects is None:
+            continue
+        for observer in tuple(objects.observers.values()):
+            observer.absorbed(gid, other)
+
+
+class ObservedList(list):
+    """
+    list that notifies observers about added and removed objects, is pickled as list.
+    Its objects are registered in `observed` until `detach`, so their attribute sets are sent to the observers.
+    """
+    __slots__ = ('observers', '_counts', '_ref', '__weakref__')
+
+    def __init__(self, objects: Iterable[Any] = (), observers: dict[Any, ObjectsObserver] | None = None):
+        super().__init__(objects)
+        self.observers = {} if observers is None else observers
+        self._counts: dict[int, int] | None = {}  # id(obj) -> number of its items, None when detached
+        self._ref = weakref.ref(self, functools.partial(_forget, self._counts, id(self)))
+        with _lock:
+            _lists[id(self)] = self._ref
+        self._register(self)
+
+    def detach(self):
+        """ stops notifying, e.g. the list isn't objects of a module anymore """
+        if self._counts is not None:
+            _forget(self._counts, id(self))
+            self._counts = None
+        self.observers = {}
+
+    def _register(self, objects: Iterable[Any]):
+        counts = self._counts
+        if counts is None:
+            return
+        for obj in objects:
+            key = id(obj)
+            count = counts.get(key, 0)
+            counts[key] = count + 1
+            if not count:
+                _register(key, self)
+
+    def _unregister(self, objects: Iterable[Any]):
+        counts = self._counts
+        if counts is None:
+            return
+        for obj in objects:
+            key = id(obj)
+            count = counts.get(key, 0)
+            if count > 1:
+                counts[key] = count - 1
+            elif count:
+                del counts[key]
+                _unregister(key, id(self))
+
+    def _added(self, objects: list):
+        self._register(objects)
+        for observer in tuple(self.observers.values()):
+            observer.added(objects)
+
+    def _removed(self, objects: list):
+        self._unregister(objects)
+        for observer in tuple(self.observers.values()):
+            observer.removed(objects)
+
+    def append(self, value):
+        super().append(value)
+        self._added([value])
+
+    def extend(self, values):
+        values = list(values)
+        super().extend(values)
+        self._added(values)
+
+    def insert(self, index, value):
+        super().insert(index, value)
+        self._added([value])
+
+    def __setitem__(self, index, value):
+        old = self[index]
+        if isinstance(index, slice):
+            value = list(value)
+        else:
+            old, value = [old], [value]
+            index = slice(index, index + 1 or None)
+        super().__setitem__(index, value)
+        self._removed(old)
+        self._added(value)
+
+    def __delitem__(self, index):
+        old = self[index] if isinstance(index, slice) else [self[index]]
+        super().__delitem__(index)
+        self._removed(old)
+
+    def pop(self, index=-1):
+        value = super().pop(index)
+        self._removed([value])
+        return value
+
+    def remove(self, value):
+        del self[self.index(value)]  # the removed object may be only equal to value
+
+    def clear(self):
+        old = list(self)
+        super().clear()
+        self._removed(old)
+
+    def __iadd__(self, values):
+        self.extend(values)
+        return self
+
+    def __imul__(self, count):
+        old = list(self)
+        super().__imul__(count)
+        if count <= 0:
+            self._removed(old)
+        else:
+            self._added(old * (count - 1))
+        return self
+
+    def __reduce__(self):
+        return list, (list(self),)
+
+    def __prepr__(self, sets):
+        return prepr_funcs[list](self, sets)
+
+
+def _owner_changed(value: 'AttributeList | AttributeDict'):
+    owner = value.owner()
+    if owner is not None and observed:
+        notify_changed(owner, value.name)
+
+
+class AttributeList(ObservedList):
+    """
+    Value of the attribute `name` of the owner object: changes in place are sent as sets of the attribute,
+    as if it was set again. Items aren't registered, is pickled as list.
+    """
+    __slots__ = ('owner', 'name')
+
+    def __init__(self, values: Iterable[Any] = (), owner: Any = None, name: str = ''):
+        list.__init__(self, values)
+        self.observers = {}
+        self._counts = self._ref = None
+        self.owner = weakref.ref(owner)
+        self.name = name
+
+    def _added(self, values: list):
+        _owner_changed(self)
+
+    def _removed(self, values: list):
+        _owner_changed(self)
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        _owner_changed(self)
+
+    def reverse(self):
+        super().reverse()
+        _owner_changed(self)
+
+
+class AttributeDict(dict):
+    """ dict counterpart of AttributeList, is pickled as dict """
+    __slots__ = ('owner', 'name', '__weakref__')
+
+    def __init__(self, values: Any = (), owner: Any = None, name: str = ''):
+        super().__init__(values)
+        self.owner = weakref.ref(owner)
+        self.name = name
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        _owner_changed(self)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        _owner_changed(self)
+
+    def pop(self, key, *default):
+        had = key in self
+        value = super().pop(key, *default)
+        if had:
+            _owner_changed(self)
+        return value
+
+    def popitem(self):
+        item = super().popitem()
+        _owner_changed(self)
+        return item
+
+    def setdefault(self, key, default=None):
+        if key in self:
+            return self[key]
+        self[key] = default
+        return default
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        _owner_changed(self)
+
+    def clear(self):
+        super().clear()
+        _owner_changed(self)
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def __reduce__(self):
+        return dict, (dict(self),)
+
+    def __prepr__(self, sets):
+        return prepr_funcs[dict](self, sets)
@@ -1,6 +1,11 @@
 import copy
+import itertools
+import os
+import weakref
 from collections import deque
-from typing import TypeVar, Iterator, Literal
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from typing import TypeVar, Iterator, Literal, TYPE_CHECKING
 
 from attrs import define, field
 from contextlib import contextmanager
@@ -12,13 +17,18 @@ from serializing import SerializingFamily
 import tools.decompressing
 import tools.plist
 
-from classes.gd_module import GdModule
+from classes.gd_module import GdModule, LazyObjects
+
+if TYPE_CHECKING:
+    import asyncio
+    from concurrent.futures import Executor
+    from classes.save_async import ByteSource, ByteSink
 
 S = SerializingFamily.get('save')
 
 T = TypeVar('T')
 
-__all__ = ('LevelInfo', 'LevelSettings', 'Level', 'Save')
+__all__ = ('LevelInfo', 'LevelHandle', 'LevelSettings', 'Level', 'Save')
 
 
 @define(slots=False)
@@ -28,35 +38,195 @@ class LevelInfo(IgnoreDefault):
     revision: int = field(default=0)
     description: str = field(default='')
 
+    def __setattr__(self, name, value):
+        if name in ('name', 'revision') and name in self.__dict__:
+            _keys_changed(self)
+        super().__setattr__(name, value)
+
+    def __getstate__(self):
+        return _state_without_indexes(self)
+
+    def __getattr__(self, name):
+        if name == 'data' and '_level_string' in self.__dict__:
+            return self.compress_data()
+        return super().__getattr__(name)
+
+    def set_level_string(self, level_string: str):
+        """ uncompressed level data, it's compressed on access to `data` or by Save.SaveToDAT(workers=...) """
+        self.__dict__.pop('data', None)
+        self.__dict__['_level_string'] = level_string
+
+    def level_string(self) -> str:
+        """ uncompressed level data """
+        level_string = self.__dict__.get('_level_string', None)
+        if level_string is not None:
+            return level_string
+        return tools.decompressing.decompress(self.data.encode('utf-8')).decode('utf-8')
+
+    def is_compressed(self) -> bool:
+        return '_level_string' not in self.__dict__
+
+    def compress_data(self, compress_level: int = tools.decompressing.COMPRESS_LEVEL) -> str:
+        level_string = self.__dict__.pop('_level_string', None)
+        if level_string is not None:
+            self.data = _compress_level_string(level_string, compress_level)
+        return self.data
+
     @classmethod
     def LoadFromGMD(cls, data: bytes) -> 'LevelInfo':
         json_data = tools.plist.plist_to_json(data)
         return S[LevelInfo].analyze(json_data)
 
-    def SaveToGMD(self) -> bytes:
+    def SaveToGMD(self, compress_level: int = tools.decompressing.COMPRESS_LEVEL) -> bytes:
+        self.compress_data(compress_level)
         json_data = S[LevelInfo].compile(self)
         return tools.plist.json_to_plist(json_data)
 
-    def decompress(self, mode: Literal['r', 'w', 'rw'] = 'rw') -> 'Iterator[Level]':
+    def decompress(self,
+                   mode: Literal['r', 'w', 'rw'] = 'rw',
+                   lazy: bool = False,
+                   workers: int | None = None,
+                   compact: bool = False,
+                   compress_level: int | None = None
+                   ) -> 'Iterator[Level]':
+        """
+        lazy: objects are analyzed on access, untouched objects are compiled back verbatim
+        workers: number of processes to analyze objects, ignored if lazy
+        compact: objects keep attributes in __slots__ instead of __dict__, it takes less memory
+        compress_level: compress the changed level on exit with this level (1 - fastest, 9 - smallest),
+            by default it's compressed later, on access to `data` or by Save.SaveToDAT
+        """
         read, write = {'r': (True, False), 'w': (False, True), 'rw': (True, True)}[mode]
-        if 'data' not in self.__dict__ or not read:  # get empty level
+        if 'data' not in self.__dict__ and self.is_compressed() or not read:  # get empty level
             raise NotImplementedError()
         else:
-            level: Level = S[Level].analyze(self)
+            key = {
+                (False, False): Level,
+                (True, False): (Level, 'lazy'),
+                (False, True): (Level, 'compact'),
+                (True, True): (Level, 'lazy', 'compact'),
+            }[lazy, compact]
+            level_string = self.level_string()
+            level: Level = S[key].analyze(self, workers=workers, level_string=level_string)
+        if not write:
+            level_string = None  # it's kept only to compare with the compiled level
+        token = _lazy_token(level) if write else None
         with level:
             yield level
-        if write:
-            self.data = S[Level].compile(level)
+        if not write or _untouched(level, token):  # unchanged level keeps its data
+            return
+        new_level_string = S[Level].compile_level_string(level)
+        if new_level_string != level_string:
+            self.set_level_string(new_level_string)
+            if compress_level is not None:
+                self.compress_data(compress_level)
 
     decompress = contextmanager(decompress)
 
     def clone(self, new_name: str | None = None) -> 'LevelInfo':
         level = copy.deepcopy(self)
         if new_name is not None:
-            level.name = new_name
+            level.__dict__['name'] = new_name  # the copy isn't in any Save yet
         return level
 
 
+@define(slots=False)
+class LevelHandle:
+    """
+    Level of a lazy Save, only name and revision are extracted from raw data.
+    Full LevelInfo is analyzed on first `load()`, until then the level is compiled back verbatim.
+    """
+    _name: str = field(alias='name')
+    _revision: int = field(alias='revision')
+    raw: dict | None = field(repr=False)
+    info: LevelInfo | None = field(default=None, repr=False)
+
+    @property
+    def name(self) -> str:
+        return self._name if self.info is None else self.info.name
+
+    @property
+    def revision(self) -> int:
+        return self._revision if self.info is None else self.info.revision
+
+    def is_loaded(self) -> bool:
+        return self.info is not None
+
+    def load(self) -> LevelInfo:
+        if self.info is None:
+            self.info = S[LevelInfo].analyze(self.raw)
+            self.raw = None
+            indexes = self.__dict__.pop('_indexes', None)  # the info can be renamed now
+            if indexes is not None:
+                self.info.__dict__['_indexes'] = indexes
+        return self.info
+
+    def __getstate__(self):
+        return _state_without_indexes(self)
+
+
+def _state_without_indexes(level: LevelInfo | LevelHandle) -> dict:
+    """ Save indexes of the level aren't copied or pickled with it """
+    state = level.__dict__.copy()
+    state.pop('_indexes', None)
+    return state
+
+
+def _keys_changed(level: LevelInfo):
+    for index in level.__dict__.get('_indexes', ()):
+        index.stale = True
+
+
+def _lazy_token(level: 'Level') -> tuple | None:
+    """
+    Objects and settings of a lazy level without analyzed objects: raw objects can't be changed in place,
+    so the level is unchanged while they are the same. Other levels may have objects changed in place
+    (e.g. a list attribute), they are compiled and compared.
+    """
+    objects = level.module.objects
+    if not isinstance(objects, LazyObjects) or objects.analyzed:
+        return None
+    return objects, objects.version, dict(level.settings)
+
+
+def _untouched(level: 'Level', token: tuple | None) -> bool:
+    if token is None:
+        return False
+    objects, version, settings = token
+    return (
+        level.module.objects is objects and
+        not objects.analyzed and
+        objects.version == version and
+        level.settings == settings
+    )
+
+
+def _compress_level_string(level_string: str, compress_level: int = tools.decompressing.COMPRESS_LEVEL) -> str:
+    return tools.decompressing.compress(level_string.encode('utf-8'), compress_level).decode('utf-8')
+
+
+def compress_levels(levels: Iterable[LevelInfo],
+                    workers: int | None = None,
+                    compress_level: int = tools.decompressing.COMPRESS_LEVEL):
+    """ compresses data of levels changed by `decompress`, zlib releases the GIL, so threads compress in parallel """
+    levels = [level for level in levels if not level.is_compressed()]
+    if workers is None or workers <= 1 or len(levels) <= 1:
+        for level in levels:
+            level.compress_data(compress_level)
+        return
+    level_strings = [level.__dict__.pop('_level_string') for level in levels]
+    with ThreadPoolExecutor(min(workers, len(levels))) as executor:
+        compressed = executor.map(_compress_level_string, level_strings, itertools.repeat(compress_level))
+        for level, data in zip(levels, compressed):
+            level.data = data
+
+
+def _load_level(level: LevelInfo | LevelHandle) -> LevelInfo:
+    if isinstance(level, LevelHandle):
+        return level.load()
+    return level
+
+
 @define(slots=False)
 class LevelSettings:
     ...
@@ -81,48 +251,196 @@ def _extract_name_revision(name: str | tuple[str, int]):
     return name, revision
 
 
+class _Levels(deque):
+    """
+    Save.levels, counts its changes, so the index of the save knows when it's outdated.
+    Unlike deque, supports slice assignment and deletion.
+    """
+    version = 0
+
+    def __setitem__(self, key, value):
+        self.version += 1
+        if not isinstance(key, slice):
+            super().__setitem__(key, value)
+            return
+        items = list(self)
+        items[key] = value
+        super().clear()
+        super().extend(items)
+
+    def __delitem__(self, key):
+        if isinstance(key, slice):
+            self[key] = []
+            return
+        self.version += 1
+        super().__delitem__(key)
+
+
+def _counted(method_name: str):
+    method = getattr(deque, method_name)
+
+    def changing(self, *args):
+        self.version += 1
+        return method(self, *args)
+
+    changing.__name__ = method_name
+    return changing
+
+
+for _name in (
+        '__iadd__', '__imul__', 'append', 'appendleft', 'extend', 'extendleft',
+        'insert', 'pop', 'popleft', 'remove', 'rotate', 'reverse', 'clear'
+):
+    setattr(_Levels, _name, _counted(_name))
+del _name
+
+
+class _LevelsIndex:
+    """
+    Save.levels lookup by name and revision.
+    Rebuilt when levels are changed (see _Levels.version) or one of its levels is renamed
+    (levels keep their indexes in `_indexes`).
+    """
+    __slots__ = ('levels', 'version', 'stale', 'by_key', 'by_name', 'max_revision', '__weakref__')
+
+    def __init__(self, levels: _Levels):
+        self.levels = levels
+        self.version = levels.version
+        self.stale = False
+        self.by_key: dict[tuple[str, int], LevelInfo | LevelHandle] = {}
+        self.by_name: dict[str, LevelInfo | LevelHandle] = {}  # first level with the name
+        self.max_revision: dict[str, int] = {}
+        for level in reversed(levels):  # the first one in levels wins
+            self._add_first(level)
+
+    def is_valid(self, levels: _Levels) -> bool:
+        return self.levels is levels and self.version == levels.version and not self.stale
+
+    def appendleft(self, level: LevelInfo | LevelHandle):
+        """ levels.appendleft(level) """
+        self.levels.appendleft(level)
+        self.version = self.levels.version
+        self._add_first(level)
+
+    def _add_first(self, level: LevelInfo | LevelHandle):
+        name, revision = level.name, level.revision
+        self.by_key[name, revision] = level
+        self.by_name[name] = level
+        self.max_revision[name] = max(self.max_revision.get(name, revision), revision)
+        keys_owner = level.info if isinstance(level, LevelHandle) and level.info is not None else level
+        indexes = keys_owner.__dict__.get('_indexes', None)
+        if indexes is None:
+            indexes = keys_owner.__dict__['_indexes'] = weakref.WeakSet()
+        indexes.add(self)
+
+    def find(self, name: str, revision: int | None) -> LevelInfo | LevelHandle | None:
+        if revision is None:
+            return self.by_name.get(name, None)
+        return self.by_key.get((name, revision), None)
+
+
 @define(slots=False)
 class Save:
-    levels: deque[LevelInfo] = field(factory=deque, converter=deque)
+    """
+    In lazy mode (LoadFromDAT(..., lazy=True)) `levels` contains LevelHandle,
+    `get` and `clone` load the level on access.
+    """
+    levels: deque[LevelInfo | LevelHandle] = field(factory=_Levels, converter=_Levels)
 
     def __attrs_post_init__(self):
-        self.levels = deque(self.levels)
+        self.levels = _Levels(self.levels)
 
     @classmethod
-    def LoadFromDAT(cls, data: bytes) -> 'Save':
+    def LoadFromDAT(cls, data: bytes, lazy: bool = False) -> 'Save':
         xml_data = tools.decompressing.decrypt_save_xml(data)
         json_data = tools.plist.plist_to_json(xml_data)
-        return S[Save].analyze(json_data)
+        return (S[Save, 'lazy'] if lazy else S[Save]).analyze(json_data)
 
-    def SaveToDAT(self, ios_mode: bool = False) -> bytes:
+    @classmethod
+    def LoadFromFile(cls, path: str | os.PathLike, lazy: bool = False) -> 'Save':
+        """ Same as LoadFromDAT, but decrypts and parses the file by chunks without reading it whole """
+        with open(path, 'rb') as file:
+            json_data = tools.plist.plist_stream_to_json(tools.decompressing.decrypt_save_xml_stream(file))
+        return (S[Save, 'lazy'] if lazy else S[Save]).analyze(json_data)
+
+    def SaveToDAT(self,
+                  ios_mode: bool = False,
+                  workers: int | None = None,
+                  compress_level: int = tools.decompressing.COMPRESS_LEVEL) -> bytes:
+        """
+        workers: number of threads to compress levels changed by LevelInfo.decompress
+        compress_level: for changed levels and the save, 1 - fastest, 9 - smallest
+        """
+        compress_levels(self._loaded_levels(), workers, compress_level)
         json_data = S[Save].compile(self)
         xml_data = tools.plist.json_to_plist(json_data)
-        return tools.decompressing.encrypt_save_xml(xml_data, ios_mode)
+        return tools.decompressing.encrypt_save_xml(xml_data, ios_mode, compress_level)
 
-    def has(self, name: str | tuple[str, int]) -> bool:
-        name, revision = _extract_name_revision(name)
+    # asyncio counterparts, see classes.save_async
+
+    @classmethod
+    async def LoadFromDATAsync(cls,
+                               source: 'ByteSource',
+                               lazy: bool = False,
+                               executor: 'Executor | None' = None,
+                               limit: 'asyncio.Semaphore | None' = None) -> 'Save':
+        """ Same as LoadFromDAT, but parses in the executor, at most `limit` saves at a time """
+        from classes import save_async
+        return await save_async.load_from_dat(source, lazy, executor, limit)
+
+    async def SaveToDATAsync(self,
+                             sink: 'ByteSink | None' = None,
+                             ios_mode: bool = False,
+                             executor: 'Executor | None' = None,
+                             limit: 'asyncio.Semaphore | None' = None,
+                             compress_level: int = tools.decompressing.COMPRESS_LEVEL) -> bytes:
+        """ Same as SaveToDAT, but compiles in the executor, the data is also written to the sink if it's given """
+        from classes import save_async
+        return await save_async.save_to_dat(self, sink, ios_mode, executor, limit, compress_level)
+
+    def _loaded_levels(self) -> Iterator[LevelInfo]:
         for level in self.levels:
-            if level.name != name:
-                continue
-            if revision is None or level.revision == revision:
-                return True
-        return False
+            if isinstance(level, LevelHandle):
+                if not level.is_loaded():
+                    continue
+                level = level.info
+            yield level
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('_index', None)  # levels of a copy aren't watched by it
+        return state
+
+    def reindex(self) -> '_LevelsIndex':
+        """ Rebuilds name/revision index, it's rebuilt on the next lookup after `levels` are changed anyway """
+        index = self.__dict__['_index'] = _LevelsIndex(self.levels)
+        return index
+
+    def _get_index(self) -> '_LevelsIndex':
+        index = self.__dict__.get('_index', None)  # Save from ToClass has no attrs defaults
+        if index is None or not index.is_valid(self.levels):
+            index = self.reindex()
+        return index
+
+    def _find(self, name: str, revision: int | None) -> LevelInfo | LevelHandle | None:
+        return self._get_index().find(name, revision)
+
+    def has(self, name: str | tuple[str, int]) -> bool:
+        return self._find(*_extract_name_revision(name)) is not None
 
     def get(self, name: str | tuple[str, int], default: T = Missed) -> LevelInfo | T:
-        name_, revision = _extract_name_revision(name)
-        for level in self.levels:
-            if level.name != name_:
-                continue
-            if revision is None or level.revision == revision:
-                return level
+        level = self._find(*_extract_name_revision(name))
+        if level is not None:
+            return _load_level(level)
         if default is not Missed:
             return default
         raise KeyError(name)
 
     def add(self, level: LevelInfo):
-        while self.has((level.name, level.revision)):
-            level.revision += 1
-        self.levels.appendleft(level)
+        """ If the revision is taken, level gets the next after the max revision with this name """
+        if self._find(level.name, level.revision) is not None:
+            level.revision = self._get_index().max_revision[level.name] + 1
+        self._get_index().appendleft(level)
 
     def clone(self, name: str | tuple[str, int], new_name: str | None = None) -> LevelInfo:
         level = self.get(name)
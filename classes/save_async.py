@@ -0,0 +1,148 @@
+"""
+Asyncio counterparts of Save.LoadFromDAT and SaveToDAT, used by Save.LoadFromDATAsync and SaveToDATAsync.
+Decrypting, parsing and compiling run in an executor (the default thread pool of the loop by default),
+at most `limit` saves at a time, so the event loop isn't blocked and isn't starved by many saves at once.
+With a ProcessPoolExecutor only decrypting with parsing to json and encrypting run in processes, they take
+and return plain data. Saves aren't sent between processes: they're analyzed and compiled in the default
+thread pool of the loop:
+
+    save = await Save.LoadFromDATAsync(request.content)  # aiohttp StreamReader
+    await save.SaveToDATAsync(response)
+
+Sources are bytes, async iterables of chunks or objects with `async read()`, they are read whole on the loop
+before the save is processed. Sinks are objects with `write` (a coroutine or plain method, `drain` is awaited
+if present, like asyncio.StreamWriter) or async callables.
+"""
+import asyncio
+import contextvars
+import functools
+import inspect
+import os
+import weakref
+from collections.abc import AsyncIterable, Awaitable, Callable
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, TypeAlias, TypeVar
+
+import tools.decompressing
+import tools.plist
+from classes.save import S, Save, compress_levels
+
+__all__ = ('ByteSource', 'ByteSink', 'DEFAULT_LIMIT', 'default_limit', 'read_source', 'write_sink', 'load_from_dat', 'save_to_dat')
+
+T = TypeVar('T')
+
+ByteSource: TypeAlias = bytes | bytearray | memoryview | AsyncIterable[bytes] | Any  # Any with `async read()`
+ByteSink: TypeAlias = Callable[[bytes], Awaitable[Any]] | Any  # Any with `write`
+
+DEFAULT_LIMIT = os.cpu_count() or 4
+
+_limits: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]' = weakref.WeakKeyDictionary()
+
+
+def default_limit() -> asyncio.Semaphore:
+    """ limit of saves processed at once in the running loop, shared by all calls without `limit` """
+    loop = asyncio.get_running_loop()
+    limit = _limits.get(loop, None)
+    if limit is None:
+        limit = _limits[loop] = asyncio.Semaphore(DEFAULT_LIMIT)
+    return limit
+
+
+async def read_source(source: ByteSource) -> bytes:
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source)
+    read = getattr(source, 'read', None)
+    if read is not None:
+        return await read()
+    if isinstance(source, AsyncIterable):
+        return b''.join([chunk async for chunk in source])
+    raise TypeError(f"Can't read save from {type(source).__name__}")
+
+
+async def write_sink(sink: ByteSink, data: bytes):
+    write = getattr(sink, 'write', None)
+    if write is None:
+        if not callable(sink):
+            raise TypeError(f"Can't write save to {type(sink).__name__}")
+        write = sink
+    result = write(data)
+    if inspect.isawaitable(result):
+        await result
+    drain = getattr(sink, 'drain', None)
+    if drain is not None:
+        await drain()
+
+
+def _load_json(data: bytes) -> dict:
+    return tools.plist.plist_to_json(tools.decompressing.decrypt_save_xml(data))
+
+
+def _compile_xml(save: Save, compress_level: int) -> bytes:
+    compress_levels(save._loaded_levels(), None, compress_level)
+    return tools.plist.json_to_plist(S[Save].compile(save))
+
+
+def _local(executor: Executor | None) -> Executor | None:
+    """ executor for work with saves, they aren't sent to processes """
+    return None if isinstance(executor, ProcessPoolExecutor) else executor
+
+
+async def _run(func: Callable[..., T], *args, executor: Executor | None) -> T:
+    if not isinstance(executor, ProcessPoolExecutor):  # threads see the context, like asyncio.to_thread
+        func = functools.partial(contextvars.copy_context().run, func)
+    return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+
+
+async def load_from_dat(source: ByteSource,
+                        lazy: bool = False,
+                        executor: Executor | None = None,
+                        limit: asyncio.Semaphore | None = None
+                        ) -> Save:
+    data = await read_source(source)
+    async with limit or default_limit():
+        json_data = await _run(_load_json, data, executor=executor)
+        return await _run((S[Save, 'lazy'] if lazy else S[Save]).analyze, json_data, executor=_local(executor))
+
+
+async def save_to_dat(save: Save,
+                      sink: ByteSink | None = None,
+                      ios_mode: bool = False,
+                      executor: Executor | None = None,
+                      limit: asyncio.Semaphore | None = None,
+                      compress_level: int = tools.decompressing.COMPRESS_LEVEL
+                      ) -> bytes:
+    """ the save must not be changed until it's compiled, the data is written to the sink if it's given """
+    async with limit or default_limit():
+        xml_data = await _run(_compile_xml, save, compress_level, executor=_local(executor))
+        data = await _run(
+            tools.decompressing.encrypt_save_xml, xml_data, ios_mode, compress_level, executor=executor
+        )
+    if sink is not None:
+        await write_sink(sink, data)
+    return data
+
+
+if __name__ == '__main__':
+    async def _main():
+        import classes
+        from classes.save import LevelInfo
+
+        class Chunks:
+            def __init__(self, data: bytes):
+                self.data = data
+
+            def __aiter__(self):
+                return self._chunks()
+
+            async def _chunks(self):
+                for start in range(0, len(self.data), 1000):
+                    yield self.data[start:start + 1000]
+
+        data = Save([LevelInfo('level', '', 0)]).SaveToDAT()
+        saves = await asyncio.gather(*(Save.LoadFromDATAsync(Chunks(data)) for _ in range(8)))
+        print(len(saves), saves[0].get('level').name)  # >>> 8 level
+
+        written = []
+        print(await saves[0].SaveToDATAsync(written.append) == data == written[0])  # >>> True
+
+    asyncio.run(_main())
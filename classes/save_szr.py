@@ -1,12 +1,18 @@
 import base64
+import copy
 import itertools
+from concurrent.futures import ProcessPoolExecutor
 
+import attrs
+
+from ignore_default import original_class
 from serializing import *
 from maker import Maker
 from tools.funcs import pairs_to_dict, dict_to_pairs, Factory
 import tools.decompressing
-from .gd_module import GdModule
+from .gd_module import GdModule, GdIdRef, LazyObjects
 from .save import *
+from .save import _Levels
 
 S = SerializingFamily.get('save')
 
@@ -28,15 +34,107 @@ field.setup(serializer=True)
 field(...).setup()
 
 gd_object_szr = SerializingFamily.get('gd_object')['GdObject']
+gd_object_compact_szr = SerializingFamily.get('gd_object')['GdObject', 'compact']
+
+
+@attrs.frozen
+class _IdValue:
+    """ GdIdRef sent between processes by its value """
+    klass: type[GdIdRef]
+    value: int
+
+
+@attrs.frozen
+class _AttrsValue:
+    """ attrs instance sent between processes, values of attrs.fields(klass) """
+    klass: type
+    values: tuple
+
+    def bind(self):
+        obj_kwargs, not_init = {}, []
+        for attribute, value in zip(attrs.fields(self.klass), map(_bind_ids, self.values)):
+            if attribute.init:
+                obj_kwargs[attribute.alias] = value
+            else:
+                not_init.append((attribute.name, value))
+        obj = self.klass(**obj_kwargs)
+        for name, value in not_init:
+            object.__setattr__(obj, name, value)
+        return obj
+
+
+def _unbind_ids(value):
+    """ replaces GdIdRef with its value in objects data, so it doesn't depend on the module """
+    if isinstance(value, GdIdRef):
+        return _IdValue(type(value), value.get_value())
+    if isinstance(value, list):
+        return [_unbind_ids(val) for val in value]
+    if isinstance(value, dict):
+        return {key: _unbind_ids(val) for key, val in value.items()}
+    if attrs.has(type(value)):
+        return _AttrsValue(type(value), tuple(_unbind_ids(getattr(value, a.name)) for a in attrs.fields(type(value))))
+    return value
+
+
+def _bind_ids(value):
+    """ inverse to _unbind_ids, binds values to the module in context """
+    if isinstance(value, _IdValue):
+        return value.klass(value.value)
+    if isinstance(value, list):
+        return [_bind_ids(val) for val in value]
+    if isinstance(value, dict):
+        return {key: _bind_ids(val) for key, val in value.items()}
+    if isinstance(value, _AttrsValue):
+        return value.bind()
+    return value
+
+
+def _analyze_objects(objects: list[str], compact: bool = False) -> list[tuple[type, dict]]:
+    """ process pool worker, analyzes objects in a separate module """
+    serializer = gd_object_compact_szr if compact else gd_object_szr
+    with GdModule():
+        # compact classes aren't pickled by name, they are sent as the original class
+        return [(original_class(type(obj)), _unbind_ids(obj.__getstate__())) for obj in map(serializer.analyze, objects)]
+
+
+def _analyze_objects_parallel(objects: list[str], workers: int, compact: bool = False) -> list:
+    chunk_size = -(-len(objects) // (workers * 4)) or 1
+    chunks = [objects[i:i + chunk_size] for i in range(0, len(objects), chunk_size)]
+    result = []
+    with ProcessPoolExecutor(workers) as executor:
+        for chunk in executor.map(_analyze_objects, chunks, itertools.repeat(compact)):
+            for klass, state in chunk:
+                if compact and klass in gd_object_compact_szr.compact_classes:  # not every class has a compact class
+                    klass = gd_object_compact_szr.compact_classes[klass]
+                    obj = klass.__new__(klass)
+                    obj.__setstate__(_bind_ids(state))
+                else:
+                    obj = object.__new__(klass)
+                    object.__setattr__(obj, '__dict__', _bind_ids(state))
+                result.append(obj)
+    return result
 
 
 class LevelSerializer(Base):
-    def __init__(self, level_data_serializer: Base):
+    """
+    With lazy_objects=True module.objects is LazyObjects, objects are analyzed on access.
+    With compact=True objects are analyzed to compact classes, see GdObjectSerialzier.
+    """
+
+    def __init__(self, level_data_serializer: Base, lazy_objects: bool = False, compact: bool = False):
         self.level_data_serializer = level_data_serializer
+        self.lazy_objects = lazy_objects
+        self.compact = compact
+        self.objects_serializer = gd_object_compact_szr if compact else gd_object_szr
 
-    def analyze(self, info: LevelInfo):
-        data = tools.decompressing.decompress(info.data.encode('utf-8')).decode('utf-8')
-        settings, *objects, _ = data.split(';')
+    def analyze(self, info: LevelInfo, workers: int | None = None, level_string: str | None = None):
+        """
+        workers: analyze objects in a process pool, gd_ids are bound to the module afterwards
+        level_string: info.level_string() if the caller already has it
+        """
+        if level_string is None:
+            level_string = info.level_string()
+        settings, *objects, _ = level_string.split(';')
         module = GdModule()
         with module:
             level = self.level_data_serializer.analyze({
@@ -44,26 +142,54 @@ class LevelSerializer(Base):
                 'settings': pairs_to_dict(settings.split(',')),
                 'module': module,
             })
+        if self.lazy_objects:
+            module.objects = LazyObjects(module, self.objects_serializer, objects)
+            return level
         with level:
-            module.objects = [gd_object_szr.analyze(obj) for obj in objects]
+            if workers is not None and workers > 1:
+                module.objects = _analyze_objects_parallel(objects, workers, self.compact)
+            else:
+                module.objects = [self.objects_serializer.analyze(obj) for obj in objects]
         return level
 
-    def compile(self, level, data=None):
+    def compile_level_string(self, level) -> str:
+        """ uncompressed data of the level """
         with level:
-            objects = [gd_object_szr.compile(obj) for obj in level.module.objects]
+            objects = level.module.objects
+            if hasattr(objects, 'iter_raw'):  # LazyObjects, ColumnarObjects
+                objects = objects.iter_raw()
+            objects = [obj if isinstance(obj, str) else gd_object_szr.compile(obj) for obj in objects]
             dct = self.level_data_serializer.compile(level)
             info, settings, _ = dct['info'], dct['settings'], dct['module']
             settings = ','.join(dict_to_pairs(settings))
-        data = ';'.join(itertools.chain((settings,), objects, ('',)))
-        data = tools.decompressing.compress(data.encode('utf-8')).decode('utf-8')
-        return data
+        return ';'.join(itertools.chain((settings,), objects, ('',)))
+
+    def compile(self, level, data=None):
+        return tools.decompressing.compress(self.compile_level_string(level).encode('utf-8')).decode('utf-8')
 
 
-S[Level] = LevelSerializer(MultiField(
+level_data_serializer = MultiField(
     field[...]('info'),
     field[...]('settings'),
     field[...]('module'),
-) >> ToClass(Level))
+) >> ToClass(Level)
+
+S[Level] = LevelSerializer(level_data_serializer)
+S[Level, 'lazy'] = LevelSerializer(level_data_serializer, lazy_objects=True)
+S[Level, 'compact'] = LevelSerializer(level_data_serializer, compact=True)
+S[Level, 'lazy', 'compact'] = LevelSerializer(level_data_serializer, lazy_objects=True, compact=True)
+
+def _compressed(info: LevelInfo) -> LevelInfo:
+    """
+    Levels changed by LevelInfo.decompress are compiled with compressed data, the level itself isn't changed.
+    Save.SaveToDAT compresses them before compiling, so it's done once.
+    """
+    if info.is_compressed():
+        return info
+    compressed = copy.copy(info)
+    compressed.compress_data()
+    return compressed
+
 
 S[LevelInfo] = WrapKeys(
     key[...]('k1', 'id'),
@@ -115,7 +241,7 @@ S[LevelInfo] = WrapKeys(
     field[...]('data'),
     field[...]('description'),
     field[...]('unused', Key(...)),
-) >> ToClass(LevelInfo)
+) >> ToClass(LevelInfo) >> Func(None, _compressed)
 
 
 def check_llm_03(data):
@@ -127,8 +253,33 @@ def check_llm_03(data):
             print(f'LocalLevelsSave.LLM_03 has a value: {data}')
 
 
-S[Save] = WrapKeys(
-    key[...]('LLM_01', 'levels', List(S[LevelInfo])),
-    key[int]('LLM_02', 'version'),
-    key[...]('LLM_03', None, Func(check_llm_03), default_data=Factory(list)),
-) >> ToClass(Save)
+class LevelHandleSerializer(Base):
+    """ In lazy mode analyzes only name and revision to LevelHandle. Compiles not loaded handles verbatim. """
+
+    def __init__(self, serializer: Base, lazy: bool):
+        self.serializer = serializer
+        self.lazy = lazy
+
+    def analyze(self, data: dict):
+        if not self.lazy:
+            return self.serializer.analyze(data)
+        return LevelHandle(data.get('k2'), data.get('k46', 0), data)
+
+    def compile(self, value: LevelInfo | LevelHandle, data=None):
+        if isinstance(value, LevelHandle):
+            if not value.is_loaded():
+                return value.raw
+            value = value.info
+        return self.serializer.compile(value, data)
+
+
+def make_save_serializer(lazy: bool) -> Base:
+    return WrapKeys(
+        key[...]('LLM_01', 'levels', List(LevelHandleSerializer(S[LevelInfo], lazy)) >> Func(_Levels, list)),
+        key[int]('LLM_02', 'version'),
+        key[...]('LLM_03', None, Func(check_llm_03), default_data=Factory(list)),
+    ) >> ToClass(Save)
+
+
+S[Save] = make_save_serializer(lazy=False)
+S[Save, 'lazy'] = make_save_serializer(lazy=True)
@@ -0,0 +1,321 @@
+"""
+Spatial index of module objects, used by GdModule.objects_in_rect, objects_near and objects_in_column.
+Objects are kept in a uniform grid of cells by x/y (30 units - a block - by default). The index is created
+on the first query and updated by change notifications (see classes.observe): appended, removed and moved
+objects are reindexed one by one.
+ColumnarObjects aren't indexed, their coordinate columns are scanned as arrays (requires numpy).
+"""
+import math
+from collections.abc import Callable, Iterable, Iterator
+from operator import itemgetter
+from typing import Any, TypeAlias, TYPE_CHECKING
+
+from python.named_const import Missed
+from .gd_module import GdModule
+from .observe import ObjectsObserver
+
+if TYPE_CHECKING:
+    from tools.vector2 import Vector2
+
+__all__ = ('CELL_SIZE', 'Filter', 'SpatialIndex', 'spatial_index', 'objects_in_rect', 'objects_near', 'objects_in_column')
+
+CELL_SIZE = 30.
+
+Filter: TypeAlias = 'None | type | tuple[type, ...] | Callable[[Any], bool]'
+
+Cell: TypeAlias = tuple[int, int]
+
+
+def _predicate(where: Filter) -> Callable[[Any], bool] | None:
+    if where is None or callable(where) and not isinstance(where, type):
+        return where
+    return lambda obj: isinstance(obj, where)
+
+
+def _position(obj) -> tuple[float, float] | None:
+    x = getattr(obj, 'x', Missed)
+    y = getattr(obj, 'y', Missed)
+    if x is Missed or y is Missed:
+        return None
+    return x, y
+
+
+def _ring(cx: int, cy: int, radius: int) -> Iterator[Cell]:
+    """ cells at chebyshev distance `radius` from (cx, cy) """
+    if radius == 0:
+        yield cx, cy
+        return
+    for x in range(cx - radius, cx + radius + 1):
+        yield x, cy - radius
+        yield x, cy + radius
+    for y in range(cy - radius + 1, cy + radius):
+        yield cx - radius, y
+        yield cx + radius, y
+
+
+class SpatialIndex(ObjectsObserver):
+    """
+    Grid of objects by their cells. Objects without x or y aren't found by queries until they get both.
+    Queries return objects in no particular order unless stated otherwise.
+    """
+
+    def __init__(self, objects: Iterable[Any] = (), cell_size: float = CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells: dict[Cell, dict[int, Any]] = {}  # cell -> {id(obj): obj}
+        self.columns: dict[int, set[int]] = {}  # cx -> cy of not empty cells
+        self.unplaced: dict[int, Any] = {}  # objects without position
+        self._cell_of: dict[int, Cell | None] = {}
+        self._count: dict[int, int] = {}  # the same object can be in module.objects several times
+        self.added(objects)
+
+    def __len__(self):
+        return len(self._count)
+
+    def __contains__(self, obj):
+        return id(obj) in self._count
+
+    def cell(self, x: float, y: float) -> Cell:
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def _place(self, obj):
+        key = id(obj)
+        x = getattr(obj, 'x', Missed)
+        y = getattr(obj, 'y', Missed)
+        if x is Missed or y is Missed:
+            self._cell_of[key] = None
+            self.unplaced[key] = obj
+            return
+        cell = self._cell_of[key] = (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+        bucket = self.cells.get(cell)
+        if bucket is None:
+            bucket = self.cells[cell] = {}
+            self.columns.setdefault(cell[0], set()).add(cell[1])
+        bucket[key] = obj
+
+    def _unplace(self, key: int):
+        cell = self._cell_of.pop(key)
+        if cell is None:
+            del self.unplaced[key]
+            return
+        bucket = self.cells[cell]
+        del bucket[key]
+        if not bucket:
+            del self.cells[cell]
+            column = self.columns[cell[0]]
+            column.discard(cell[1])
+            if not column:
+                del self.columns[cell[0]]
+
+    # ObjectsObserver
+
+    def added(self, objects: Iterable[Any]):
+        for obj in objects:
+            key = id(obj)
+            count = self._count.get(key, 0)
+            self._count[key] = count + 1
+            if not count:
+                self._place(obj)
+
+    def removed(self, objects: Iterable[Any]):
+        for obj in objects:
+            key = id(obj)
+            count = self._count.get(key)
+            if count is None:
+                continue
+            if count > 1:
+                self._count[key] = count - 1
+                continue
+            del self._count[key]
+            self._unplace(key)
+
+    def changed(self, obj, name: str):
+        if name != 'x' and name != 'y':
+            return
+        key = id(obj)
+        cell = self._cell_of.get(key, Missed)
+        if cell is Missed:
+            return
+        position = _position(obj)
+        if position is not None and cell == self.cell(*position):
+            return
+        self._unplace(key)
+        self._place(obj)
+
+    def reset(self, objects: Iterable[Any]):
+        self.cells.clear()
+        self.columns.clear()
+        self.unplaced.clear()
+        self._cell_of.clear()
+        self._count.clear()
+        self.added(objects)
+
+    # queries
+
+    def objects_in_rect(self, x0: float, y0: float, x1: float, y1: float, where: Filter = None) -> list:
+        """ objects with x0 <= x <= x1 and y0 <= y <= y1 """
+        x0, x1 = min(x0, x1), max(x0, x1)
+        y0, y1 = min(y0, y1), max(y0, y1)
+        cx0, cy0 = self.cell(x0, y0)
+        cx1, cy1 = self.cell(x1, y1)
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) <= len(self.cells):
+            buckets = (self.cells.get((cx, cy)) for cx in range(cx0, cx1 + 1) for cy in range(cy0, cy1 + 1))
+        else:  # the rect is bigger than the filled part of the grid
+            buckets = (bucket for (cx, cy), bucket in self.cells.items() if cx0 <= cx <= cx1 and cy0 <= cy <= cy1)
+        predicate = _predicate(where)
+        result = []
+        for bucket in buckets:
+            if not bucket:
+                continue
+            for obj in bucket.values():
+                if x0 <= obj.x <= x1 and y0 <= obj.y <= y1 and (predicate is None or predicate(obj)):
+                    result.append(obj)
+        return result
+
+    def objects_near(self,
+                     center: 'Vector2 | tuple[float, float]',
+                     radius: float = math.inf,
+                     where: Filter = None,
+                     limit: int | None = None
+                     ) -> list:
+        """
+        Objects within the radius sorted by distance, the nearest `limit` of them.
+        Cells are visited ring by ring, so objects_near(center, where=Trigger, limit=1) doesn't scan the whole level.
+        """
+        if _zero_limit(limit):
+            return []
+        x, y = center
+        predicate = _predicate(where)
+        cx, cy = self.cell(x, y)
+        last_ring = math.ceil(radius / self.cell_size) if radius != math.inf else math.inf
+        squared_radius = radius * radius
+        found: list[tuple[float, Any]] = []
+
+        def collect(bucket: dict[int, Any]):
+            for obj in bucket.values():
+                squared = (obj.x - x) ** 2 + (obj.y - y) ** 2
+                if squared <= squared_radius and (predicate is None or predicate(obj)):
+                    found.append((squared, obj))
+
+        ring = 0
+        visited = 0
+        while ring <= last_ring and visited < len(self.cells):
+            if (2 * ring + 1) ** 2 > 2 * len(self.cells):  # rings are bigger than the filled part of the grid
+                for (x_, y_), bucket in self.cells.items():
+                    if max(abs(x_ - cx), abs(y_ - cy)) >= ring:
+                        collect(bucket)
+                break
+            for cell in _ring(cx, cy, ring):
+                bucket = self.cells.get(cell)
+                if bucket is not None:
+                    visited += 1
+                    collect(bucket)
+            if limit is not None and len(found) >= limit:
+                found.sort(key=itemgetter(0))
+                if found[limit - 1][0] <= (ring * self.cell_size) ** 2:  # not visited cells are farther
+                    break
+            ring += 1
+        found.sort(key=itemgetter(0))
+        return [obj for _, obj in found[:limit]]
+
+    def objects_in_column(self, x: float, where: Filter = None) -> list:
+        """ objects in the column of cells containing x, sorted by y """
+        cx = self.cell(x, 0.)[0]
+        predicate = _predicate(where)
+        result = [
+            obj
+            for cy in self.columns.get(cx, ())
+            for obj in self.cells[cx, cy].values()
+            if predicate is None or predicate(obj)
+        ]
+        result.sort(key=lambda obj: obj.y)
+        return result
+
+
+def _zero_limit(limit: int | None) -> bool:
+    if limit is not None and limit < 0:
+        raise ValueError(f'limit must not be negative, not {limit}')
+    return limit == 0
+
+
+def _is_columnar(module: GdModule) -> bool:
+    return hasattr(module.objects, 'class_codes')
+
+
+def spatial_index(module: GdModule, cell_size: float | None = None) -> SpatialIndex:
+    """
+    Index of the module, created on first use and kept up to date afterwards.
+    cell_size: rebuild the index with other cells, by default the existing index or CELL_SIZE.
+    """
+    if _is_columnar(module):
+        raise TypeError("ColumnarObjects aren't indexed, query them by the module")
+    index = module.observers.get(SpatialIndex)
+    if index is None or cell_size is not None and index.cell_size != cell_size:
+        index = module.observe(SpatialIndex, SpatialIndex(cell_size=cell_size or CELL_SIZE))
+    return index
+
+
+def _columnar_positions(module: GdModule, where: Filter):
+    """ indexes and coordinates of ColumnarObjects with both x and y """
+    from .bulk import _Selected
+    selected = _Selected(module, where)
+    present, x, y = selected.positions()
+    return selected.indices[present], x, y
+
+
+def objects_in_rect(module: GdModule, x0: float, y0: float, x1: float, y1: float, where: Filter = None) -> list:
+    if not _is_columnar(module):
+        return spatial_index(module).objects_in_rect(x0, y0, x1, y1, where)
+    indices, x, y = _columnar_positions(module, where)
+    mask = (min(x0, x1) <= x) & (x <= max(x0, x1)) & (min(y0, y1) <= y) & (y <= max(y0, y1))
+    return [module.objects[i] for i in indices[mask].tolist()]
+
+
+def objects_near(module: GdModule,
+                 center: 'Vector2 | tuple[float, float]',
+                 radius: float = math.inf,
+                 where: Filter = None,
+                 limit: int | None = None
+                 ) -> list:
+    if not _is_columnar(module):
+        return spatial_index(module).objects_near(center, radius, where, limit)
+    if _zero_limit(limit):
+        return []
+    import numpy as np
+    x, y = center
+    indices, xs, ys = _columnar_positions(module, where)
+    squared = (xs - x) ** 2 + (ys - y) ** 2
+    inside = np.flatnonzero(squared <= radius * radius)
+    inside = inside[np.argsort(squared[inside], kind='stable')][:limit]
+    return [module.objects[i] for i in indices[inside].tolist()]
+
+
+def objects_in_column(module: GdModule, x: float, where: Filter = None) -> list:
+    """ the column is CELL_SIZE wide for ColumnarObjects """
+    if not _is_columnar(module):
+        return spatial_index(module).objects_in_column(x, where)
+    import numpy as np
+    indices, xs, ys = _columnar_positions(module, where)
+    inside = np.flatnonzero(np.floor(xs / CELL_SIZE) == math.floor(x / CELL_SIZE))
+    inside = inside[np.argsort(ys[inside], kind='stable')]
+    return [module.objects[i] for i in indices[inside].tolist()]
+
+
+if __name__ == '__main__':
+    def _main():
+        import classes
+        from classes import gd_object as gd
+        from classes.gd_id import Group
+
+        module = GdModule()
+        with module:
+            module.objects = [gd.GdObjectAnyId(1, x=15. + 30. * i, y=15.) for i in range(10)]
+            module.objects.append(gd.Spawn(x=105., y=45., target=Group(1)))
+            print(len(module.objects_in_rect(0., 0., 90., 30.)))  # >>> 3
+            print([type(obj).__name__ for obj in module.objects_near((100., 100.), where=gd.Trigger, limit=1)])  # >>> ['Spawn']
+
+            module.objects[0].x = 105.
+            print([obj.y for obj in module.objects_in_column(100.)])  # >>> [15.0, 15.0, 45.0]
+            del module.objects[-1]
+            print(module.objects_near((105., 45.), radius=10.))  # >>> []
+
+    _main()
@@ -0,0 +1,370 @@
+"""
+Dependency graph of triggers, returned by GdModule.trigger_graph:
+
+    graph = module.trigger_graph()
+    graph.reachable(spawn)  # triggers and ids affected by the spawn trigger, directly or through other triggers
+    graph.cycles()
+    graph.dead_triggers()
+
+Nodes are triggers and ids (Group, Item, Timer, Block). A trigger points to ids it acts on (TARGETS, Spawn.remapping),
+an id points to triggers that depend on it (SOURCES) and to triggers in the group (`groups`, `parent_groups`).
+The graph is kept up to date by change notifications (see classes.observe): only edges of a changed trigger
+are rebuilt, results of queries are cached until edges change.
+In-place changes of `remapping` aren't seen, assign it again. Groups in `unused` are observed as in
+classes.group_index, their changes in place are seen.
+Spawn.remapping values without gd_ids in the module get edges when they get gd_ids, before the next query.
+"""
+from collections import deque
+from collections.abc import Iterable
+from functools import cache
+from typing import Any, Callable, TypeAlias
+import weakref
+
+from ignore_default import SafeGet
+from . import gd_object as gd
+from .enums import Triggered
+from .gd_id import Group
+from .gd_module import GdModule, GdId, GdIdRef, GdIdType
+from .group_index import _gd_ids, _observe_groups
+from .observe import ObjectsObserver
+
+__all__ = ('TARGETS', 'SOURCES', 'TriggerGraph', 'trigger_graph')
+
+# fields of ids the trigger acts on
+TARGETS: dict[type, tuple[str, ...]] = {
+    gd.TargetTrigger: ('target',),
+    gd.InstantCollision: ('target_false',),
+    gd.CollisionState: ('target_exit',),
+    gd.ItemCompare: ('target_false',),
+    gd.Pickup: ('item',),
+    gd.ItemEdit: ('result',),
+    gd.ItemPersistent: ('target',),
+}
+
+# fields of ids the trigger depends on
+SOURCES: dict[type, tuple[str, ...]] = {
+    gd.Count: ('item',),
+    gd.InstantCount: ('item',),
+    gd.CollisionBase: ('block_a', 'block_b'),
+    gd.ItemEdit: ('a', 'b'),
+    gd.ItemCompare: ('a', 'b'),
+    gd.MoveTo: ('center', 'target_pos'),
+    gd.MoveAt: ('center', 'target_pos'),
+    gd.Rotate: ('center',),
+}
+
+SPAWN_TRIGGERED = frozenset((Triggered.Spawn, Triggered.SpawnMulti))
+
+Key: TypeAlias = 'int | GdId'  # id(trigger) or GdId
+Edge: TypeAlias = tuple[Key, Key, str]  # source, target, field name
+
+_EMPTY = frozenset(tp.constants[0] for tp in GdIdType.all.values() if 0 in tp.constants)
+
+
+def _class(obj) -> type:
+    """ class of the object or of ObjectView """
+    klass = type(obj)
+    return klass if issubclass(klass, gd.GdObjectBase) else obj.klass
+
+
+@cache
+def _fields(klass: type) -> tuple[tuple[str, bool], ...]:
+    """ (name, is target) of id fields of the trigger class """
+    fields = {}
+    for base in reversed(klass.__mro__):
+        fields.update(dict.fromkeys(TARGETS.get(base, ()), True))
+        fields.update(dict.fromkeys(SOURCES.get(base, ()), False))
+    return tuple(fields.items())
+
+
+WATCHED = frozenset(
+    name for table in (TARGETS, SOURCES) for names in table.values() for name in names
+) | {'remapping', 'unused', 'triggered'}
+
+
+class TriggerGraph(ObjectsObserver):
+    """ Triggers and ids, see the module doc. Queries take and return triggers and GdIdRef (e.g. Group(1)). """
+
+    def __init__(self, module: GdModule, objects: Iterable[Any] = ()):
+        self._module = weakref.ref(module)  # Spawn.remapping values are resolved in the module
+        self.triggers: dict[int, Any] = {}
+        self._count: dict[int, int] = {}  # the same object can be in module.objects several times
+        self._edges_of: dict[int, tuple[Edge, ...]] = {}
+        self._unresolved: dict[int, tuple[int, ...]] = {}  # remapping values without gd_ids of triggers
+        self._succ: dict[Key, dict[Key, int]] = {}  # node -> {successor: number of edges}
+        self._pred: dict[Key, dict[Key, int]] = {}
+        self._cache: dict[Any, Any] = {}
+        self.added(objects)
+
+    def __len__(self):
+        return len(self.triggers)
+
+    def __contains__(self, node):
+        if isinstance(node, GdIdRef):
+            return node.ref in self._succ or node.ref in self._pred
+        return id(node) in self.triggers
+
+    # edges
+
+    def _extract(self, key: int) -> tuple[tuple[Edge, ...], tuple[int, ...]]:
+        """ edges of the trigger and its remapping values without gd_ids """
+        obj = self.triggers[key]
+        klass = _class(obj)
+        edges = []
+        unresolved = []
+        with SafeGet:
+            for name, is_target in _fields(klass):
+                ref = getattr(obj, name, None)
+                if isinstance(ref, GdIdRef) and ref.ref not in _EMPTY:
+                    edges.append((key, ref.ref, name) if is_target else (ref.ref, key, name))
+            remapping = getattr(obj, 'remapping', None) if issubclass(klass, gd.Spawn) else None
+            if isinstance(remapping, dict) and remapping:
+                registered = self._module().ids[Group].values.inverse  # get() would register the values
+                for value in remapping.values():
+                    if not value:
+                        continue
+                    gid = registered.get(value, None)
+                    if gid is None:
+                        unresolved.append(value)
+                    else:
+                        edges.append((key, gid, 'remapping'))
+            if klass is type(obj):  # not ObjectView
+                _observe_groups(obj)
+            edges.extend((gid, key, 'groups') for gid in _gd_ids(obj))
+        return tuple(edges), tuple(unresolved)
+
+    def _link(self, key: int):
+        edges, unresolved = self._extract(key)
+        self._edges_of[key] = edges
+        if unresolved:
+            self._unresolved[key] = unresolved
+        for source, target, _ in edges:
+            successors = self._succ.setdefault(source, {})
+            successors[target] = successors.get(target, 0) + 1
+            predecessors = self._pred.setdefault(target, {})
+            predecessors[source] = predecessors.get(source, 0) + 1
+        self._cache.clear()
+
+    def _unlink(self, key: int):
+        self._unresolved.pop(key, None)
+        for source, target, _ in self._edges_of.pop(key):
+            for adjacency, node, other in ((self._succ, source, target), (self._pred, target, source)):
+                nodes = adjacency[node]
+                if nodes[other] > 1:
+                    nodes[other] -= 1
+                    continue
+                del nodes[other]
+                if not nodes:
+                    del adjacency[node]
+        self._cache.clear()
+
+    def edges(self, trigger) -> list[tuple[Any, Any, str]]:
+        """ (source, target, field name) of the trigger, `groups` edges are groups the trigger is in """
+        return [(self._node(source), self._node(target), name) for source, target, name in self._edges_of[self._key(trigger)]]
+
+    # ObjectsObserver
+
+    def added(self, objects: Iterable[Any]):
+        for obj in objects:
+            if not issubclass(_class(obj), gd.Trigger):
+                continue
+            key = id(obj)
+            count = self._count.get(key, 0)
+            self._count[key] = count + 1
+            if not count:
+                self.triggers[key] = obj
+                self._link(key)
+
+    def removed(self, objects: Iterable[Any]):
+        for obj in objects:
+            key = id(obj)
+            count = self._count.get(key)
+            if count is None:
+                continue
+            if count > 1:
+                self._count[key] = count - 1
+                continue
+            del self._count[key]
+            self._unlink(key)
+            del self.triggers[key]
+
+    def changed(self, obj, name: str):
+        key = id(obj)
+        if name in WATCHED and key in self.triggers:
+            self._unlink(key)
+            self._link(key)
+
+    def reset(self, objects: Iterable[Any]):
+        self.triggers.clear()
+        self._count.clear()
+        self._edges_of.clear()
+        self._unresolved.clear()
+        self._succ.clear()
+        self._pred.clear()
+        self._cache.clear()
+        self.added(objects)
+
+    def absorbed(self, gid: GdId, other: GdId):
+        neighbours = {*self._succ.get(other, ()), *self._pred.get(other, ())}
+        for key in neighbours:  # references of these triggers now refer to gid
+            self._unlink(key)
+            self._link(key)
+
+    # queries
+
+    def _resolve(self):
+        """ links remapping values that got gd_ids since their triggers were linked """
+        if not self._unresolved:
+            return
+        registered = self._module().ids[Group].values.inverse
+        for key in [key for key, values in self._unresolved.items() if any(value in registered for value in values)]:
+            self._unlink(key)
+            self._link(key)
+
+    def _key(self, node) -> Key:
+        self._resolve()
+        if isinstance(node, GdIdRef):
+            return node.ref
+        key = id(node)
+        if key not in self.triggers:
+            raise ValueError(f'{type(node).__name__} object is not a trigger of the graph')
+        return key
+
+    def _node(self, key: Key):
+        return self.triggers[key] if isinstance(key, int) else key.get_ref()
+
+    def _cached[T](self, cache_key, compute: Callable[[], T]) -> T:
+        self._resolve()
+        if cache_key not in self._cache:
+            self._cache[cache_key] = compute()
+        return self._cache[cache_key]
+
+    def successors(self, node) -> list:
+        return [self._node(key) for key in self._succ.get(self._key(node), ())]
+
+    def predecessors(self, node) -> list:
+        return [self._node(key) for key in self._pred.get(self._key(node), ())]
+
+    def _reachable(self, start: Key, adjacency: dict[Key, dict[Key, int]]) -> tuple[Key, ...]:
+        seen = set()  # the start is added only if it's reached again
+        queue = deque((start,))
+        order = []
+        while queue:
+            for key in adjacency.get(queue.popleft(), ()):
+                if key not in seen:
+                    seen.add(key)
+                    order.append(key)
+                    queue.append(key)
+        return tuple(order)
+
+    def reachable(self, node, reverse: bool = False) -> list:
+        """
+        Nodes reachable from the node in breadth-first order, the node itself only if it's in a cycle.
+        reverse: nodes the node depends on.
+        """
+        start = self._key(node)
+        adjacency = self._pred if reverse else self._succ
+        keys = self._cached(('reachable', start, reverse), lambda: self._reachable(start, adjacency))
+        return [self._node(key) for key in keys]
+
+    def _strongly_connected(self) -> tuple[tuple[Key, ...], ...]:
+        """ Tarjan's algorithm without recursion, components of more than one node """
+        index: dict[Key, int] = {}
+        low: dict[Key, int] = {}
+        stack: list[Key] = []
+        on_stack: set[Key] = set()
+        components = []
+        for root in [*self.triggers, *self._succ]:
+            if root in index:
+                continue
+            index[root] = low[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(self._succ.get(root, ())))]
+            while work:
+                node, successors = work[-1]
+                for successor in successors:
+                    if successor not in index:
+                        index[successor] = low[successor] = len(index)
+                        stack.append(successor)
+                        on_stack.add(successor)
+                        work.append((successor, iter(self._succ.get(successor, ()))))
+                        break
+                    if successor in on_stack:
+                        low[node] = min(low[node], index[successor])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        low[parent] = min(low[parent], low[node])
+                    if low[node] == index[node]:
+                        component = []
+                        while True:
+                            key = stack.pop()
+                            on_stack.discard(key)
+                            component.append(key)
+                            if key == node:
+                                break
+                        if len(component) > 1:
+                            components.append(tuple(reversed(component)))
+        return tuple(components)
+
+    def cycles(self) -> list[list]:
+        """ strongly connected components: triggers and ids that activate each other in a loop """
+        components = self._cached('cycles', self._strongly_connected)
+        return [[self._node(key) for key in component] for component in components]
+
+    def _dead(self) -> tuple[int, ...]:
+        dead = []
+        for key, obj in self.triggers.items():
+            if getattr(obj, 'triggered', Triggered.Coord) not in SPAWN_TRIGGERED:
+                continue
+            groups = [source for source, _, name in self._edges_of[key] if name == 'groups']
+            if not any(gid in self._pred for gid in groups):
+                dead.append(key)
+        return tuple(dead)
+
+    def dead_triggers(self) -> list:
+        """ spawn triggered triggers that no trigger targets: none of their groups is a target of a trigger """
+        return [self.triggers[key] for key in self._cached('dead', self._dead)]
+
+
+def trigger_graph(module: GdModule) -> TriggerGraph:
+    """
+    Graph of the module, created on first use and kept up to date afterwards.
+    For ColumnarObjects a new graph of ObjectView is built every time, it isn't updated.
+    """
+    if hasattr(module.objects, 'class_codes'):
+        objects = module.objects
+        mask = objects.class_mask(gd.Trigger)
+        return TriggerGraph(module, [objects[i] for i in range(len(objects)) if mask[i]])
+    graph = module.observers.get(TriggerGraph)
+    if graph is None:
+        graph = module.observe(TriggerGraph, TriggerGraph(module))
+    return graph
+
+
+if __name__ == '__main__':
+    def _main():
+        import classes
+
+        module = GdModule()
+        with module:
+            spawn = gd.Spawn(x=0., y=0., target=Group(1))
+            loop = gd.Spawn(x=30., y=0., target=Group(2), triggered=Triggered.Spawn)
+            loop.unused = {'groups': [Group(1)]}
+            back = gd.Spawn(x=60., y=0., target=Group(1), triggered=Triggered.Spawn)
+            back.unused = {'groups': [Group(2)]}
+            lonely = gd.Toggle(x=90., y=0., target=Group(3), triggered=Triggered.Spawn)
+            lonely.unused = {'groups': [Group(4)]}
+            module.objects = [spawn, loop, back, lonely]
+
+            graph = module.trigger_graph()
+            print([type(node).__name__ for node in graph.reachable(spawn)])  # >>> ['Group', 'Spawn', 'Group', 'Spawn']
+            print(len(graph.cycles()[0]))  # >>> 4
+            print(graph.dead_triggers()[0] is lonely)  # >>> True
+
+            back.target = Group(4)
+            print(graph.cycles(), graph.dead_triggers())  # >>> [] []
+
+    _main()
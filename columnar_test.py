@@ -0,0 +1,71 @@
+"""
+ColumnarObjects keep objects as they are, ObjectView reads and writes them in the store.
+"""
+import classes
+from classes import gd_object as gd
+from classes.gd_id import Group
+from classes.gd_module import GdModule
+from classes.save_szr import gd_object_szr
+
+
+def _module() -> GdModule:
+    module = GdModule()
+    with module:
+        module.objects = [gd.GdObjectAnyId(1, x=float(i * 30), y=0.) for i in range(5)]
+        module.objects.append(gd.MoveBy(x=0., y=30., target=Group(3), move_x=60))
+        module.objects[0].unused = {'z_order': 3, 'groups': [Group(1), Group(2)], 'unknown': '7'}
+    return module
+
+
+def _compiled(module: GdModule) -> list[str]:
+    with module:
+        return [gd_object_szr.compile(obj) for obj in module.objects.iter_raw()]
+
+
+def test_same_objects():
+    module = _module()
+    with module:
+        expected = [gd_object_szr.compile(obj) for obj in module.objects]
+    module.to_columnar()
+    assert _compiled(module) == expected
+
+
+def test_unused_is_written_through():
+    module = _module()
+    objects = module.to_columnar()
+    with module:
+        view = objects[0]
+        view.unused['z_order'] = 5
+        assert objects.values('z_order')[0] == 5
+        view.unused['unknown'] = '8'
+        del view.unused['groups']
+        assert dict(objects[0].unused) == {'z_order': 5, 'unknown': '8'}
+        assert not objects.present('z_order')[1]
+
+        view.unused['groups'] = [*view.unused.get('groups', []), Group(4)]
+        assert objects[0].unused['groups'] == [Group(4)]
+        objects[1].unused = objects[0].unused
+        assert objects[1].unused == {'z_order': 5, 'unknown': '8', 'groups': [Group(4)]}
+
+        unused = view.unused
+        for key in list(unused):
+            del unused[key]
+        assert len(unused) == 0
+        assert not hasattr(view, 'unused')  # as on the object
+        assert objects.materialize(0) == gd.GdObjectAnyId(1, x=0., y=0.)
+
+
+def test_parent_groups():
+    """ groups in the side table are read through ObjectView.unused """
+    module = _module()
+    with module:
+        module.objects[2].unused = {'parent_groups': [Group(1)]}
+    module.to_columnar()
+    with module:
+        assert [obj.x for obj in module.objects_in_group(1)] == [0., 60.]
+
+
+if __name__ == '__main__':
+    for test in (test_same_objects, test_unused_is_written_through, test_parent_groups):
+        test()
+        print(test.__name__, 'ok')
@@ -0,0 +1,93 @@
+"""
+Compact classes (ignore_default.compact_class) keep attributes in __slots__, defaults still aren't stored.
+Objects analyzed to compact classes are compiled the same as usual ones.
+"""
+import pickle
+
+from attrs import define, field
+
+import classes
+from classes import gd_object as gd
+from classes.gd_module import GdModule
+from classes.save_szr import gd_object_szr, gd_object_compact_szr
+from ignore_default import IgnoreDefault, SafeGet, compact_class, original_class
+from python.named_const import Missed
+
+
+@define(slots=False)
+class Foo(IgnoreDefault):
+    bar: list = field(factory=list)
+    baz: int = 3
+
+
+CompactFoo = compact_class(Foo, ('extra',))
+
+
+def test_compact_class():
+    assert compact_class(Foo) is CompactFoo and compact_class(CompactFoo) is CompactFoo
+    assert original_class(CompactFoo) is Foo and original_class(Foo) is Foo
+    assert issubclass(CompactFoo, Foo) and CompactFoo.__name__ == 'Foo'
+    @define(slots=False)
+    class Bar(IgnoreDefault):
+        def spam(self):
+            pass
+
+    try:
+        compact_class(Bar, ('spam',))
+    except TypeError:
+        pass
+    else:
+        raise AssertionError('class attribute became a slot')
+
+
+def test_defaults_are_not_stored():
+    foo = CompactFoo(baz=5)
+    assert not hasattr(foo, '__dict__') or not foo.__dict__
+    assert foo.__getstate__() == {'bar': Missed, 'baz': 5, 'extra': Missed}
+    assert SafeGet[foo].bar == [] and foo.__getstate__()['bar'] is Missed
+    SafeGet.Not[foo].bar.append(1)
+    assert foo.bar == [1]
+    foo.baz = Missed
+    del foo.bar
+    assert (foo.baz, SafeGet[foo].bar) == (3, [])
+    assert foo.__getstate__() == {'bar': Missed, 'baz': Missed, 'extra': Missed}
+    assert not hasattr(foo, 'extra')
+    foo.extra = 'x'
+    foo.other = 'y'  # not a slot
+    assert foo.__dict__ == {'other': 'y'}
+
+
+def test_state():
+    """ compact classes aren't pickled by name, process pool workers send the state, see classes.save_szr """
+    foo = CompactFoo(bar=[1])
+    foo.extra = 2
+    copy = CompactFoo.__new__(CompactFoo)
+    copy.__setstate__(pickle.loads(pickle.dumps(foo.__getstate__())))
+    assert copy.__getstate__() == foo.__getstate__() and copy.baz == 3
+
+
+def test_gd_objects():
+    objects = [
+        '1,1,2,30,3,15,57,1.2,25,3,6,90',
+        '1,901,2,30,3,15,51,5,28,60,36,1',
+        '1,1268,2,90,3,15,51,2,63,1,442,1.7,36,1',
+        '1,914,2,180,3,0,31,dGV4dA==',
+    ]
+    with GdModule():
+        plain = [gd_object_szr.analyze(data) for data in objects]
+        compact = [gd_object_compact_szr.analyze(data) for data in objects]
+        assert [type(obj) for obj in compact] == [compact_class(type(obj)) for obj in plain]
+        assert all(not getattr(obj, '__dict__', None) for obj in compact)
+        assert [gd_object_szr.compile(obj) for obj in compact] == [gd_object_szr.compile(obj) for obj in plain]
+        assert compact[0].unused == plain[0].unused and compact[1].move_x == 60
+
+        for obj in (compact[1], plain[1]):
+            obj.move_y = 30
+            obj.duration = Missed
+        assert gd_object_szr.compile(compact[1]) == gd_object_szr.compile(plain[1])
+
+
+if __name__ == '__main__':
+    for test in (test_compact_class, test_defaults_are_not_stored, test_state, test_gd_objects):
+        test()
+        print(test.__name__, 'ok')
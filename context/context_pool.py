@@ -6,6 +6,7 @@ from attrs import define, field
 from types import EllipsisType
 
 from contextlib import contextmanager
+from contextvars import ContextVar
 from context.context_prop import ContextNode, ContextProperty
 
 @define
@@ -18,38 +19,46 @@ class ContextPoolProperty[T](ContextProperty):
         self.pool = pool
 
     def get(self) -> T:
-        if not self.stack:
+        stack = self._var.get()
+        if not stack:
             raise RuntimeError(f"ContextPoolProperty {self.name!r} no value")
-        return self.stack[-1]()
+        return stack[-1]()
 
     @contextmanager
     def add(self, node: ContextNode[T]):
-        self.stack.append(node)
+        token = self._push(node)
         try:
-            node.__prop_init__(self, len(self.stack) - 1)
             with self.pool.node_added(self.name), node:
                 yield
         finally:
-            self.stack.pop()
+            self._var.reset(token)
 
 @define
 class ContextPool:
     _props: dict[str, ContextPoolProperty] = field(init=False, factory=dict)
-    nondefaults: set[str] = field(init=False, factory=set)
+    _nondefaults: ContextVar[frozenset[str]] = field(
+        init=False, factory=lambda: ContextVar('ContextPool.nondefaults', default=frozenset()), repr=False, eq=False
+    )
 
     def __getitem__(self, name: str) -> ContextPoolProperty:
         return self._props[name]
 
+    @property
+    def nondefaults(self) -> frozenset[str]:
+        """ names of props with values in the current thread or task """
+        return self._nondefaults.get()
+
     @contextmanager
     def node_added(self, name: str):
-        if name in self.nondefaults:
+        nondefaults = self._nondefaults.get()
+        if name in nondefaults:
             yield
             return
-        self.nondefaults.add(name)
+        token = self._nondefaults.set(nondefaults | {name})
         try:
             yield
         finally:
-            self.nondefaults.remove(name)
+            self._nondefaults.reset(token)
 
     def register(self, *names: str, **props: ContextPoolProperty):
         for name in names:
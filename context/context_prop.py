@@ -1,6 +1,7 @@
 from typing import Generic, TypeVar, Callable
 from attrs import define, field
 from contextlib import contextmanager
+from contextvars import ContextVar, Token
 
 T = TypeVar("T")
 
@@ -56,24 +57,37 @@ class ContextProperty(Generic[T]):
         print(prop.get())  # -> 42
         with prop.add_func_edit(lambda x: x+1):
             print(prop.get())  # -> 43
+
+    The stack is kept in a contextvar, so every thread and asyncio task has its own values.
     """
 
-    stack: list[ContextNode[T]] = field(init=False, factory=list)
+    _var: ContextVar[tuple[ContextNode[T], ...]] = field(
+        init=False, factory=lambda: ContextVar('ContextProperty.stack', default=()), repr=False, eq=False
+    )
+
+    @property
+    def stack(self) -> tuple[ContextNode[T], ...]:
+        return self._var.get()
 
     def get(self) -> T:
-        if not self.stack:
+        stack = self._var.get()
+        if not stack:
             raise RuntimeError("ContextProperty no value")
-        return self.stack[-1]()
+        return stack[-1]()
+
+    def _push(self, node: ContextNode[T]) -> Token:
+        stack = self._var.get()
+        node.__prop_init__(self, len(stack))
+        return self._var.set(stack + (node,))
 
     @contextmanager
     def add(self, node: ContextNode[T]):
-        self.stack.append(node)
+        token = self._push(node)
         try:
-            node.__prop_init__(self, len(self.stack)-1)
             with node:
                 yield
         finally:
-            self.stack.pop()
+            self._var.reset(token)
 
     def add_value(self, value: T):
         return self.add(ContextNodeValue(value))
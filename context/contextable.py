@@ -1,4 +1,5 @@
 from contextlib import contextmanager
+from contextvars import ContextVar
 from .simple_context import SimpleContext
 from typing import TypeVar, Type
 
@@ -8,25 +9,29 @@ _Missed = object()
 
 
 class Contextable(SimpleContext):
-    _context_stack: list = None
+    """ instances in context are kept in a contextvar, so every thread and asyncio task has its own stack """
+    _context_var: ContextVar[tuple | None] = None  # stack as linked nodes (instance, previous node)
 
     def __init_subclass__(cls, **kwargs):
-        cls._context_stack = []
+        cls._context_var = ContextVar(f'{cls.__qualname__}._context_var', default=None)
         super().__init_subclass__(**kwargs)
 
     @contextmanager
     def __context__(self):
-        self.__class__._context_stack.append(self)
+        var = self.__class__._context_var
+        token = var.set((self, var.get()))
         try:
             yield self
         finally:
-            assert self.__class__._context_stack.pop() is self
+            assert var.get()[0] is self
+            var.reset(token)
 
     @classmethod
     def C(cls: Type[T], default: T | None = _Missed) -> T | None:
         """ Current instance in context """
-        if cls._context_stack:
-            return cls._context_stack[-1]
+        node = cls._context_var.get()
+        if node is not None:
+            return node[0]
         if default is _Missed:
             raise RuntimeError(f'{cls.__name__}: no context')
         return default
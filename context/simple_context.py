@@ -1,4 +1,5 @@
 from contextlib import contextmanager
+from contextvars import ContextVar
 import abc
 
 class SimpleContext(abc.ABC):
@@ -21,7 +22,8 @@ class SimpleContext(abc.ABC):
     with foo:  # the same effect
         ...
     """
-    __global_context_stack = []
+    # the manager entered last by `with` and the token restoring the previous one, per thread and asyncio task
+    __managers: ContextVar[list | None] = ContextVar('SimpleContext.__managers', default=None)
 
     @contextmanager
     def __context__(self):
@@ -31,10 +33,12 @@ class SimpleContext(abc.ABC):
     def __enter__(self):
         manager = self.__context__()
         value = manager.__enter__()
-        SimpleContext.__global_context_stack.append(manager)
+        node = [manager, None]
+        node[1] = SimpleContext.__managers.set(node)
         return value
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        manager = SimpleContext.__global_context_stack.pop()
+        manager, token = SimpleContext.__managers.get()
+        SimpleContext.__managers.reset(token)
         return manager.__exit__(exc_type, exc_val, exc_tb)
 
@@ -0,0 +1,110 @@
+"""
+Contexts of Contextable and SimpleContext are kept in contextvars: threads and asyncio tasks don't see each other's.
+"""
+import asyncio
+import contextvars
+import threading
+from contextlib import contextmanager
+
+import classes
+from classes.gd_id import Group
+from classes.gd_module import GdModule
+from context import SimpleContext
+
+
+class _Recorder(SimpleContext):
+    def __init__(self, name: str, log: list[str]):
+        self.name = name
+        self.log = log
+
+    @contextmanager
+    def __context__(self):
+        self.log.append(f'enter {self.name}')
+        try:
+            yield self.name
+        finally:
+            self.log.append(f'exit {self.name}')
+
+
+def _check(module: GdModule, value: int) -> tuple:
+    return GdModule.C() is module, Group(1).get_value(None), Group(value).get_value()
+
+
+def test_simple_context_nesting():
+    log = []
+    a, b = _Recorder('a', log), _Recorder('b', log)
+    with a as name_a:
+        with b as name_b:
+            with a:
+                pass
+        assert (name_a, name_b) == ('a', 'b')
+    assert log == ['enter a', 'enter b', 'enter a', 'exit a', 'exit b', 'exit a']
+
+
+def test_exit_in_other_context():
+    log = []
+    recorder = _Recorder('a', log)
+    recorder.__enter__()
+    try:
+        contextvars.copy_context().run(recorder.__exit__, None, None, None)
+    except ValueError:  # the token was created in another context
+        pass
+    else:
+        raise AssertionError('exited in another context')
+    assert log == ['enter a']
+    recorder.__exit__(None, None, None)
+    assert log == ['enter a', 'exit a']
+
+
+def test_threads():
+    barrier = threading.Barrier(2)
+    results = {}
+
+    def run(value: int):
+        module, log = GdModule(), []
+        with _Recorder(str(value), log), module:
+            module.ids[Group].set_value(Group(1), value)
+            checks = []
+            for _ in range(3):
+                barrier.wait()  # the other thread enters and changes its module in between
+                checks.append(_check(module, value))
+        results[value] = checks, log
+
+    threads = [threading.Thread(target=run, args=(value,)) for value in (10, 20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == {value: ([(True, 1, value)] * 3, [f'enter {value}', f'exit {value}']) for value in (10, 20)}
+    assert GdModule.C(None) is None
+
+
+def test_asyncio_tasks():
+    async def edit(value: int, log: list[str]) -> list:
+        module = GdModule()
+        with _Recorder(str(value), log), module:
+            module.ids[Group].set_value(Group(1), value)
+            checks = []
+            for _ in range(3):
+                await asyncio.sleep(0)
+                checks.append(_check(module, value))
+        return checks
+
+    async def main():
+        log = []
+        outer = GdModule()
+        with _Recorder('outer', log), outer:
+            results = await asyncio.gather(edit(10, log), edit(20, log))
+            assert GdModule.C() is outer
+        return results, log
+
+    results, log = asyncio.run(main())
+    assert results == [[(True, 1, value)] * 3 for value in (10, 20)]
+    assert log == ['enter outer', 'enter 10', 'enter 20', 'exit 10', 'exit 20', 'exit outer']
+    assert GdModule.C(None) is None
+
+
+if __name__ == '__main__':
+    for test in (test_simple_context_nesting, test_exit_in_other_context, test_threads, test_asyncio_tasks):
+        test()
+        print(test.__name__, 'ok')
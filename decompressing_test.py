@@ -0,0 +1,94 @@
+"""
+Streaming decryption of saves gives the same xml as decrypt_save_xml for any chunk size and source.
+"""
+import io
+import mmap
+import os
+import random
+import tempfile
+
+import classes
+import tools.decompressing as dc
+from classes.save import LevelInfo, Save
+
+
+def _xml(size: int = 200_000) -> bytes:
+    rnd = random.Random(0)
+    body = b''.join(b'<k>%d</k><i>%d</i>' % (i, rnd.randint(0, 10 ** 6)) for i in range(size // 20))
+    return b'<?xml version="1.0"?><plist><dict>' + body + b'</dict></plist>'
+
+
+XML = _xml()
+
+
+def _streamed(source, chunk_size: int) -> bytes:
+    parts = list(dc.decrypt_save_xml_stream(source, chunk_size))
+    assert all(len(part) <= chunk_size + 16 for part in parts)  # output is kept by chunks too, ios keeps a block back
+    return b''.join(parts)
+
+
+def test_android():
+    data = dc.encrypt_save_xml(XML)
+    assert data[:1] == b'C'
+    for chunk_size in (1, 3, 13, 4096, len(data), len(data) * 2):
+        assert _streamed(data, chunk_size) == XML
+
+
+def test_ios():
+    for size in (0, 15, 16, 17, len(XML)):
+        data = dc.encrypt_save_xml(XML[:size], ios_mode=True)
+        for chunk_size in (1, 16, 100, len(data) + 1):
+            assert _streamed(data, chunk_size) == dc.decrypt_save_xml(data) == XML[:size]
+
+
+def test_sources():
+    data = dc.encrypt_save_xml(XML)
+    assert _streamed(io.BytesIO(data), 1000) == XML
+    assert _streamed(memoryview(data), 1000) == XML
+    with tempfile.TemporaryFile() as file:
+        file.write(data)
+        file.flush()
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            assert _streamed(mapped, 1000) == XML
+
+
+def test_stray_bytes():
+    """ GD saves may end with null bytes or contain line breaks, they are dropped as by decrypt_save_xml """
+    data = dc.encrypt_save_xml(XML)
+    broken = dc._xor_bytes(b'\n'.join(dc._xor_bytes(data, 11)[i:i + 76] for i in range(0, len(data), 76)), 11)
+    broken += b'\x0b' * 3
+    assert dc.decrypt_save_xml(broken) == XML
+    assert _streamed(broken, 777) == XML
+
+
+def test_truncated():
+    """ as decrypt_save_xml: EOFError if the base64 isn't cut, binascii.Error (ValueError) otherwise """
+    data = dc.encrypt_save_xml(XML)
+    for cut in range(len(data) // 8 * 4, len(data) // 8 * 4 + 4):
+        error = EOFError if cut % 4 == 0 else ValueError
+        for decrypt in (dc.decrypt_save_xml, lambda data: b''.join(dc.decrypt_save_xml_stream(data, 1000))):
+            try:
+                decrypt(data[:cut])
+            except error:
+                pass
+            else:
+                raise AssertionError(f'save cut at {cut} was decrypted')
+
+
+def test_load_from_file():
+    level = LevelInfo('level', dc.compress(b'kA13,0;1,1,2,30,3,15;').decode())
+    data = Save([level]).SaveToDAT()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'CCLocalLevels.dat')
+        with open(path, 'wb') as file:
+            file.write(data)
+        for lazy in (False, True):
+            save = Save.LoadFromFile(path, lazy=lazy)
+            assert save.SaveToDAT() == Save.LoadFromDAT(data).SaveToDAT()
+            assert save.get('level').level_string() == 'kA13,0;1,1,2,30,3,15;'
+
+
+if __name__ == '__main__':
+    for test in (test_android, test_ios, test_sources, test_stray_bytes, test_truncated, test_load_from_file):
+        test()
+        print(test.__name__, 'ok')
@@ -0,0 +1,116 @@
+"""
+GdId keeps one canonical ref, refs of absorbed gd_ids are rebound while something uses them.
+GdIdContainer allocates the lowest free values, against a scan of used values.
+"""
+import gc
+import itertools
+import random
+
+import classes
+from classes.gd_id import Group
+from classes.gd_module import BITMAP_LIMIT, GdId, GdModule
+
+
+def test_refs_are_interned():
+    with GdModule():
+        assert Group(5) is Group(5)
+        assert Group() is not Group()
+        gid = Group(5).ref
+        assert gid.canonical is Group(5) and gid.absorbed is None
+
+
+def test_absorb_rebinds_used_refs():
+    with GdModule():
+        a, b, c = Group(1), Group(2), Group(3)
+        b.absorb(a)
+        assert a == b and a.get_value() == 2 and Group(2) is b
+        c.absorb(b)
+        assert a == b == c and a.get_value() == b.get_value() == 3
+        assert Group(3) is c and Group(1) is not a and Group(1).get_value() == 1
+
+        new = Group()
+        new.absorb(Group(7))
+        assert new.get_value() == 7 and Group(7) is new
+
+
+def test_absorbed_refs_are_dropped():
+    with GdModule() as module:
+        kept = Group(1)
+        for value in range(2, 1002):
+            kept.absorb(Group(value))
+        gc.collect()
+        assert not kept.ref.absorbed
+        used = Group(2000)
+        kept.absorb(used)
+        module.remap_groups({1: 3000})
+        gc.collect()
+        assert list(kept.ref.absorbed.values()) == [used]
+        assert used.get_value() == kept.get_value() == 3000
+
+
+def _free_run(used: set[int], count: int) -> int:
+    """ the first of the lowest `count` consecutive values that aren't used """
+    for start in itertools.count(1):
+        if all(value not in used for value in range(start, start + count)):
+            return start
+
+
+def _unused_value(rnd: random.Random, used: set[int]) -> int:
+    while (value := rnd.randint(1, 3000)) in used:
+        pass
+    return value
+
+
+def test_allocation():
+    rnd = random.Random(0)
+    with GdModule() as module:
+        container = module.ids[Group]
+        groups = []
+        for _ in range(2000):
+            used = set(container.values.values())
+            action = rnd.randrange(7)
+            if action == 0:
+                groups.append(Group(rnd.randint(1, 300)))
+            elif action == 1 and groups:
+                container.set_value(groups.pop(rnd.randrange(len(groups))))  # released
+            elif action == 2 and groups:
+                value = _unused_value(rnd, used)
+                container.set_value(rnd.choice(groups), value)
+            elif action == 3:
+                count = rnd.randint(1, 8)
+                block = container.get_block(count)
+                start = _free_run(used, count)
+                assert [group.get_value() for group in block] == list(range(start, start + count))
+                groups.extend(block)
+            elif action == 4:
+                gid = GdId(Group.type)  # set directly, the bitmap doesn't know it
+                value = _unused_value(rnd, used)
+                container.values[gid] = value
+                gid.containers.add(container)
+                groups.append(gid.get_ref())
+            elif action == 5:
+                groups.append(Group(BITMAP_LIMIT + rnd.randint(0, 10)))
+            else:
+                group = Group()
+                assert group.get_value() == _free_run(used, 1)
+                groups.append(group)
+
+
+def test_release_after_absorb_and_remap():
+    with GdModule() as module:
+        a, b = Group(1), Group(2)
+        b.absorb(a)
+        assert Group().get_value() == 1  # the value of the absorbed gd_id is free
+        module.remap_groups({2: 10})
+        assert Group().get_value() == 2
+        module.ids[Group].clear()
+        assert Group().get_value() == 1
+
+
+if __name__ == '__main__':
+    for test in (
+            test_refs_are_interned, test_absorb_rebinds_used_refs, test_absorbed_refs_are_dropped,
+            test_allocation, test_release_after_absorb_and_remap
+    ):
+        test()
+        print(test.__name__, 'ok')
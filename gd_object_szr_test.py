@@ -0,0 +1,36 @@
+"""
+Keys of gd_object serializers that are analyzed and compiled back with their types.
+"""
+import classes
+from classes import gd_object as gd
+from classes.gd_module import GdModule
+from classes.save_szr import gd_object_szr
+
+
+def _round_trip(data: str):
+    with GdModule():
+        obj = gd_object_szr.analyze(data)
+        compiled = gd_object_szr.compile(obj)
+        return obj, compiled, gd_object_szr.analyze(compiled)
+
+
+def test_rotate_times_360():
+    with GdModule():
+        compiled = gd_object_szr.compile(gd.RotateBy(x=0., y=0., degrees=765.))
+    assert ',68,45.000,' in f',{compiled},'
+    assert ',69,2,' in f',{compiled},'
+    obj, compiled, again = _round_trip('1,1346,2,0,3,0,68,45,69,2')
+    assert obj.degrees == again.degrees == 765.
+
+
+def test_z_order_z_layer():
+    obj, compiled, again = _round_trip('1,1,2,0,3,0,25,3,24,5')
+    assert obj.unused['z_order'] == again.unused['z_order'] == 3
+    assert obj.unused['z_layer'] == again.unused['z_layer'] == 5
+    assert ',25,3,' in f',{compiled},' and ',24,5,' in f',{compiled},'
+
+
+if __name__ == '__main__':
+    for test in (test_rotate_times_360, test_z_order_z_layer):
+        test()
+        print(test.__name__, 'ok')
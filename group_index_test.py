@@ -0,0 +1,108 @@
+"""
+GdModule.objects_in_group against a scan of all objects, the index is kept up to date by change notifications.
+"""
+import random
+
+import classes
+from classes import gd_object as gd
+from classes.gd_id import Group
+from classes.gd_module import GdModule
+from classes.group_index import GroupIndex
+
+VALUES = range(1, 16)
+
+
+def _random_unused(rnd: random.Random) -> dict:
+    unused = {'groups': [Group(value) for value in rnd.sample(VALUES, rnd.randint(0, 3))]}
+    if rnd.random() < 0.3:
+        unused['parent_groups'] = [Group(rnd.choice(VALUES))]
+    return unused
+
+
+def _random_object(rnd: random.Random, i: int) -> gd.GdObjectBase:
+    obj = gd.GdObjectAnyId(1, x=float(i), y=0.)  # objects are told apart by x
+    if rnd.random() < 0.8:
+        obj.unused = _random_unused(rnd)
+    return obj
+
+
+def _module(count: int = 200, seed: int = 0) -> GdModule:
+    rnd = random.Random(seed)
+    module = GdModule()
+    with module:
+        module.objects = [_random_object(rnd, i) for i in range(count)]
+    return module
+
+
+def _scan(module: GdModule, group: Group) -> list[float]:
+    xs = set()
+    for obj in module.objects:
+        unused = getattr(obj, 'unused', {})
+        if any(group in (unused.get(key, None) or ()) for key in ('groups', 'parent_groups')):
+            xs.add(obj.x)
+    return sorted(xs)
+
+
+def _check(module: GdModule):
+    with module:
+        for value in (*VALUES, 100, 1000):
+            assert sorted({obj.x for obj in module.objects_in_group(value)}) == _scan(module, Group(value))
+            assert sorted({obj.x for obj in module.objects_in_group(Group(value))}) == _scan(module, Group(value))
+
+
+def test_queries():
+    module = _module()
+    _check(module)
+    module.to_columnar()
+    _check(module)
+
+
+def test_incremental_updates():
+    rnd = random.Random(1)
+    module = _module()
+    with module:
+        module.objects_in_group(1)
+        index = module.observers[GroupIndex]
+        for step in range(300):
+            obj = rnd.choice(module.objects)
+            unused = getattr(obj, 'unused', None)
+            action = rnd.randrange(8)
+            if action == 0 or unused is None:
+                obj.unused = _random_unused(rnd)
+            elif action == 1:
+                unused.setdefault('groups', []).append(Group(rnd.choice(VALUES)))
+            elif action == 2 and unused.get('groups'):
+                unused['groups'].remove(rnd.choice(unused['groups']))
+            elif action == 3:
+                unused['parent_groups'] = [Group(rnd.choice(VALUES))]
+            elif action == 4:
+                unused.pop('groups', None)
+            elif action == 5:
+                module.objects.append(obj if rnd.random() < 0.5 else _random_object(rnd, 1000 + step))
+            elif action == 6 and len(module.objects) > 50:
+                del module.objects[rnd.randrange(len(module.objects))]
+            else:
+                module.objects[rnd.randrange(len(module.objects))] = _random_object(rnd, 2000 + step)
+            if step % 30 == 0:
+                _check(module)
+        assert module.observers[GroupIndex] is index
+    _check(module)
+
+
+def test_absorb_and_remap():
+    module = _module()
+    with module:
+        module.objects_in_group(1)
+        Group(1).absorb(Group(2))
+        Group(3).absorb(Group(100))  # unused group
+        _check(module)
+        module.remap_groups({4: 5, 5: 4, 6: 200})
+        _check(module)
+        assert _scan(module, Group(200))
+        assert len(module.observers[GroupIndex]) == len({id(obj) for obj in module.objects})
+
+
+if __name__ == '__main__':
+    for test in (test_queries, test_incremental_updates, test_absorb_and_remap):
+        test()
+        print(test.__name__, 'ok')
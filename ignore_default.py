@@ -1,4 +1,4 @@
-from typing import Any, Callable, ClassVar, TYPE_CHECKING, TypeVar
+from typing import Any, Callable, ClassVar, Iterable, TYPE_CHECKING, TypeVar
 
 from attr import Attribute
 from attrs import define, field, NOTHING, Factory
@@ -7,7 +7,7 @@ from tools.funcs import map_default
 from python.named_const import Missed
 from context import Contextable
 
-__all__ = ('DefaultField', 'SafeGet', 'IgnoreDefault')
+__all__ = ('DefaultField', 'SafeGet', 'IgnoreDefault', 'CompactField', 'compact_class', 'original_class')
 
 T = TypeVar("T")
 Factory: Any
@@ -40,7 +40,7 @@ class DefaultField:
             raise TypeError("No default")
         value = self.factory(instance) if self.takes_self else self.factory()
         if not SafeGet.C():
-            instance.__dict__[self.name] = value
+            object.__setattr__(instance, self.name, value)
         return value
 
 @define(slots=True)
@@ -132,15 +132,17 @@ class IgnoreDefault(metaclass=IgnoreDefaultMeta):
     __default_fields__: ClassVar[dict[str, DefaultField]] = {}
 
     def _getattr(self, name):
-        if name in self.__dict__:
-            return self.__dict__[name]
         if name in self.__class__.__default_fields__:
             return self.__class__.__default_fields__[name].get(self)
         raise AttributeError(f"{self.__class__.__name__!r} object has no attribute {name!r}")
 
     def _setattr(self, name, value):
         if value is Missed:
-            return self.__dict__.pop(name, None)
+            try:
+                object.__delattr__(self, name)
+            except AttributeError:
+                pass
+            return
         object.__setattr__(self, name, value)
 
     locals()['__getattr__'] = _getattr  # trick stupid PyCharm to highlight 'Unresolved attribute'
@@ -148,9 +150,91 @@ class IgnoreDefault(metaclass=IgnoreDefaultMeta):
     del _getattr, _setattr
 
 
+class CompactField:
+    """
+    Attribute of a compact class, the value is stored in a slot.
+    Missed in the slot is the default, it's got from __default_fields__ as a not stored IgnoreDefault attribute.
+    """
+    __slots__ = ('name', 'member')
+
+    def __init__(self, name: str, member):
+        self.name = name
+        self.member = member
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        value = self.member.__get__(instance, owner)
+        if value is Missed:
+            return instance.__getattr__(self.name)
+        return value
+
+    def __set__(self, instance, value):
+        self.member.__set__(instance, value)
+
+    def __delete__(self, instance):
+        self.member.__set__(instance, Missed)
+
+    def __repr__(self):
+        return f'<compact field {self.name!r}>'
+
+
+def _compact_new(cls, *args, **kwargs):
+    obj = object.__new__(cls)
+    for member in cls.__compact_members__.values():
+        member.__set__(obj, Missed)
+    return obj
+
+
+def _compact_getstate(self):
+    return {name: member.__get__(self) for name, member in self.__compact_members__.items()}
+
+
+def _compact_setstate(self, state: dict):
+    for name, value in state.items():
+        object.__setattr__(self, name, value)
+
+
+def compact_class[T: IgnoreDefault](cls: type[T], names: Iterable[str] = ()) -> type[T]:
+    """
+    Subclass of an attrs IgnoreDefault class with the same name, which stores attributes in __slots__
+    instead of the instance __dict__. Slots are attrs fields and `names` (attributes set only by serializers).
+    Defaults are still not stored: the slot holds Missed, getting the attribute returns the default,
+    setting Missed or deleting it resets to the default.
+    Other attributes go to __dict__ as usual, it's created on the first such assignment.
+    The class is cached in cls.__compact_class__, compact class of a compact class is itself.
+    """
+    if '__compact_members__' in cls.__dict__:
+        return cls
+    if '__compact_class__' in cls.__dict__:
+        return cls.__compact_class__
+    names = tuple(dict.fromkeys((*(attribute.name for attribute in cls.__attrs_attrs__), *names)))
+    for name in names:
+        if hasattr(cls, name):
+            raise TypeError(f'{cls.__name__}.{name} is a class attribute, it can\'t be a slot')
+    compact = type(cls)(cls.__name__, (cls,), {
+        '__slots__': names,
+        '__module__': cls.__module__,
+        '__qualname__': cls.__qualname__,
+        '__new__': _compact_new,
+        '__getstate__': _compact_getstate,
+        '__setstate__': _compact_setstate,
+    })
+    compact.__compact_members__ = {name: compact.__dict__[name] for name in names}
+    for name, member in compact.__compact_members__.items():
+        setattr(compact, name, CompactField(name, member))
+    cls.__compact_class__ = compact
+    return compact
+
+
+def original_class(cls: type) -> type:
+    """ the class the compact class was made of, other classes are returned as they are """
+    return cls.__base__ if '__compact_members__' in cls.__dict__ else cls
+
+
 if __name__ == '__main__':
     def _main():
-        @define
+        @define(slots=False)
         class Foo(IgnoreDefault):
             bar: list = field(factory=list)
 
@@ -174,4 +258,12 @@ if __name__ == '__main__':
 
         print(foo.__dict__)  # >>> {'bar': []}
 
+        CompactFoo = compact_class(Foo)
+        foo = CompactFoo()
+        print(foo.__getstate__())  # >>> {'bar': Missed}
+        SafeGet.Not[foo].bar.append(1)
+        print(foo.__getstate__())  # >>> {'bar': [1]}
+        foo.bar = Missed
+        print(SafeGet[foo].bar, foo.__getstate__())  # >>> [] {'bar': Missed}
+
     _main()
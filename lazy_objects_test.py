@@ -0,0 +1,87 @@
+"""
+LevelInfo.decompress(lazy=True) analyzes objects on access, not analyzed objects are compiled back verbatim.
+"""
+import classes
+import tools.decompressing
+from classes.gd_id import Group
+from classes.gd_module import LazyObjects
+from classes.save import LevelInfo
+from classes.save_szr import gd_object_szr
+
+# not canonical strings: an analyzed object is compiled differently
+OBJECTS = ['1,1,2,30.0000,3,15,57,3', '1,1,2,60,3,15,57,1.2', '1,1268,2,90,3,15,51,2', '1,1,2,120,3,15']
+LEVEL_STRING = ';'.join(['kA13,0', *OBJECTS, ''])
+
+
+def _info() -> LevelInfo:
+    return LevelInfo('level', tools.decompressing.compress(LEVEL_STRING.encode()).decode())
+
+
+def test_analyzed_on_access():
+    with _info().decompress(lazy=True) as level:
+        objects = level.module.objects
+        assert isinstance(objects, LazyObjects) and len(objects) == 4 and objects.analyzed == 0
+        assert objects[1].x == 60.
+        assert [objects.is_analyzed(i) for i in range(4)] == [False, True, False, False]
+        assert [obj.x for obj in objects[2:]] == [90., 120.]
+        assert objects.analyzed == 3
+
+
+def test_raw_objects_compiled_verbatim():
+    info = _info()
+    with info.decompress('rw', lazy=True) as level:
+        level.module.objects[3].x = 150.
+    raw, changed = info.level_string().split(';')[1:4], info.level_string().split(';')[4]
+    assert raw == OBJECTS[:3]
+    assert changed.startswith('1,1,2,150')
+
+
+def _compiled(level) -> list[str]:
+    with level:
+        return [gd_object_szr.compile(obj) for obj in level.module.objects]
+
+
+def test_same_as_eager():
+    """ groups of different modules aren't equal, objects are compared compiled """
+    with _info().decompress() as eager, _info().decompress(lazy=True) as lazy:
+        assert _compiled(lazy) == _compiled(eager)
+
+
+def test_new_ids_skip_raw_objects():
+    """ raw objects aren't analyzed yet, but their groups can't be allocated """
+    with _info().decompress('rw', lazy=True) as level:
+        objects = level.module.objects
+        free = [Group().get_value() for _ in range(3)]  # the module is in context
+        assert objects.analyzed == 4
+        assert set(free).isdisjoint({1, 2, 3}) and free == [4, 5, 6]
+
+
+def test_set_value_and_absorb_analyze_raw_objects():
+    with _info().decompress(lazy=True) as level:
+        objects = level.module.objects
+        level.module.ids[Group].set_value(Group(3), 7)
+        assert objects.analyzed == 4
+        assert objects[0].unused['groups'] == [Group(7)]
+    with _info().decompress(lazy=True) as level:
+        objects = level.module.objects
+        Group(2).absorb(Group(1))
+        assert objects[1].unused['groups'] == [Group(2), Group(2)] and objects[2].target == Group(2)
+
+
+def test_list_changes():
+    info = _info()
+    with info.decompress('rw', lazy=True) as level:
+        objects = level.module.objects
+        del objects[0]
+        objects.insert(1, objects.pop())
+        assert objects.analyzed == 1
+    assert info.level_string().split(';')[1:-1] == [OBJECTS[1], '1,1,2,120.000,3,15.000', OBJECTS[2]]
+
+
+if __name__ == '__main__':
+    for test in (
+            test_analyzed_on_access, test_raw_objects_compiled_verbatim, test_same_as_eager,
+            test_new_ids_skip_raw_objects, test_set_value_and_absorb_analyze_raw_objects, test_list_changes
+    ):
+        test()
+        print(test.__name__, 'ok')
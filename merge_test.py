@@ -0,0 +1,112 @@
+"""
+GdModule.merge against the expected values of gd_ids for every id policy.
+"""
+import random
+
+import classes
+import tools.decompressing
+from classes import gd_object as gd
+from classes.gd_id import Group, Item
+from classes.gd_module import GdModule
+from classes.save import LevelInfo
+
+
+def _level(rnd: random.Random, count: int = 30) -> GdModule:
+    module = GdModule()
+    with module:
+        module.objects = [
+            gd.Spawn(x=float(i), y=0., target=Group(rnd.randint(1, 40))) if rnd.random() < 0.7 else
+            gd.Pickup(x=float(i), y=0., item=Item(rnd.randint(1, 10)))
+            for i in range(count)
+        ]
+    return module
+
+
+def _ref(obj):
+    return obj.target if isinstance(obj, gd.Spawn) else obj.item
+
+
+def _values(module: GdModule) -> list[tuple[type, int]]:
+    with module:
+        return [(type(_ref(obj)), _ref(obj).get_value()) for obj in module.objects]
+
+
+def _lowest_free(used: set[int], count: int) -> list[int]:
+    free = []
+    value = 1
+    while len(free) < count:
+        if value not in used:
+            free.append(value)
+        value += 1
+    return free
+
+
+def _check(id_policy: str, seed: int):
+    rnd = random.Random(seed)
+    module, other = _level(rnd), _level(rnd)
+    before, other_before = _values(module), _values(other)
+    other_objects = list(other.objects)
+
+    changed = module.merge(other, id_policy)
+
+    assert other.objects == [] and not any(container.values for container in other.ids.values())
+    assert module.objects[len(before):] == other_objects
+    after = _values(module)
+    assert after[:len(before)] == before  # values of the module don't change
+    for ref_type in (Group, Item):
+        used = {value for tp, value in before if tp is ref_type}
+        moved = sorted({value for tp, value in other_before if tp is ref_type})
+        if id_policy == 'renumber':
+            start = _lowest_free(used, 1)[0]
+            while any(value in used for value in range(start, start + len(moved))):
+                start += 1
+            expected = dict(zip(moved, range(start, start + len(moved))))
+        elif id_policy == 'keep':
+            colliding = [value for value in moved if value in used]
+            expected = dict(zip(colliding, _lowest_free(used | set(moved), len(colliding))))
+        else:
+            expected = {}
+        expected = {old: new for old, new in expected.items() if old != new}
+        assert changed.get(ref_type, {}) == expected
+        assert [(tp, expected.get(value, value)) for tp, value in other_before if tp is ref_type] == \
+               [(tp, value) for tp, value in after[len(before):] if tp is ref_type]
+
+    with module:  # references with the same value are the same gd_id
+        refs = {}
+        for obj in module.objects:
+            ref = _ref(obj)
+            assert refs.setdefault((type(ref), ref.get_value()), ref) == ref
+
+
+def test_policies():
+    for id_policy in ('renumber', 'keep', 'unify'):
+        for seed in range(5):
+            _check(id_policy, seed)
+
+
+def test_lazy_module():
+    """ values of not analyzed objects collide too """
+    info = LevelInfo('level', tools.decompressing.compress(b'kA13,0;1,1268,2,0,3,0,51,1;1,1268,2,30,3,0,51,2;').decode())
+    with info.decompress('rw', lazy=True) as level:
+        other = GdModule()
+        with other:
+            other.objects = [gd.Spawn(x=60., y=0., target=Group(1))]
+        assert level.module.merge(other, 'keep') == {Group: {1: 3}}
+    assert info.level_string().split(';')[3].startswith('2,60.000,3,0.000,51,3,')
+
+
+def test_errors():
+    module = GdModule()
+    for args in ((module, 'renumber'), (GdModule(), 'other')):
+        try:
+            module.merge(*args)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f'merged with {args}')
+
+
+if __name__ == '__main__':
+    for test in (test_policies, test_lazy_module, test_errors):
+        test()
+        print(test.__name__, 'ok')
@@ -0,0 +1,73 @@
+"""
+LevelInfo.decompress(workers=...) analyzes objects in a process pool, they are the same as analyzed in place
+and their gd_ids are bound to the module of the level.
+"""
+import classes
+import tools.decompressing
+from classes import gd_object as gd
+from classes.enums import ItemOperator
+from classes.gd_id import Group, Item
+from classes.gd_module import GdModule
+from classes.save import LevelInfo
+from classes.save_szr import gd_object_szr
+
+
+def _level_string() -> str:
+    with GdModule():
+        block = gd.GdObjectAnyId(1, x=0., y=0.)
+        block.unused = {'groups': [Group(1), Group(5)], 'z_order': 3}
+        objects = [
+            block,
+            gd.MoveBy(x=30., y=0., target=Group(5), move_x=60),
+            gd.MoveTo(x=60., y=0., target=Group(1), target_pos=Group(7), duration=1.),
+            gd.Spawn(x=90., y=0., target=Group(5), delay=0.5, remapping={1: 7}),
+            gd.Pickup(x=120., y=0., item=Item(3), count=-2),
+            gd.ItemEdit(x=150., y=0., a=Item(3), b=Item(4), result=Item(5), operator_a_b=ItemOperator.Sub),
+            gd.Text(x=180., y=0., text='parallel'),
+        ]
+        compiled = [gd_object_szr.compile(obj) for obj in objects] * 20
+    return ';'.join(['kA13,0', *compiled, '1,1,2,0,3,0,999,unknown', ''])
+
+
+INFO = LevelInfo('level', tools.decompressing.compress(_level_string().encode()).decode())
+
+
+def _compiled(level) -> list[str]:
+    with level:
+        return [gd_object_szr.compile(obj) for obj in level.module.objects]
+
+
+def test_same_objects():
+    for compact in (False, True):
+        with INFO.decompress('r', compact=compact) as serial, \
+                INFO.decompress('r', workers=2, compact=compact) as parallel:
+            assert _compiled(parallel) == _compiled(serial)
+            assert [type(obj) for obj in parallel.module.objects] == [type(obj) for obj in serial.module.objects]
+
+
+def test_ids_are_bound():
+    with INFO.decompress('r', workers=2) as level:
+        objects = level.module.objects
+        assert objects[0].unused['groups'][1] is objects[1].target is objects[3].target is Group(5)
+        assert objects[4].item is Item(3)
+        used = set(level.module.ids[Group].values.values())
+        with INFO.decompress('r') as serial:
+            assert used == set(serial.module.ids[Group].values.values()) == {1, 5}
+        assert Group().get_value() not in used
+        Group(9).absorb(objects[1].target)
+        assert objects[8].target.get_value() == 9
+
+
+def test_round_trip():
+    info = LevelInfo('level', INFO.data)
+    with info.decompress('rw', workers=2) as level:
+        level.module.objects[1].move_x = 90
+    assert info.data is not INFO.data
+    with info.decompress('r') as level:
+        assert [obj.move_x for obj in level.module.objects[1::7]] == [90] + [60] * 19
+
+
+if __name__ == '__main__':
+    for test in (test_same_objects, test_ids_are_bound, test_round_trip):
+        test()
+        print(test.__name__, 'ok')
@@ -0,0 +1,62 @@
+"""
+tools.plist parses plist xml incrementally, the result doesn't depend on how the xml is split.
+"""
+import tools.plist as plist
+
+JSON = {
+    'LLM_01': {'_isArr': False, 'k_0': {'k2': 'level', 'k4': 'H4sIAAAA', 'k5': ''}},
+    'flags': [True, False, [1, 2.5, 'три'], {}],
+    'LLM_02': 37,
+    'empty': [],
+}
+XML = plist.json_to_plist(JSON)
+
+
+def test_round_trip():
+    assert plist.plist_to_json(XML) == JSON
+    assert plist.json_to_plist(plist.plist_to_json(XML)) == XML
+
+
+def test_any_split():
+    for size in (1, 2, 7, 64):
+        chunks = [XML[i:i + size] for i in range(0, len(XML), size)]  # some cut multibyte characters
+        assert plist.plist_stream_to_json(chunks) == JSON
+    assert plist.plist_stream_to_json(iter([XML[:10], b'', XML[10:]])) == JSON
+
+
+def test_gd_tags():
+    xml = b'<plist><dict><k>a</k><t /><k>b</k><false /><k>c</k><s /><k>d</k><r>1</r><k>e</k><d><k>_isArr</k><t />' \
+          b'<k>k_0</k><i>5</i></d></dict></plist>'
+    assert plist.plist_to_json(xml) == {'a': True, 'b': False, 'c': '', 'd': 1., 'e': [5]}
+
+
+def test_consumed_elements_are_dropped():
+    builder = plist._PlistBuilder()
+    body = b''.join(b'<k>k%d</k><s>%s</s>' % (i, b'x' * 100) for i in range(1000))
+    builder.feed(b'<plist><dict>' + body)
+    assert sum(1 for _ in builder.elems[0].iter()) == 2  # plist and dict, read values aren't kept
+    builder.feed(b'</dict></plist>')
+    assert len(builder.close()) == 1000
+
+
+def test_errors():
+    for xml in (
+            b'<plist><dict><k>a</k></dict></plist>',
+            b'<plist><dict><i>1</i></dict></plist>',
+            b'<plist><dict><k>a</k><k>b</k><i>1</i></dict></plist>',
+            b'<plist><dict><k>a</k><x>1</x></dict></plist>',
+            b'<plist></plist>',
+            b'<plist><dict>',
+    ):
+        try:
+            plist.plist_to_json(xml)
+        except (ValueError, SyntaxError):  # ET.ParseError is SyntaxError
+            pass
+        else:
+            raise AssertionError(f'{xml!r} was parsed')
+
+
+if __name__ == '__main__':
+    for test in (test_round_trip, test_any_split, test_gd_tags, test_consumed_elements_are_dropped, test_errors):
+        test()
+        print(test.__name__, 'ok')
@@ -31,6 +31,9 @@ class NamedSingleton:
     def __repr__(self):
         return self.__class__.__name__
 
+    def __reduce__(self):  # pickled by name, the instance replaces the class in its module
+        return self.__class__.__name__
+
 class Default(NamedSingleton):
     """ Use as default value in function when you can't use None """
 
@@ -0,0 +1,56 @@
+"""
+Save.LoadFromDATAsync and SaveToDATAsync give the same results as LoadFromDAT and SaveToDAT
+with the default executor, a thread pool and a process pool.
+"""
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import classes
+import tools.decompressing
+from classes.save import LevelInfo, Save
+
+LEVEL_STRING = 'kA13,0,kA15,0;1,1,2,30,3,15,57,1;1,1268,2,60,3,15,51,2,442,1.2;'
+DATA = Save([LevelInfo('level', tools.decompressing.compress(LEVEL_STRING.encode()).decode(), 0)]).SaveToDAT()
+
+
+async def _round_trip(executor, lazy: bool) -> tuple[bytes, list]:
+    save = await Save.LoadFromDATAsync(DATA, lazy=lazy, executor=executor)
+    with save.get('level').decompress() as level:
+        level.module.objects[0].x = 90.
+    written = []
+    data = await save.SaveToDATAsync(written.append, executor=executor)
+    return data, written
+
+
+def _check(executor):
+    for lazy in (False, True):
+        data, written = asyncio.run(_round_trip(executor, lazy))
+        assert written == [data]
+        with Save.LoadFromDAT(data).get('level').decompress('r') as level:
+            assert level.module.objects[0].x == 90.
+            assert len(level.module.objects) == 2
+
+
+def test_default_executor():
+    _check(None)
+
+
+def test_thread_pool():
+    with ThreadPoolExecutor(2) as executor:
+        _check(executor)
+
+
+def test_process_pool():
+    with ProcessPoolExecutor(2) as executor:
+        _check(executor)
+
+
+def test_same_as_sync():
+    save = asyncio.run(Save.LoadFromDATAsync(DATA))
+    assert asyncio.run(save.SaveToDATAsync()) == Save.LoadFromDAT(DATA).SaveToDAT()
+
+
+if __name__ == '__main__':
+    for test in (test_default_executor, test_thread_pool, test_process_pool, test_same_as_sync):
+        test()
+        print(test.__name__, 'ok')
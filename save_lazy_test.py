@@ -0,0 +1,69 @@
+"""
+Save.LoadFromDAT(lazy=True) keeps levels as LevelHandle, a level is analyzed only when it's got.
+"""
+import classes
+import tools.decompressing
+from classes.save import LevelHandle, LevelInfo, Save
+
+
+def _data(i: int) -> str:
+    return tools.decompressing.compress(f'kA13,0;1,1,2,{30 * i},3,15;'.encode()).decode()
+
+
+DATA = Save([LevelInfo('a', _data(0)), LevelInfo('b', _data(1)), LevelInfo('a', _data(2), 1)]).SaveToDAT()
+
+
+def test_levels_are_handles():
+    save = Save.LoadFromDAT(DATA, lazy=True)
+    assert all(isinstance(level, LevelHandle) and not level.is_loaded() for level in save.levels)
+    assert [(level.name, level.revision) for level in save.levels] == [('a', 0), ('b', 0), ('a', 1)]
+    assert save.has('b') and save.has(('a', 1)) and not save.has(('b', 1))
+    assert not any(level.is_loaded() for level in save.levels)
+
+
+def test_get_loads_one_level():
+    save = Save.LoadFromDAT(DATA, lazy=True)
+    level = save.get(('a', 1))
+    assert isinstance(level, LevelInfo) and level.level_string() == 'kA13,0;1,1,2,60,3,15;'
+    assert [level.is_loaded() for level in save.levels] == [False, False, True]
+    assert save.get(('a', 1)) is level
+
+
+def test_untouched_levels_are_compiled_back():
+    eager = Save.LoadFromDAT(DATA).SaveToDAT()
+    save = Save.LoadFromDAT(DATA, lazy=True)
+    assert save.SaveToDAT() == eager
+    save.get('b')
+    assert save.SaveToDAT() == eager
+
+
+def test_changes_of_loaded_levels():
+    save = Save.LoadFromDAT(DATA, lazy=True)
+    with save.get('b').decompress('rw') as level:
+        level.module.objects[0].x = 90.
+    clone = save.clone('a', 'c')
+    assert save.get('c') is clone and save.levels[0] is clone
+    save.add(LevelInfo('a', _data(3)))
+    assert save.get('a').revision == 2
+
+    loaded = Save.LoadFromDAT(save.SaveToDAT())
+    assert [(level.name, level.revision) for level in loaded.levels] == [('a', 2), ('c', 0), ('a', 0), ('b', 0), ('a', 1)]
+    with loaded.get('b').decompress() as level:
+        assert level.module.objects[0].x == 90.
+    assert loaded.get('c').level_string() == loaded.get(('a', 0)).level_string()
+
+
+def test_renamed_loaded_level():
+    save = Save.LoadFromDAT(DATA, lazy=True)
+    assert save.has('b')
+    save.get('b').name = 'd'
+    assert not save.has('b') and save.get('d') is save.levels[1].info
+
+
+if __name__ == '__main__':
+    for test in (
+            test_levels_are_handles, test_get_loads_one_level, test_untouched_levels_are_compiled_back,
+            test_changes_of_loaded_levels, test_renamed_loaded_level
+    ):
+        test()
+        print(test.__name__, 'ok')
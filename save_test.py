@@ -0,0 +1,130 @@
+"""
+LevelInfo.decompress('rw') writes the level string back only if the level was changed,
+including in-place changes of list and dict attributes of analyzed objects.
+"""
+import classes
+import tools.decompressing
+from classes.gd_id import Group
+from classes.save import S, LevelInfo, Save
+
+
+def _level_data() -> str:
+    """ compressed level string compiled by the library, so an unchanged level compiles to the same string """
+    objects = ''.join(f'1,1268,2,{30 * i},3,15,51,{i % 5 + 1},57,{i % 3 + 1},442,1.2;' for i in range(20))
+    info = LevelInfo('level', tools.decompressing.compress(f'kA13,0,kA15,0;{objects}'.encode()).decode())
+    with info.decompress('rw') as level:
+        level.module.objects[0].x = 1.
+    with info.decompress('rw') as level:
+        level.module.objects[0].x = 0.
+    return info.data
+
+
+def _changed(action, lazy: bool = False) -> LevelInfo:
+    info = LevelInfo('level', DATA)
+    with info.decompress('rw', lazy=lazy) as level:
+        action(level)
+    return info
+
+
+def _add_group(level):
+    level.module.objects[3].unused['groups'].append(Group(999))
+
+
+def _remap(level):
+    level.module.objects[3].remapping[7] = 8
+
+
+DATA = _level_data()
+
+
+def test_untouched():
+    for lazy in (False, True):
+        info = _changed(lambda level: level.module.objects[5].x, lazy=lazy)
+        assert info.data is DATA
+        info = _changed(lambda level: [obj.x for obj in level.module.objects], lazy=lazy)
+        assert info.data is DATA
+
+
+def test_set_attribute():
+    for lazy in (False, True):
+        info = _changed(lambda level: setattr(level.module.objects[3], 'x', 1.), lazy=lazy)
+        assert info.data is not DATA
+        with info.decompress() as level:
+            assert level.module.objects[3].x == 1.
+
+
+def test_settings_changed():
+    for lazy in (False, True):
+        info = _changed(lambda level: level.settings.__setitem__('kA13', '1'), lazy=lazy)
+        assert info.level_string().startswith('kA13,1,')
+
+
+def test_list_changed_in_place():
+    for lazy in (False, True):
+        info = _changed(_add_group, lazy=lazy)
+        assert info.data is not DATA
+        assert '57,1.999,' in info.level_string()
+        with info.decompress() as level:
+            assert Group(999) in level.module.objects[3].unused['groups']
+
+
+def test_dict_changed_in_place():
+    for lazy in (False, True):
+        info = _changed(_remap, lazy=lazy)
+        assert info.data is not DATA
+        with info.decompress() as level:
+            assert level.module.objects[3].remapping == {1: 2, 7: 8}
+
+
+def test_compile_changed_level():
+    save = Save([LevelInfo('level', DATA)])
+    with save.get('level').decompress('rw') as level:
+        level.module.objects[3].x = 1.
+    info = save.levels[0]
+    copies = S[Save].analyze(S[Save].compile(save)).levels[0], S[LevelInfo].analyze(S[LevelInfo].compile(info))
+    for compiled in copies:
+        assert compiled.level_string() == info.level_string()
+    assert not info.is_compressed()  # compiling doesn't change the level
+
+
+def _names(save: Save, *names: str) -> list[bool]:
+    return [save.has(name) for name in names]
+
+
+def test_index_levels_replaced_in_place():
+    save = Save([LevelInfo('a', DATA), LevelInfo('b', DATA)])
+    assert _names(save, 'a', 'b') == [True, True]
+    save.levels[0] = LevelInfo('c', DATA)
+    assert _names(save, 'c', 'a', 'b') == [True, False, True]
+    assert save.get('c') is save.levels[0]
+    save.add(LevelInfo('c', DATA))
+    assert [(level.name, level.revision) for level in save.levels] == [('c', 1), ('c', 0), ('b', 0)]
+
+
+def test_index_levels_slice_assignment():
+    save = Save([LevelInfo('a', DATA), LevelInfo('b', DATA), LevelInfo('c', DATA)])
+    assert save.has('b')
+    save.levels[1:] = [LevelInfo('d', DATA)]
+    assert _names(save, 'a', 'b', 'c', 'd') == [True, False, False, True]
+    del save.levels[:1]
+    assert _names(save, 'a', 'd') == [False, True]
+    save.levels.rotate(1)
+    save.levels.extend([LevelInfo('a', DATA), LevelInfo('a', DATA, 3)])
+    assert save.get(('a', 3)) is save.levels[-1]
+
+
+def test_index_renamed_level():
+    save = Save([LevelInfo('a', DATA)])
+    assert save.has('a')
+    save.levels[0].name = 'b'
+    assert _names(save, 'a', 'b') == [False, True]
+
+
+if __name__ == '__main__':
+    for test in (
+            test_untouched, test_set_attribute, test_settings_changed, test_list_changed_in_place,
+            test_dict_changed_in_place, test_compile_changed_level,
+            test_index_levels_replaced_in_place, test_index_levels_slice_assignment, test_index_renamed_level
+    ):
+        test()
+        print(test.__name__, 'ok')
@@ -1,3 +1,5 @@
+import time
+from contextlib import contextmanager
 from enum import Enum
 from functools import partial
 from types import EllipsisType
@@ -6,6 +8,7 @@ from attr import frozen
 from attrs import define, field
 from collections.abc import Iterator, Callable
 
+from python.named_const import Missed
 from tools.funcs import Factory, factorydict, pairs_to_dict, dict_to_pairs
 
 __all__ = (
@@ -26,6 +29,10 @@ __all__ = (
     'ToClass',
     'ToAttrs',
     'ToEnum',
+    'Specialized',
+    'specialize',
+    'SerializerStats',
+    'SerializingStats',
     'SerializingFamily'
 )
 
@@ -56,6 +63,20 @@ class Base:
     def _as_sequence(self):
         return (self,)
 
+    def _children(self) -> Iterator[tuple[str, 'Base']]:
+        """ nested serializers with labels, for stats. By default found in attributes. """
+        for attr, value in vars(self).items():
+            if isinstance(value, Base):
+                yield f'.{attr}', value
+            elif isinstance(value, (tuple, list)):
+                for i, val in enumerate(value):
+                    if isinstance(val, Base):
+                        yield f'.{attr}[{i}]', val
+            elif isinstance(value, dict):
+                for key, val in value.items():
+                    if isinstance(val, Base):
+                        yield f'.{attr}[{_label(key)}]', val
+
     def __rshift__(self, other: 'Base'):
         return Sequence(self._as_sequence() + other._as_sequence())
 
@@ -86,6 +107,10 @@ class Sequence(Base):
     def _as_sequence(self):
         return self.serializers
 
+    def _children(self) -> Iterator[tuple[str, Base]]:
+        for i, szr in enumerate(self.serializers):
+            yield f'[{i}]', szr
+
 
 class Key(Base):
     """
@@ -447,6 +472,11 @@ class WrapKeys(Base):
 
         return data
 
+    def _children(self) -> Iterator[tuple[str, Base]]:
+        for info in self.infos:
+            if info.serializer is not None:
+                yield f'[{_label(info.key)}:{_label(info.name)}]', info.serializer
+
     def combine(self, other: 'WrapKeys') -> 'WrapKeys':
         infos = tuple(info for info in self.infos if (
                 (info.key is None or info.key not in other.from_key) and
@@ -571,6 +601,11 @@ class MultiField(Base):
 
         return data
 
+    def _children(self) -> Iterator[tuple[str, Base]]:
+        for info in self.infos:
+            if info.serializer is not None:
+                yield f'.{_label(info.name)}', info.serializer
+
     def combine(self, other: 'MultiField') -> 'MultiField':
         infos = tuple(info for info in self.infos if (
             (info.name is None or info.name not in other.from_name)
@@ -586,11 +621,19 @@ class MultiField(Base):
 
 
 class ToClass(Base):
+    """ For compact classes (ignore_default.compact_class) values are set to slots, not through __dict__ """
+
     def __init__(self, klass: type[object]):
         self.klass = klass
         self.has_dict = '__dict__' in dir(klass)
+        self.members = klass.__dict__.get('__compact_members__', None)
+        if self.members is not None:
+            self._setters = tuple((name, member.__set__) for name, member in self.members.items())
+            self._getters = tuple((name, member.__get__) for name, member in self.members.items())
 
     def analyze(self, data: dict):
+        if self.members is not None:
+            return self._analyze_compact(data)
         obj = object.__new__(self.klass)
         if self.has_dict:
             object.__setattr__(obj, '__dict__', data)
@@ -600,10 +643,29 @@ class ToClass(Base):
         return obj
 
     def compile(self, value, data=None):
+        if self.members is not None:
+            return self._compile_compact(value)
         if self.has_dict:
             return value.__dict__
         return {name: getattr(value, name) for name in value.__class__.__slots__}
 
+    def _analyze_compact(self, data: dict):
+        obj = object.__new__(self.klass)
+        for name, set_value in self._setters:
+            set_value(obj, data.get(name, Missed))
+        if not data.keys() <= self.members.keys():
+            for name in data.keys() - self.members.keys():
+                object.__setattr__(obj, name, data[name])
+        return obj
+
+    def _compile_compact(self, value) -> dict:
+        data = {}
+        for name, get_value in self._getters:
+            val = get_value(value)
+            if val is not Missed:
+                data[name] = val
+        return data
+
 
 class ToAttrs(Base):
     def __init__(self, klass: type[object], *slots: str):
@@ -634,9 +696,480 @@ class ToEnum(Base):
         return value.value
 
 
+class _Namespace(dict):
+    """ globals of generated code, values are referenced by generated names """
+
+    def const(self, value) -> str:
+        if type(value) in (str, int, bool) or value is None:
+            return repr(value)
+        name = f'c{len(self)}'
+        self[name] = value
+        return name
+
+
+class _FunctionName(str):
+    """ name of generated function in a table, replaced by the function after exec """
+
+
+def _is_plain_key(szr: Base) -> bool:
+    return type(szr) is Key and szr.default is _Missed and szr.key is not Ellipsis
+
+
+def _split_keys(szr: Base) -> tuple[tuple[str, ...] | None, tuple[Base, ...]]:
+    """
+    Splits field serializer into keys it reads and the rest of the sequence:
+        Key(k) >> rest           -> (k,), rest
+        MultiKey(k1, k2) >> rest -> (k1, k2), rest
+    Other serializers -> None, all serializers
+    """
+    serializers = szr._as_sequence()
+    head, rest = serializers[0], serializers[1:]
+    if _is_plain_key(head):
+        return (head.key,), rest
+    if type(head) is Tuple and not head.iterate and head.serializers and all(map(_is_plain_key, head.serializers)):
+        return tuple(key_szr.key for key_szr in head.serializers), rest
+    return None, serializers
+
+
+def _analyze_expr(szr: Base, arg: str, ns: _Namespace) -> str:
+    if type(szr) is DoNothing:
+        return arg
+    if type(szr) is Func:
+        if szr.analyser is None:
+            return arg
+        return f'{ns.const(szr.analyser)}({arg})'
+    if type(szr) is Sequence:
+        for s in szr.serializers:
+            arg = _analyze_expr(s, arg, ns)
+        return arg
+    return f'{ns.const(szr.analyze)}({arg})'
+
+
+def _compile_expr(szr: Base, arg: str, ns: _Namespace, data: str = 'None') -> str:
+    if type(szr) is DoNothing:
+        return arg
+    if type(szr) is Func:
+        if szr.compiler is None:
+            return arg
+        if szr.compile_data:
+            return f'{ns.const(szr.compiler)}({arg}, {data})'
+        return f'{ns.const(szr.compiler)}({arg})'
+    if type(szr) is Sequence:
+        for s in szr.serializers[::-1]:
+            arg = _compile_expr(s, arg, ns, data)
+        return arg
+    return f'{ns.const(szr.compile)}({arg}, {data})'
+
+
+def _default_expr(default, ns: _Namespace) -> str:
+    if isinstance(default, Factory):
+        return f'{ns.const(default.factory)}()'
+    return ns.const(default)
+
+
+class Specialized(Base):
+    """
+    Same as `keys >> fields >> ToClass(klass)`, but analyze and compile are generated for the exact set
+    of WrapKeyInfo and FieldInfo (as attrs generates __init__): plain keys are copied by a single table lookup,
+    without extract_unused copies, factorydicts and serializer dispatch.
+    The results are identical to the interpreted `reference`, generated code is in `source`.
+    Raises TypeError for unsupported chains, use `specialize` to fall back to the interpreted one.
+    """
+
+    def __init__(self, keys: WrapKeys, fields: MultiField, klass: type[object]):
+        self.keys = keys
+        self.fields = fields
+        self.klass = klass
+        self.to_class = ToClass(klass)
+        self.reference = keys >> fields >> self.to_class
+        self._check_supported()
+        ns = _Namespace(factorydict=factorydict, Ellipsis=Ellipsis, SKIP=_Missed)
+        lines = []
+        tables = self._gen_analyze(ns, lines) + self._gen_compile(ns, lines)
+        self.source = '\n'.join(lines)
+        ns = dict(ns)  # globals of exact dict type are faster
+        exec(compile(self.source, f'<specialized serializer {self.klass.__qualname__}>', 'exec'), ns)
+        for table_name, table in zip(('KEYS_A', 'FIELDS_A', 'FIELDS_C', 'NAMES_C'), tables):
+            ns[table_name].update({k: ns[v] if type(v) is _FunctionName else v for k, v in table.items()})
+        self.analyze = ns['analyze']
+        self.compile = ns['compile']
+
+    def get_keys(self) -> Iterator[str]:
+        yield from self.reference.get_keys()
+
+    def _children(self) -> Iterator[tuple[str, Base]]:
+        yield from ()  # nested serializers are bound in the generated code
+
+    def _check_supported(self):
+        if Ellipsis in self.keys.from_name or Ellipsis in self.fields.from_name:
+            raise TypeError('name Ellipsis is not supported')
+        if not self.to_class.has_dict:
+            raise TypeError(f'{self.klass.__name__} has no __dict__')
+        for info in self.fields.infos:
+            if Ellipsis in info.keys:
+                head = info.serializer._as_sequence()[0]
+                if type(head) is not Key or head.key is not Ellipsis or head.default is not _Missed:
+                    raise TypeError('unused field must start with Key(...)')
+                if info.keys != (Ellipsis,) or not info.optimize_name or info.always_compile:
+                    raise TypeError('unused field must have only key Ellipsis and be optimized')
+            if info.name is None and len(info.keys) > 1:
+                raise TypeError('unnamed field with several keys')
+
+    @staticmethod
+    def _key_analyze_lines(info: WrapKeyInfo, raw: str, ns: _Namespace, indent: str) -> list[str]:
+        """ WrapKeys.analyze for one key """
+        if info.name is None:
+            if info.serializer is None:
+                return []
+            return [f'{indent}{_analyze_expr(info.serializer, raw, ns)}']
+        name = ns.const(info.name)
+        if info.serializer is not None:
+            val = _analyze_expr(info.serializer, raw, ns)
+            if not info.optimize_name:
+                return [f'{indent}V[{name}] = {val}']
+            return [
+                f'{indent}val = {val}',
+                f'{indent}if val != {_default_expr(info.default_value, ns)}:',
+                f'{indent}    V[{name}] = val',
+            ]
+        if info.optimize_name is False:
+            return [f'{indent}V[{name}] = {_default_expr(info.default_value, ns)}']
+        return []
+
+    @staticmethod
+    def _key_compile_lines(info: WrapKeyInfo, val: str, ns: _Namespace, indent: str) -> list[str]:
+        """ WrapKeys.compile for one name """
+        if info.key is None:
+            if info.serializer is None:
+                return []
+            return [f'{indent}{_compile_expr(info.serializer, val, ns)}']
+        key = ns.const(info.key)
+        if info.serializer is not None:
+            val = _compile_expr(info.serializer, val, ns)
+            if not info.optimize_key:
+                return [f'{indent}out[{key}] = {val}']
+            return [
+                f'{indent}val = {val}',
+                f'{indent}if val != {_default_expr(info.default_data, ns)}:',
+                f'{indent}    out[{key}] = val',
+            ]
+        if info.optimize_key is False:
+            return [f'{indent}out[{key}] = {_default_expr(info.default_data, ns)}']
+        return []
+
+    def _gen_analyze(self, ns: _Namespace, lines: list[str]) -> tuple[dict, dict]:
+        keys, fields = self.keys, self.fields
+
+        # WrapKeys: key -> name to copy value, (name, analyser) or name of generated function
+        key_table = {}
+        helpers = []
+        for i, (key, info) in enumerate(keys.from_key.items()):
+            if key is Ellipsis:
+                continue
+            plain = type(info.name) is str and not info.optimize_name
+            if plain and type(info.serializer) is DoNothing:
+                key_table[key] = info.name
+            elif plain and type(info.serializer) is Func and info.serializer.analyser is not None:
+                key_table[key] = (info.name, info.serializer.analyser)
+            else:
+                key_table[key] = func_name = _FunctionName(f'_analyze_key_{i}')
+                func_lines = self._key_analyze_lines(info, 'raw', ns, '    ') or ['    pass']
+                helpers += [f'def {func_name}(raw, V):', *func_lines, '']
+        unused_key = keys.from_key.get(Ellipsis, None)
+        ns['KEYS_A'] = {}
+
+        body = [
+            'def analyze(data):',
+            '    V = {}',
+            '    U = {}',
+            '    for key, raw in data.items():',
+            '        entry = KEYS_A.get(key, None)',
+            '        if entry is None:',
+            '            U[key] = raw' if unused_key is not None else '            continue',
+            '        elif entry.__class__ is str:',
+            '            V[entry] = raw',
+            '        elif entry.__class__ is tuple:',
+            '            V[entry[0]] = entry[1](raw)',
+            '        else:',
+            '            entry(raw, V)',
+        ]
+        if unused_key is not None:
+            body.append('    if U:')
+            body.extend(self._key_analyze_lines(unused_key, 'U', ns, ' ' * 8) or ['        pass'])
+        for name, info in keys.force_default_names.items():
+            body.append(f'    if {ns.const(name)} not in V:')
+            body.append(f'        V[{ns.const(name)}] = {_default_expr(info.default_value, ns)}')
+
+        # MultiField: forced fields, then fields in order of their keys in V, then unused
+        missing = ns.const(keys._missing_name)
+
+        def field_value(info: FieldInfo) -> str | None:
+            field_keys, rest = _split_keys(info.serializer)
+            if field_keys is None:
+                return f'{ns.const(info.serializer.analyze)}(D)'
+            args = [f'(V[{ns.const(k)}] if {ns.const(k)} in V else {missing}({ns.const(k)}))' for k in field_keys]
+            val = args[0] if len(args) == 1 else f'({", ".join(args)},)'
+            for s in rest:
+                val = _analyze_expr(s, val, ns)
+            if info.name is None and not rest:
+                return None  # only reads a key
+            return val
+
+        def field_lines(info: FieldInfo, indent: str) -> list[str]:
+            val = field_value(info)
+            if val is None:
+                return []
+            if info.name is None:
+                return [f'{indent}{val}']
+            return [f'{indent}value[{ns.const(info.name)}] = {val}']
+
+        if any(_split_keys(info.serializer)[0] is None for info in fields.infos if Ellipsis not in info.keys):
+            body.append(f'    D = factorydict({missing}, V)')  # for fields with unknown keys
+        else:
+            body.append('    D = None')
+        body.append('    value = {}')
+        for info in fields.force_default_names:
+            body.extend(field_lines(info, '    '))
+
+        table = {}  # key -> name to copy value, SKIP or name of generated function
+        for i, (key, info) in enumerate(fields.from_key.items()):
+            if key is Ellipsis:
+                continue
+            if info in fields.force_default_names:
+                table[key] = _Missed
+                continue
+            field_keys, rest = _split_keys(info.serializer)
+            if field_keys == (key,) and not rest and type(info.name) is str:
+                table[key] = info.name
+                continue
+            func_lines = field_lines(info, '    ')
+            if not func_lines:
+                table[key] = _Missed
+                continue
+            if len(info.keys) > 1:  # analyzed on the first key
+                func_lines = [f'    if {ns.const(info.name)} in value:', '        return'] + func_lines
+            table[key] = func_name = _FunctionName(f'_analyze_field_{i}')
+            helpers += [f'def {func_name}(V, D, value):', *func_lines, '']
+        ns['FIELDS_A'] = {}
+
+        unused_field = fields.from_key.get(Ellipsis, None)
+        body += [
+            '    R = {}',
+            '    for name, val in V.items():',
+            '        field = FIELDS_A.get(name, None)',
+            '        if field is None:',
+            '            R[name] = val' if unused_field is not None else '            continue',
+            '        elif field.__class__ is str:',
+            '            value[field] = val',
+            '        elif field is not SKIP:',
+            '            field(V, D, value)',
+        ]
+        if unused_field is not None:
+            val = 'R'
+            for s in unused_field.serializer._as_sequence()[1:]:
+                val = _analyze_expr(s, val, ns)
+            body.append('    if R:')
+            body.append(f'        value[{ns.const(unused_field.name)}] = {val}' if unused_field.name is not None
+                        else f'        {val}')
+        if self.to_class.members is not None:  # compact class
+            body.append(f'    return {ns.const(self.to_class._analyze_compact)}(value)')
+        else:
+            body += [
+                f'    obj = {ns.const(object.__new__)}({ns.const(self.klass)})',
+                f'    {ns.const(object.__setattr__)}(obj, "__dict__", value)',
+                '    return obj',
+            ]
+        body.append('')
+        lines += helpers + body
+        return key_table, table
+
+    def _gen_compile(self, ns: _Namespace, lines: list[str]) -> tuple[dict, dict]:
+        keys, fields = self.keys, self.fields
+        field_names = ns.const(fields.from_name)
+
+        def field_lines(info: FieldInfo, val: str, indent: str) -> list[str]:
+            """ MultiField.compile for one field """
+            if info.compile_takes_value:
+                val = f'{{k: v for k, v in value.items() if k in {field_names}}}'
+            field_keys, rest = _split_keys(info.serializer)
+            if field_keys is None:
+                return [f'{indent}{ns.const(info.serializer.compile)}({val}, data)']
+            val = _compile_expr(Sequence(rest), val, ns, 'data')
+            if len(field_keys) == 1:
+                return [f'{indent}data[{ns.const(field_keys[0])}] = {val}']
+            names = [f'v{j}' for j in range(len(field_keys))]
+            return [f'{indent}{", ".join(names)}, = {val}'] + [
+                f'{indent}data[{ns.const(k)}] = {name}' for k, name in zip(field_keys, names)
+            ]
+
+        if self.to_class.members is not None:  # compact class
+            value = f'{ns.const(self.to_class._compile_compact)}(obj)'
+        else:
+            value = 'obj.__dict__'
+        body = [
+            'def compile(obj, data=None):',
+            f'    value = {value}',
+            '    data = {}',
+        ]
+        for info in fields.always_compile:
+            if info.serializer is not None:
+                body.extend(field_lines(info, f'value.get({ns.const(info.name)}, None)', '    '))
+
+        table = {}  # name -> key to copy value, SKIP or name of generated function
+        helpers = []
+        for i, (name, info) in enumerate(fields.from_name.items()):
+            if info in fields.always_compile or info.serializer is None:
+                table[name] = _Missed
+                continue
+            field_keys, rest = _split_keys(info.serializer)
+            if field_keys is not None and len(field_keys) == 1 and type(field_keys[0]) is str and not rest \
+                    and not info.compile_takes_value:
+                table[name] = field_keys[0]
+                continue
+            table[name] = func_name = _FunctionName(f'_compile_field_{i}')
+            helpers += [f'def {func_name}(val, value, data):', *field_lines(info, 'val', '    '), '']
+        ns['FIELDS_C'] = {}
+
+        body += [
+            '    for name, val in value.items():',
+            '        field = FIELDS_C.get(name, None)',
+            '        if field is None:',
+            '            continue',
+            '        if field.__class__ is str:',
+            '            data[field] = val',
+            '        elif field is not SKIP:',
+            '            field(val, value, data)',
+            '    if Ellipsis in data:',
+            '        data.update(data.pop(Ellipsis))',
+        ]
+
+        # WrapKeys: name -> key to copy value, (key, compiler, default_data or SKIP) or name of generated function
+        name_table = {}
+        for i, (name, info) in enumerate(keys.from_name.items()):
+            szr = info.serializer
+            func = type(szr) is Func and szr.compiler is not None and not szr.compile_data
+            plain = type(info.key) is str
+            if plain and not info.optimize_key and type(szr) is DoNothing:
+                name_table[name] = info.key
+            elif plain and not info.optimize_key and func:
+                name_table[name] = (info.key, szr.compiler, _Missed)
+            elif plain and info.optimize_key and func and not isinstance(info.default_data, Factory):
+                name_table[name] = (info.key, szr.compiler, info.default_data)
+            else:
+                name_table[name] = func_name = _FunctionName(f'_compile_name_{i}')
+                func_lines = self._key_compile_lines(info, 'val', ns, '    ') or ['    pass']
+                helpers += [f'def {func_name}(val, out):', *func_lines, '']
+        ns['NAMES_C'] = {}
+        body += [
+            '    out = {}',
+            '    for name, val in data.items():',
+            '        entry = NAMES_C.get(name, None)',
+            '        if entry is None:',
+            '            continue',
+            '        if entry.__class__ is str:',
+            '            out[entry] = val',
+            '        elif entry.__class__ is tuple:',
+            '            val = entry[1](val)',
+            '            if entry[2] is SKIP or val != entry[2]:',
+            '                out[entry[0]] = val',
+            '        else:',
+            '            entry(val, out)',
+        ]
+        for key, info in keys.force_default_keys.items():
+            body.append(f'    if {ns.const(key)} not in out:')
+            body.append(f'        out[{ns.const(key)}] = {_default_expr(info.default_data, ns)}')
+        body += [
+            '    if Ellipsis in out:',
+            '        out.update(out.pop(Ellipsis))',
+            '    return out',
+            '',
+        ]
+        lines += helpers + body
+        return table, name_table
+
+
+def specialize(keys: WrapKeys, fields: MultiField, klass: type[object]) -> Base:
+    """ Specialized serializer if possible, otherwise `keys >> fields >> ToClass(klass)` """
+    try:
+        return Specialized(keys, fields, klass)
+    except TypeError:
+        return keys >> fields >> ToClass(klass)
+
+
+def _label(key) -> str:
+    if isinstance(key, type):
+        return key.__qualname__
+    if isinstance(key, tuple):
+        return ', '.join(map(_label, key))
+    if key is Ellipsis:
+        return '...'
+    return str(key)
+
+
+@define
+class SerializerStats:
+    label: str
+    serializer: str  # class name
+    method: Literal['analyze', 'compile']
+    calls: int = 0
+    tottime: float = 0.  # without nested serializers
+    cumtime: float = 0.
+
+
+@define
+class SerializingStats:
+    """ Report of SerializingFamily.stats(), str() gives a table sorted by own time """
+    records: list[SerializerStats]
+
+    def __iter__(self) -> Iterator[SerializerStats]:
+        return iter(self.records)
+
+    def __str__(self):
+        lines = [f'{"calls":>9} {"tottime":>9} {"cumtime":>9} {"percall":>9}  serializer']
+        for rec in sorted(self.records, key=lambda rec: rec.tottime, reverse=True):
+            if rec.calls:
+                lines.append(
+                    f'{rec.calls:>9} {rec.tottime:>9.3f} {rec.cumtime:>9.3f} {rec.cumtime / rec.calls * 1e6:>7.1f}us'
+                    f'  {rec.label} {rec.method} ({rec.serializer})'
+                )
+        return '\n'.join(lines)
+
+
+_stats_stack: list[float] = []  # time of nested calls of the running serializers
+
+
+def _profiled(method: Callable, stats: SerializerStats) -> Callable:
+    def profiled(*args, **kwargs):
+        _stats_stack.append(0.)
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = _stats_stack.pop()
+            if _stats_stack:
+                _stats_stack[-1] += elapsed
+            stats.calls += 1
+            stats.tottime += elapsed - nested
+            stats.cumtime += elapsed
+
+    profiled.__serializer_stats__ = stats
+    return profiled
+
+
 @define
 class SerializingFamily:
+    """
+    Serializers by keys. Opt-in stats of serializers calls:
+        with SerializingFamily.get('gd_object').profile():
+            ...
+        print(SerializingFamily.get('gd_object').stats())
+    Stats are collected by instance attributes replacing analyze and compile,
+    so disabled stats cost nothing.
+    """
     _dct: dict[Any, Base | Any] = field(init=False, factory=dict)
+    _stats: list[SerializerStats] = field(init=False, factory=list)
+    _profiled: list[tuple[Base, str, Any]] = field(init=False, factory=list)  # (serializer, method, original attr)
     _all: ClassVar[dict[str, 'SerializingFamily']] = {}
 
     def __getitem__(self, key) -> Base:
@@ -645,6 +1178,52 @@ class SerializingFamily:
     def __setitem__(self, key, value: Base):
         self._dct[key] = value
 
+    def enable_stats(self, expand_specialized: bool = False):
+        """
+        Starts collecting stats of all serializers of the family and nested ones.
+        A serializer shared by several places is counted once, labeled by the first path.
+        expand_specialized: Specialized serializers run the interpreted `reference` chain to show nested stats
+        """
+        self.disable_stats()
+        self._stats = []
+        seen = set()
+        for key, szr in self._dct.items():
+            if isinstance(szr, Base):
+                self._instrument(_label(key), szr, seen, expand_specialized)
+
+    def _instrument(self, label: str, szr: Base, seen: set[int], expand_specialized: bool):
+        if id(szr) in seen or hasattr(vars(szr).get('analyze', None), '__serializer_stats__'):
+            return  # already instrumented here or by another family
+        seen.add(id(szr))
+        target = szr.reference if expand_specialized and isinstance(szr, Specialized) else szr
+        for method in ('analyze', 'compile'):
+            stats = SerializerStats(label, type(szr).__name__, method)
+            self._stats.append(stats)
+            self._profiled.append((szr, method, vars(szr).get(method, _Missed)))
+            setattr(szr, method, _profiled(getattr(target, method), stats))
+        for child_label, child in target._children():
+            self._instrument(label + child_label, child, seen, expand_specialized)
+
+    def disable_stats(self):
+        """ Restores serializers, collected stats are kept """
+        for szr, method, original in reversed(self._profiled):
+            if original is _Missed:
+                delattr(szr, method)
+            else:
+                setattr(szr, method, original)
+        self._profiled = []
+
+    @contextmanager
+    def profile(self, expand_specialized: bool = False) -> Iterator['SerializingFamily']:
+        self.enable_stats(expand_specialized)
+        try:
+            yield self
+        finally:
+            self.disable_stats()
+
+    def stats(self) -> SerializingStats:
+        return SerializingStats(list(self._stats))
+
     @classmethod
     def register(cls, name) -> 'SerializingFamily':
         assert name not in cls._all
@@ -0,0 +1,70 @@
+"""
+SerializingFamily.profile counts calls and times of every serializer of the family and nested ones,
+serializers are restored afterwards.
+"""
+import classes
+from classes.gd_module import GdModule
+from serializing import Func, List, SerializingFamily, WrapKeyInfo, WrapKeys
+
+S = SerializingFamily.register('stats_test')
+S['test'] = WrapKeys(
+    WrapKeyInfo('k1', 'foo', Func(int, str)),
+    WrapKeyInfo('k2', 'bar', List(Func(float, str))),
+)
+DATA = {'k1': '1', 'k2': ['0.5', '1.5', '2.5']}
+
+
+def _records(family: SerializingFamily) -> dict[tuple[str, str], tuple[int, float, float]]:
+    return {(rec.label, rec.method): (rec.calls, rec.tottime, rec.cumtime) for rec in family.stats()}
+
+
+def test_calls_and_times():
+    with S.profile():
+        value = S['test'].analyze(DATA)
+        S['test'].compile(value)
+        S['test'].compile(value)
+    records = _records(S)
+    calls = {key: calls for key, (calls, _, _) in records.items() if calls}
+    assert calls == {
+        ('test', 'analyze'): 1, ('test[k1:foo]', 'analyze'): 1,
+        ('test[k2:bar]', 'analyze'): 1, ('test[k2:bar].serializer', 'analyze'): 3,
+        ('test', 'compile'): 2, ('test[k1:foo]', 'compile'): 2,
+        ('test[k2:bar]', 'compile'): 2, ('test[k2:bar].serializer', 'compile'): 6,
+    }
+    for calls, tottime, cumtime in records.values():
+        assert 0. <= tottime <= cumtime
+    top = records['test', 'analyze']
+    nested = sum(records[key][1] for key in records if key[1] == 'analyze')
+    assert abs(nested - top[2]) < 1e-3  # own times of the chain add up to its total
+    assert 'test[k2:bar].serializer compile (Func)' in str(S.stats())
+
+
+def test_restored():
+    szr = S['test']
+    with S.profile():
+        assert 'analyze' in vars(szr)
+    assert 'analyze' not in vars(szr) and 'analyze' not in vars(szr.infos[1].serializer.serializer)
+    before = _records(S)
+    assert S['test'].analyze(DATA) == {'foo': 1, 'bar': [0.5, 1.5, 2.5]}
+    assert _records(S) == before  # stats are kept, but not collected
+
+
+def test_specialized():
+    gd_object = SerializingFamily.get('gd_object')
+    szr = gd_object['GdObject']
+    specialized = [s for s in szr.serializers.values() if 'analyze' in vars(s)]
+    originals = [vars(s)['analyze'] for s in specialized]
+    data = '1,1268,2,30,3,15,51,2,63,1'
+    for expand in (False, True):
+        with gd_object.profile(expand_specialized=expand), GdModule():
+            szr.analyze(data)
+        labels = [rec.label for rec in gd_object.stats() if rec.calls]
+        assert 'GdObject.serializers[Spawn]' in labels
+        assert any(label.startswith('GdObject.serializers[Spawn][') for label in labels) is expand  # nested ones
+    assert [vars(s)['analyze'] for s in specialized] == originals
+
+
+if __name__ == '__main__':
+    for test in (test_calls_and_times, test_restored, test_specialized):
+        test()
+        print(test.__name__, 'ok')
@@ -0,0 +1,122 @@
+"""
+Spatial queries of GdModule against a scan of all objects, the index is kept up to date by change notifications.
+"""
+import gc
+import random
+
+import classes
+from classes import gd_object as gd
+from classes import observe
+from classes.gd_module import GdModule
+from classes.spatial import SpatialIndex
+
+
+def _random_object(rnd: random.Random) -> gd.GdObjectBase:
+    x, y = rnd.uniform(-300., 900.), rnd.uniform(-300., 900.)
+    if rnd.random() < 0.2:
+        return gd.Toggle(x=x, y=y)
+    return gd.GdObjectAnyId(1, x=x, y=y)
+
+
+def _module(count: int = 300, seed: int = 0) -> GdModule:
+    rnd = random.Random(seed)
+    module = GdModule()
+    with module:
+        module.objects = [_random_object(rnd) for _ in range(count)]
+    return module
+
+
+def _ids(objects) -> list[tuple[float, float]]:
+    """ objects are told apart by their coordinates, ColumnarObjects give new views on every access """
+    return sorted((obj.x, obj.y) for obj in objects)
+
+
+def _is(obj, klass: type) -> bool:
+    return issubclass(getattr(obj, 'klass', type(obj)), klass)
+
+
+def _in_rect(module: GdModule, x0: float, y0: float, x1: float, y1: float, where=None) -> list:
+    return _ids(
+        obj for obj in module.objects
+        if x0 <= obj.x <= x1 and y0 <= obj.y <= y1 and (where is None or _is(obj, where))
+    )
+
+
+def _distance(obj, center: tuple[float, float]) -> float:
+    return (obj.x - center[0]) ** 2 + (obj.y - center[1]) ** 2
+
+
+def _check_queries(module: GdModule, rnd: random.Random):
+    for _ in range(20):
+        x0, y0 = rnd.uniform(-400., 900.), rnd.uniform(-400., 900.)
+        x1, y1 = x0 + rnd.uniform(0., 500.), y0 + rnd.uniform(0., 500.)
+        for where in (None, gd.Toggle):
+            assert _ids(module.objects_in_rect(x0, y0, x1, y1, where)) == _in_rect(module, x0, y0, x1, y1, where)
+        assert _ids(module.objects_in_rect(x1, y1, x0, y0)) == _in_rect(module, x0, y0, x1, y1)
+
+        center = (x0, y0)
+        radius = rnd.uniform(0., 400.)
+        near = module.objects_near(center, radius)
+        assert _ids(near) == _ids(obj for obj in module.objects if _distance(obj, center) <= radius ** 2)
+        distances = [_distance(obj, center) for obj in near]
+        assert distances == sorted(distances)
+
+        nearest = sorted(module.objects, key=lambda obj: _distance(obj, center))
+        limited = module.objects_near(center, limit=5)
+        assert [_distance(obj, center) for obj in limited] == [_distance(obj, center) for obj in nearest[:5]]
+        trigger = module.objects_near(center, where=gd.Toggle, limit=1)
+        assert trigger == [min((obj for obj in module.objects if _is(obj, gd.Toggle)),
+                               key=lambda obj: _distance(obj, center))]
+        assert module.objects_near(center, limit=0) == []
+
+
+def test_queries():
+    module = _module()
+    _check_queries(module, random.Random(1))
+    column = module.objects_in_column(45.)
+    assert _ids(column) == _ids(obj for obj in module.objects if 30. <= obj.x < 60.)
+    assert [obj.y for obj in column] == sorted(obj.y for obj in column)
+
+
+def test_columnar_queries():
+    module = _module()
+    module.to_columnar()
+    _check_queries(module, random.Random(1))
+
+
+def test_incremental_updates():
+    rnd = random.Random(2)
+    module = _module()
+    index = module.spatial_index()  # built before the changes
+    with module:
+        for _ in range(50):
+            obj = rnd.choice(module.objects)
+            obj.x, obj.y = rnd.uniform(-300., 900.), rnd.uniform(-300., 900.)
+        module.objects.extend(_random_object(rnd) for _ in range(30))
+        module.objects.append(_random_object(rnd))
+        del module.objects[:10]
+        module.objects.pop()
+        module.objects.remove(module.objects[5])
+        module.objects[3] = _random_object(rnd)
+    assert module.spatial_index() is index and len(index) == len(module.objects)
+    _check_queries(module, rnd)
+
+
+def test_no_setattr_hook_without_observers():
+    gc.collect()
+    assert not observe.observed
+    assert '__setattr__' not in vars(gd.GdObjectBase)
+    module = _module(10)
+    module.spatial_index()
+    assert '__setattr__' in vars(gd.GdObjectBase)
+    obj = module.objects[0]
+    obj.x = 10000.
+    assert module.objects_in_rect(9999., obj.y, 10001., obj.y) == [obj]
+    module.unobserve(SpatialIndex)
+    assert '__setattr__' not in vars(gd.GdObjectBase)
+
+
+if __name__ == '__main__':
+    for test in (test_queries, test_columnar_queries, test_incremental_updates, test_no_setattr_hook_without_observers):
+        test()
+        print(test.__name__, 'ok')
@@ -0,0 +1,109 @@
+"""
+Specialized serializers of gd_object against the interpreted `keys >> fields >> ToClass(klass)` (Specialized.reference):
+the same objects are analyzed and the same data is compiled, with unknown keys and missing or default fields.
+"""
+import random
+
+import classes
+from classes import gd_object_szr as G
+from classes.gd_module import GdModule
+from serializing import Specialized
+
+SPECIALIZED = {
+    klass: szr for klass, szr in G.gd_object_serializer.serializers.items() if isinstance(szr, Specialized)
+}
+UNKNOWN_KEYS = ('900', '901', '999')
+
+
+def _random_data(info, rnd: random.Random) -> str:
+    szr = info.serializer
+    if szr is G.szrs[int] or szr is G.szrs[bool]:
+        return str(rnd.choice((0, 1, 1, 2, 3, -1, 5)))
+    if szr is G.szrs[float]:
+        return rnd.choice(('0', '1.5', '-3', '0.25', '10'))
+    if szr is G.szrs['List[Group]']:
+        return '.'.join(str(rnd.randint(1, 20)) for _ in range(rnd.randint(1, 3)))
+    if szr is G.szrs['HSV']:
+        return f'{rnd.randint(0, 3)}a{rnd.random():.2f}a1a{rnd.randint(0, 1)}a0'
+    if szr is G.szrs['b64str']:
+        return rnd.choice(('aGVsbG8=', 'dGVzdA=='))
+    if isinstance(szr, G.GdIdSerializer):
+        return str(rnd.randint(0, 20))
+    return str(rnd.choice((0, 1, 2, 3, 1.5)))
+
+
+def _outcome(func):
+    try:
+        return 'ok', func()
+    except Exception as e:
+        return 'error', type(e).__name__
+
+
+def _state(obj) -> tuple:
+    return type(obj), list(vars(obj).items())
+
+
+def _check(szr: Specialized, data: dict):
+    with GdModule():
+        expected = _outcome(lambda: szr.reference.analyze(dict(data)))
+        actual = _outcome(lambda: szr.analyze(dict(data)))
+        if expected[0] == 'error' or actual[0] == 'error':
+            assert actual == expected, (szr.klass, data)
+            return
+        assert _state(actual[1]) == _state(expected[1]), (szr.klass, data)
+
+        compiled = _outcome(lambda: list(szr.reference.compile(expected[1]).items()))
+        assert _outcome(lambda: list(szr.compile(actual[1]).items())) == compiled, (szr.klass, data)
+        assert _outcome(lambda: list(szr.compile(expected[1]).items())) == compiled, (szr.klass, data)
+
+
+def _known_keys(szr: Specialized) -> list[str]:
+    return [key for key in szr.keys.from_key if isinstance(key, str)]
+
+
+def _with_id(szr: Specialized, data: dict) -> dict:
+    class_id = getattr(szr.klass, '__id__', None)
+    return data if class_id is None else {'1': str(class_id), **data}
+
+
+def test_specialized_exist():
+    assert len(SPECIALIZED) > 10
+
+
+def test_missing_fields():
+    for szr in SPECIALIZED.values():
+        _check(szr, _with_id(szr, {}))
+
+
+def test_default_data():
+    for szr in SPECIALIZED.values():
+        data = {
+            key: szr.keys.from_key[key].default_data
+            for key in _known_keys(szr)
+            if isinstance(szr.keys.from_key[key].default_data, str)
+        }
+        _check(szr, _with_id(szr, data))
+
+
+def test_unknown_keys():
+    for szr in SPECIALIZED.values():
+        _check(szr, _with_id(szr, dict.fromkeys(UNKNOWN_KEYS, '7')))
+
+
+def test_random_data():
+    rnd = random.Random(1)
+    for szr in SPECIALIZED.values():
+        known = _known_keys(szr)
+        for _ in range(30):
+            keys = rnd.sample(known, min(len(known), rnd.randint(0, 25)))
+            data = {key: _random_data(szr.keys.from_key[key], rnd) for key in keys}
+            data.update(dict.fromkeys(rnd.sample(UNKNOWN_KEYS, rnd.randint(0, 2)), '7'))
+            items = list(_with_id(szr, data).items())
+            rnd.shuffle(items)
+            _check(szr, dict(items))
+
+
+if __name__ == '__main__':
+    for test in (test_specialized_exist, test_missing_fields, test_default_data, test_unknown_keys, test_random_data):
+        test()
+        print(test.__name__, 'ok')
@@ -1,15 +1,132 @@
 import base64
+import binascii
 import gzip
+import itertools
+import struct
+import zlib
+from types import ModuleType
+from typing import BinaryIO, Iterable, Iterator
 from Crypto.Cipher import AES
 
-def compress(x: bytes) -> bytes:
-    return b'H4sIAAAAAAAAC' + base64.b64encode(gzip.compress(x)).replace(b'+', b'-').replace(b'/', b'_')[13:]
+CHUNK_SIZE = 2 ** 20
+COMPRESS_LEVEL = 9  # 1 - fastest, 9 - smallest
+
+_AES_KEY = b'ipu9TUv54yv]isFMh5@;t.5w34E2Ry@{'
+_GZIP_HEADER_B64 = b'H4sIAKeEmGIC/'  # base64 of gzip header, GD writes its own
+
+# deflate backends with zlib api, the first installed one is used, see set_deflate_backend
+DEFLATE_BACKENDS = ('zlib_ng', 'isal', 'zlib')
+
+
+def _import_backend(name: str) -> ModuleType:
+    if name == 'zlib_ng':
+        from zlib_ng import zlib_ng
+        return zlib_ng
+    if name == 'isal':
+        from isal import isal_zlib
+        return isal_zlib
+    if name == 'zlib':
+        return zlib
+    raise ValueError(f'Unknown deflate backend {name!r}, expected one of {DEFLATE_BACKENDS}')
+
+
+def set_deflate_backend(name: str | None = None) -> str:
+    """ name: one of DEFLATE_BACKENDS, None - the first installed. Returns the name of the backend in use """
+    global _deflate, _deflate_name
+    for candidate in DEFLATE_BACKENDS if name is None else (name,):
+        try:
+            _deflate = _import_backend(candidate)
+        except ImportError:
+            if name is not None:
+                raise
+            continue
+        _deflate_name = candidate
+        return candidate
+
+
+_deflate: ModuleType = zlib
+_deflate_name: str = 'zlib'
+set_deflate_backend()
+
+
+def _gzip(x: bytes, level: int) -> bytes:
+    """ gzip member with the header GD writes, its base64 is 'H4sIAAAAAAAAC', deflated by the backend """
+    backend_level = level
+    if _deflate_name == 'isal':  # isa-l has levels 0-3
+        backend_level = (6 if level < 0 else level) // 3
+    deflater = _deflate.compressobj(backend_level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    # magic, deflate, no flags, mtime 0, no extra flags, os 11 - the last two bits are 1 as in the unknown os 255
+    header = b'\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\x0b'
+    trailer = struct.pack('<II', _deflate.crc32(x), len(x) & 0xffffffff)
+    return b''.join((header, deflater.compress(x), deflater.flush(), trailer))
+
+
+_B64_ALPHABET = b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/='
+_b64_tables: dict[int, tuple[bytes, bytes]] = {}
+_b64_encode_tables: dict[int, bytes] = {}
+
+
+def _b64_encode_table(xor_value: int) -> bytes:
+    """ translate table: standard -> url-safe alphabet, xor """
+    table = _b64_encode_tables.get(xor_value, None)
+    if table is None:
+        table = _b64_encode_tables[xor_value] = bytes.maketrans(b'+/', b'-_').translate(_xor_table(xor_value))
+    return table
+
+
+def _b64_table(xor_value: int) -> tuple[bytes, bytes]:
+    """ translate table and delete set: xor, url-safe -> standard alphabet, drop non-base64 bytes """
+    tables = _b64_tables.get(xor_value, None)
+    if tables is None:
+        urlsafe = bytes(range(256)).translate(bytes.maketrans(b'-_', b'+/'))
+        table = _xor_table(xor_value).translate(urlsafe)
+        delete = bytes(b for b in range(256) if table[b] not in _B64_ALPHABET)
+        tables = _b64_tables[xor_value] = table, delete
+    return tables
+
+
+def _compress(x: bytes, level: int, xor_value: int) -> bytes:
+    """ url-safe base64 of gzip xored with xor_value, the alphabet and xor are applied by one translate """
+    return binascii.b2a_base64(_gzip(x, level), newline=False).translate(_b64_encode_table(xor_value))
+
+def _decompress(x: bytes, xor_value: int) -> bytes:
+    """
+    Inverse to _compress. The gzip header isn't decoded, GD doesn't always write a valid one: base64 from char 12
+    is bytes from 9 (os byte), deflate data starts after it.
+    """
+    data = binascii.a2b_base64(memoryview(x.translate(_b64_table(xor_value)[0]))[12:])
+    inflater = _deflate.decompressobj(-zlib.MAX_WBITS)
+    result = inflater.decompress(memoryview(data)[1:])
+    if not inflater.eof:
+        raise EOFError('Compressed file ended before the end-of-stream marker was reached')
+    trailer = inflater.unused_data[:8]
+    if len(trailer) < 8:
+        raise EOFError('Compressed file ended before the gzip trailer')
+    crc, size = struct.unpack('<II', trailer)
+    if crc != _deflate.crc32(result):
+        raise gzip.BadGzipFile('CRC check failed')
+    if size != len(result) & 0xffffffff:
+        raise gzip.BadGzipFile('Incorrect length of data produced')
+    return result
+
+def compress(x: bytes, level: int = COMPRESS_LEVEL) -> bytes:
+    return _compress(x, level, 0)
 
 def decompress(x: bytes) -> bytes:
-    return gzip.decompress(base64.b64decode(b'H4sIAKeEmGIC/' + x[13:].replace(b'-', b'+').replace(b'_', b'/')))
+    return _decompress(x, 0)
+
+_xor_tables: dict[int, bytes] = {}
+
+
+def _xor_table(value: int) -> bytes:
+    """ translate table mapping every byte b to b ^ value """
+    table = _xor_tables.get(value, None)
+    if table is None:
+        table = _xor_tables[value] = bytes(b ^ value for b in range(256))
+    return table
 
 def _xor_bytes(data: bytes, value: int) -> bytes:
-    return bytes(map(lambda x: x ^ value, data))
+    return bytes(data).translate(_xor_table(value))
 
 def _remove_pad(save: bytes) -> bytes:
     pad = save[-1]
@@ -20,13 +137,91 @@ def _remove_pad(save: bytes) -> bytes:
 def decrypt_save_xml(data: bytes) -> bytes:
     # thanks https://github.com/Wyliemaster/GD-Save-Decryptor/blob/main/saves.py
     if data[0] == 67:
-        return decompress(_xor_bytes(data, 11))
-    cipher = AES.new(b'ipu9TUv54yv]isFMh5@;t.5w34E2Ry@{', AES.MODE_ECB)
+        return _decompress(data, 11)
+    cipher = AES.new(_AES_KEY, AES.MODE_ECB)
     return _remove_pad(cipher.decrypt(data))
 
-def encrypt_save_xml(data: bytes, ios_mode: bool = False) -> bytes:
+def encrypt_save_xml(data: bytes, ios_mode: bool = False, level: int = COMPRESS_LEVEL) -> bytes:
+    """ level: compression level, not used in ios mode """
     if not ios_mode:
-        return _xor_bytes(compress(data), 11)
-    cipher = AES.new(b'ipu9TUv54yv]isFMh5@;t.5w34E2Ry@{', AES.MODE_ECB)
+        return _compress(data, level, 11)
+    cipher = AES.new(_AES_KEY, AES.MODE_ECB)
     pad = ((-len(data) - 1) % 16) + 1
     return cipher.encrypt(data + bytes((pad,)) * pad)
+
+# streaming
+
+def _iter_chunks(source: BinaryIO | bytes | memoryview, chunk_size: int) -> Iterator[bytes]:
+    """ file object (or mmap) is read by chunks, bytes-like object is sliced by chunks """
+    if hasattr(source, 'read'):
+        while chunk := source.read(chunk_size):
+            yield chunk
+        return
+    view = memoryview(source)
+    for i in range(0, len(view), chunk_size):
+        yield bytes(view[i:i + chunk_size])
+
+def decompress_stream(chunks: Iterable[bytes], xor_value: int = 0, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """ Same as decompress(_xor_bytes(b''.join(chunks), xor_value)), but yields the result by parts """
+    table, delete = _b64_table(xor_value)
+    inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    header = True
+    pending = b''
+
+    def inflate(b64data: bytes) -> Iterator[bytes]:
+        data = base64.b64decode(b64data)
+        while data:
+            out = inflater.decompress(data, chunk_size)
+            data = inflater.unconsumed_tail
+            if out:
+                yield out
+
+    for chunk in chunks:
+        pending += chunk.translate(table, delete)
+        if header:
+            if len(pending) < 13:
+                continue
+            pending = _GZIP_HEADER_B64 + pending[13:]
+            header = False
+        cut = len(pending) - len(pending) % 4
+        yield from inflate(pending[:cut])
+        pending = pending[cut:]
+    if header:
+        pending = _GZIP_HEADER_B64 + pending[13:]
+    yield from inflate(pending)
+    if tail := inflater.flush():
+        yield tail
+    if not inflater.eof:
+        raise EOFError('Compressed file ended before the end-of-stream marker was reached')
+
+def _aes_decrypt_stream(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    cipher = AES.new(_AES_KEY, AES.MODE_ECB)
+    pending = b''
+    last_block = b''  # kept until the end to remove padding
+    for chunk in chunks:
+        pending += chunk
+        cut = len(pending) - len(pending) % 16
+        if not cut:
+            continue
+        data = last_block + cipher.decrypt(pending[:cut])
+        pending = pending[cut:]
+        if len(data) > 16:
+            yield data[:-16]
+        last_block = data[-16:]
+    if pending:
+        raise ValueError('Data must be aligned to block boundary in ECB mode')
+    if last_block:
+        yield _remove_pad(last_block)
+
+def decrypt_save_xml_stream(source: BinaryIO | bytes | memoryview, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Streaming version of decrypt_save_xml. Reads source (file object, mmap or bytes) by chunks
+    and yields decrypted xml by parts, so the whole save is never kept in memory.
+    """
+    chunks = _iter_chunks(source, chunk_size)
+    first = next(chunks, b'')
+    chunks = itertools.chain((first,), chunks)
+    if first[:1] == b'C':
+        return decompress_stream(chunks, 11, chunk_size)
+    return _aes_decrypt_stream(chunks)
+
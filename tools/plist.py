@@ -1,4 +1,9 @@
 import xml.etree.ElementTree as ET
+from typing import Iterable
+
+_CHUNK_SIZE = 2 ** 20
+
+_Missed = object()
 
 def xml_elem(tag, text=None, children=None, attrs=None):
     elem = ET.Element(tag, attrs if attrs else {})
@@ -8,25 +13,82 @@ def xml_elem(tag, text=None, children=None, attrs=None):
         elem.extend(children)
     return elem
 
-def _xml_to_json(element: ET.Element):
-    if element.tag in ('t', 'true'):
-        return True
-    if element.tag in ('f', 'false'):
-        return False
-    if element.tag in ('s',):
-        return element.text if element.text is not None else ''
-    if element.tag in ('i',):
-        return int(element.text)
-    if element.tag in ('r',):
-        return float(element.text)
-
-    if element.tag not in ('d', 'dict'):
-        raise ValueError(element.tag)
-    children = iter(element)
-    d = {key_elem.text: _xml_to_json(val_elem) for key_elem, val_elem in zip(children, children, strict=True)}
-    if not d.get('_isArr', False):
-        return d
-    return [d[f'k_{i}'] for i in range(len(d) - 1)]
+_SCALARS = {
+    't': lambda text: True,
+    'true': lambda text: True,
+    'f': lambda text: False,
+    'false': lambda text: False,
+    's': lambda text: text if text is not None else '',
+    'i': int,
+    'r': float,
+}
+
+
+class _PlistBuilder:
+    """
+    Builds json from pull parser events in one pass without recursion.
+    Consumed elements are detached from the tree, so only the current path stays in memory.
+    """
+
+    def __init__(self):
+        self.parser = ET.XMLPullParser(events=('start', 'end'))
+        self.elems: list[ET.Element] = []  # current path in xml
+        self.dicts: list[dict] = []  # open d/dict elements
+        self.keys: list = []  # pending key for each open dict
+        self.result = _Missed
+
+    def feed(self, data: bytes):
+        self.parser.feed(data)
+        self._process()
+
+    def close(self):
+        self.parser.close()
+        self._process()
+        if self.result is _Missed:
+            raise ValueError('plist has no value')
+        return self.result
+
+    def _add_value(self, value):
+        if not self.dicts:
+            if self.result is _Missed:  # only the first value of the root is used
+                self.result = value
+            return
+        key = self.keys[-1]
+        if key is _Missed:
+            raise ValueError(f'plist value without key: {value!r}')
+        self.dicts[-1][key] = value
+        self.keys[-1] = _Missed
+
+    def _process(self):
+        elems = self.elems
+        for event, elem in self.parser.read_events():
+            if event == 'start':
+                elems.append(elem)
+                if len(elems) > 1 and elem.tag in ('d', 'dict'):
+                    self.dicts.append({})
+                    self.keys.append(_Missed)
+                continue
+            elems.pop()
+            if not elems:  # root element
+                continue
+            tag = elem.tag
+            if tag == 'k':
+                if self.keys[-1] is not _Missed:
+                    raise ValueError(f'plist key without value: {self.keys[-1]!r}')
+                self.keys[-1] = elem.text
+            elif tag in _SCALARS:
+                self._add_value(_SCALARS[tag](elem.text))
+            elif tag in ('d', 'dict'):
+                if self.keys.pop() is not _Missed:
+                    raise ValueError('plist key without value')
+                d = self.dicts.pop()
+                if d.get('_isArr', False):
+                    d = [d[f'k_{i}'] for i in range(len(d) - 1)]
+                self._add_value(d)
+            else:
+                raise ValueError(tag)
+            del elems[-1][-1]  # elem is always the last child of its parent
+
 
 def _json_to_xml(value):
     if isinstance(value, bool):
@@ -48,11 +110,16 @@ def _json_to_xml(value):
         children.append(_json_to_xml(v))
     return xml_elem('d', children=children)
 
+def plist_stream_to_json(chunks: Iterable[bytes]):
+    """ parses plist xml given by parts, e.g. from decrypt_save_xml_stream """
+    builder = _PlistBuilder()
+    for chunk in chunks:
+        builder.feed(chunk)
+    return builder.close()
+
 def plist_to_json(data: bytes):
-    xml_etree = ET.ElementTree(ET.fromstring(data))
-    plist_root = xml_etree.getroot()[0]
-    json_data = _xml_to_json(plist_root)
-    return json_data
+    view = memoryview(data)
+    return plist_stream_to_json(view[i:i + _CHUNK_SIZE] for i in range(0, len(view), _CHUNK_SIZE))
 
 def json_to_plist(json_data: dict) -> bytes:
     xml_data = _json_to_xml(json_data)
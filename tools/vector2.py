@@ -17,7 +17,7 @@ class Vector2(Vector2Abc[float, Any]):
 
     def __sub__(self, other: Self | tuple[float, float] | Vector2Abc[float, Any]) -> Self:
         x, y = other
-        return self.__class__(self.x + x, self.y + y)
+        return self.__class__(self.x - x, self.y - y)
 
     def __mul__(self, other: float) -> Self:
         return self.__class__(self.x * other, self.y * other)
@@ -81,7 +81,7 @@ class Vector2Int(Vector2Abc[int, Any]):
 
     def __sub__(self, other: Self | tuple[int, int]) -> Self:
         x, y = other
-        return self.__class__(self.x + x, self.y + y)
+        return self.__class__(self.x - x, self.y - y)
 
     def __mul__(self, other: int) -> Self:
         return self.__class__(self.x * other, self.y * other)
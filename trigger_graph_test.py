@@ -0,0 +1,146 @@
+"""
+TriggerGraph against graphs built from scratch: strongly connected components against a scan of reachability,
+the graph kept up to date by change notifications against a new one.
+"""
+import random
+import sys
+
+import classes
+from classes import gd_object as gd
+from classes.enums import Triggered
+from classes.gd_id import Group, Item
+from classes.gd_module import GdIdRef, GdModule
+from classes.trigger_graph import TriggerGraph
+
+GROUPS = range(1, 25)
+
+
+def _random_trigger(rnd: random.Random, x: float) -> gd.Trigger:
+    triggered = rnd.choice((Triggered.Coord, Triggered.Spawn, Triggered.SpawnMulti))
+    kind = rnd.random()
+    if kind < 0.6:
+        obj = gd.Spawn(x=x, y=0., target=Group(rnd.choice(GROUPS)), triggered=triggered)
+        if rnd.random() < 0.2:
+            obj.remapping = {rnd.choice(GROUPS): rnd.choice(GROUPS)}
+    elif kind < 0.8:
+        obj = gd.Toggle(x=x, y=0., target=Group(rnd.choice(GROUPS)), triggered=triggered)
+    else:
+        obj = gd.Count(x=x, y=0., target=Group(rnd.choice(GROUPS)), item=Item(rnd.randint(1, 3)), triggered=triggered)
+    if rnd.random() < 0.8:
+        obj.unused = {'groups': [Group(value) for value in rnd.sample(GROUPS, rnd.randint(1, 2))]}
+    return obj
+
+
+def _module(count: int = 60, seed: int = 0) -> GdModule:
+    rnd = random.Random(seed)
+    module = GdModule()
+    with module:
+        objects = [_random_trigger(rnd, float(i)) for i in range(count)]
+        objects.append(gd.GdObjectAnyId(1, x=-1., y=0.))  # not a trigger
+        module.objects = objects
+    return module
+
+
+def _label(node):
+    """ nodes of different graphs are compared by labels: id type and value or x of the trigger """
+    if isinstance(node, GdIdRef):
+        return type(node).__name__, node.get_value()
+    return 'trigger', node.x
+
+
+def _snapshot(graph: TriggerGraph, module: GdModule) -> tuple:
+    """ everything the graph answers, by labels """
+    with module:
+        triggers = list(graph.triggers.values())
+        nodes = triggers + [Group(value) for value in GROUPS]
+        return (
+            sorted(sorted(map(_label, component)) for component in graph.cycles()),
+            sorted(_label(obj) for obj in graph.dead_triggers()),
+            {_label(node): sorted(map(_label, graph.reachable(node))) for node in nodes if node in graph},
+            {_label(node): sorted(map(_label, graph.reachable(node, reverse=True))) for node in nodes if node in graph},
+        )
+
+
+def _scan_components(graph: TriggerGraph) -> list[list]:
+    """ nodes that reach each other, by reachable() of every node """
+    nodes = [*graph.triggers.values(), *(key.get_ref() for key in {*graph._succ, *graph._pred} if not isinstance(key, int))]
+    reach = {_label(node): {_label(other) for other in graph.reachable(node)} for node in nodes}
+    components = set()
+    for node, reached in reach.items():
+        component = frozenset(other for other in reached if node in reach[other]) | {node}
+        if len(component) > 1:
+            components.add(component)
+    return sorted(sorted(component) for component in components)
+
+
+def test_cycles():
+    for seed in range(5):
+        module = _module(seed=seed)
+        with module:
+            graph = module.trigger_graph()
+            cycles = graph.cycles()
+            assert sorted(sorted(map(_label, component)) for component in cycles) == _scan_components(graph)
+            assert sum(map(len, cycles)) == len({_label(node) for component in cycles for node in component})
+
+
+def test_long_chain():
+    """ no recursion: a cycle through more nodes than the recursion limit """
+    count = sys.getrecursionlimit() + 100
+    module = GdModule()
+    with module:
+        objects = []
+        for i in range(count):
+            obj = gd.Spawn(x=float(i), y=0., target=Group((i + 1) % count + 1), triggered=Triggered.Spawn)
+            obj.unused = {'groups': [Group(i + 1)]}
+            objects.append(obj)
+        module.objects = objects
+        graph = module.trigger_graph()
+        assert [len(component) for component in graph.cycles()] == [2 * count]
+        assert len(graph.reachable(objects[0])) == 2 * count and graph.dead_triggers() == []
+        objects[-1].target = Group(count + 1)
+        assert graph.cycles() == [] and graph.dead_triggers() == [objects[0]]
+
+
+def test_incremental_updates():
+    rnd = random.Random(1)
+    module = _module()
+    with module:
+        graph = module.trigger_graph()
+        graph.cycles()  # cached results must be dropped by changes
+        for step in range(200):
+            obj = rnd.choice([obj for obj in module.objects if isinstance(obj, gd.Trigger)])
+            action = rnd.randrange(7)
+            if action == 0:
+                obj.target = Group(rnd.choice(GROUPS))
+            elif action == 1 and hasattr(obj, 'unused'):
+                obj.unused['groups'].append(Group(rnd.choice(GROUPS)))
+            elif action == 2:
+                obj.unused = {'groups': [Group(rnd.choice(GROUPS))]}
+            elif action == 3 and isinstance(obj, gd.Spawn):
+                obj.remapping = {rnd.choice(GROUPS): rnd.randint(1, 40)}  # values above GROUPS get gd_ids later
+            elif action == 4:
+                module.objects.append(_random_trigger(rnd, 1000. + step))
+            elif action == 5 and len(module.objects) > 30:
+                module.objects.remove(obj)
+            else:
+                obj.triggered = rnd.choice((Triggered.Coord, Triggered.Spawn))
+            if step % 20 == 0:
+                Group(rnd.randint(25, 40))  # remapping values get gd_ids
+                assert _snapshot(graph, module) == _snapshot(TriggerGraph(module, module.objects), module)
+        Group(1).absorb(Group(2))
+        assert _snapshot(graph, module) == _snapshot(TriggerGraph(module, module.objects), module)
+
+
+def test_columnar():
+    module = _module()
+    with module:
+        expected = _snapshot(module.trigger_graph(), module)
+    module.to_columnar()
+    with module:
+        assert _snapshot(module.trigger_graph(), module) == expected
+
+
+if __name__ == '__main__':
+    for test in (test_cycles, test_long_chain, test_incremental_updates, test_columnar):
+        test()
+        print(test.__name__, 'ok')